@@ -6,8 +6,11 @@ Flask application factory with environment-based configuration
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from flask_compress import Compress
+from flask_caching import Cache
 from .config import get_config
 from .utils.cors_config import CORSConfig
+from .utils.json_provider import OrjsonJSONProvider
 from .validators.config_validator import ConfigValidator
 import logging
 import os
@@ -15,6 +18,8 @@ import os
 # Initialize extensions
 db = SQLAlchemy()
 login_manager = LoginManager()
+compress = Compress()
+cache = Cache()
 
 # Configure logging
 logging.basicConfig(
@@ -50,6 +55,9 @@ def create_app(config_name=None):
     
     logger.info(f"Loaded configuration: {config_class.__name__}")
     
+    # Use orjson for JSON responses
+    app.json = OrjsonJSONProvider(app)
+    
     # Initialize extensions
     _init_extensions(app)
     
@@ -88,6 +96,12 @@ def _init_extensions(app):
     login_manager.login_message = 'Please log in to access this page.'
     login_manager.login_message_category = 'info'
     
+    # Initialize response compression
+    compress.init_app(app)
+    
+    # Initialize cache
+    cache.init_app(app)
+    
     # Custom unauthorized handler for API requests
     @login_manager.unauthorized_handler
     def unauthorized():
@@ -110,8 +124,13 @@ def _init_extensions(app):
     # User loader for Flask-Login
     @login_manager.user_loader
     def load_user(user_id):
+        from flask import g
         from .models.user import User
-        return User.query.get(int(user_id))
+        user = User.query.get(int(user_id))
+        if user is not None:
+            # Keep the ID on g for code that only needs it, such as error logging
+            g.user_id = user.id
+        return user
 
 
 def _init_cors(app):
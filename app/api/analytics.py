@@ -6,6 +6,7 @@ RESTful API для получения статистики и аналитики
 from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required, current_user
 from ..services.analytics_service import AnalyticsService, AnalyticsServiceError
+from ..utils.analytics_cache import get_cached_analytics
 import logging
 
 # Создать blueprint
@@ -50,9 +51,13 @@ def get_habit_analytics(habit_id):
                 }
             }), 400
         
-        # Получить статистику используя сервис
+        # Получить статистику используя сервис (результат кэшируется до изменения данных)
         analytics_service = get_analytics_service()
-        stats, success, errors = analytics_service.get_habit_statistics(habit_id, current_user.id, days)
+        stats, success, errors = get_cached_analytics(
+            current_user.id, 'habit',
+            lambda: analytics_service.get_habit_statistics(habit_id, current_user.id, days),
+            habit_id, days
+        )
         
         if not success:
             if "не найдена" in errors[0]:
@@ -122,7 +127,11 @@ def get_category_analytics(category_id):
         
         # Получить статистику используя сервис
         analytics_service = get_analytics_service()
-        stats, success, errors = analytics_service.get_category_statistics(category_id, current_user.id, days)
+        stats, success, errors = get_cached_analytics(
+            current_user.id, 'category',
+            lambda: analytics_service.get_category_statistics(category_id, current_user.id, days),
+            category_id, days
+        )
         
         if not success:
             if "не найдена" in errors[0]:
@@ -192,7 +201,11 @@ def get_user_analytics():
         
         # Получить аналитику используя сервис
         analytics_service = get_analytics_service()
-        analytics, success, errors = analytics_service.get_user_analytics(current_user.id, days)
+        analytics, success, errors = get_cached_analytics(
+            current_user.id, 'overview',
+            lambda: analytics_service.get_user_analytics(current_user.id, days),
+            days
+        )
         
         if not success:
             return jsonify({
@@ -255,7 +268,11 @@ def get_heatmap():
         
         # Получить данные используя сервис
         analytics_service = get_analytics_service()
-        heatmap, success, errors = analytics_service.get_heatmap_data(current_user.id, days)
+        heatmap, success, errors = get_cached_analytics(
+            current_user.id, 'heatmap',
+            lambda: analytics_service.get_heatmap_data(current_user.id, days),
+            days
+        )
         
         if not success:
             return jsonify({
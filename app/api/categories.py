@@ -6,6 +6,7 @@ RESTful API для управления категориями привычек
 from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required, current_user
 from ..services.category_service import CategoryService, CategoryNotFoundError, CategoryServiceError
+from ..utils.analytics_cache import invalidate_analytics_cache
 import logging
 
 # Создать blueprint
@@ -129,6 +130,8 @@ def create_category():
                 }
             }), 400
         
+        invalidate_analytics_cache(current_user.id)
+        
         # Вернуть созданную категорию
         return jsonify({
             'category': {
@@ -190,7 +193,8 @@ def get_category(category_id):
                 'name': category.name,
                 'color': category.color,
                 'icon': category.icon,
-                'created_at': category.created_at.isoformat() if category.created_at else None
+                'created_at': category.created_at.isoformat() if category.created_at else None,
+                'habits_count': category.habits_count
             }
         }), 200
         
@@ -269,6 +273,8 @@ def update_category(category_id):
                 }
             }), 400
         
+        invalidate_analytics_cache(current_user.id)
+        
         # Вернуть обновленную категорию
         return jsonify({
             'category': {
@@ -332,6 +338,8 @@ def delete_category(category_id):
                 }
             }), 400
         
+        invalidate_analytics_cache(current_user.id)
+        
         # Вернуть пустой ответ с кодом 204 No Content
         return '', 204
         
@@ -61,7 +61,7 @@ def get_habit_comments(habit_id):
                 'text': comment.text,
                 'created_at': comment.created_at.isoformat() if comment.created_at else None,
                 'updated_at': comment.updated_at.isoformat() if comment.updated_at else None,
-                'is_edited': comment.created_at != comment.updated_at if comment.created_at and comment.updated_at else False
+                'is_edited': comment.is_edited
             }
             comments_data.append(comment_dict)
         
@@ -267,7 +267,7 @@ def update_comment(comment_id):
                 'text': comment.text,
                 'created_at': comment.created_at.isoformat() if comment.created_at else None,
                 'updated_at': comment.updated_at.isoformat() if comment.updated_at else None,
-                'is_edited': comment.created_at != comment.updated_at if comment.created_at and comment.updated_at else False
+                'is_edited': comment.is_edited
             }
         }), 200
         
@@ -11,6 +11,7 @@ from ..services.habit_service import (
     HabitNotFoundError, HabitServiceError
 )
 from ..services.user_service import UserService
+from ..utils.analytics_cache import invalidate_analytics_cache, invalidate_user_statistics
 import logging
 
 # Create blueprint
@@ -36,6 +37,19 @@ def get_user_service():
 
 logger = logging.getLogger(__name__)
 
+# Field sets passed to Habit.to_dict for the different response shapes
+HABIT_FIELDS = (
+    'id', 'name', 'description', 'execution_time', 'frequency', 'habit_type',
+    'reward', 'related_habit_id', 'created_at', 'updated_at', 'is_archived'
+)
+HABIT_LIST_FIELDS = HABIT_FIELDS + (
+    'category_id', 'tracking_days', 'completion_rate', 'can_complete_today'
+)
+HABIT_STATUS_FIELDS = ('id', 'name', 'is_archived', 'updated_at')
+
+# Maximum number of habits accepted by the bulk archive/restore endpoints
+MAX_BULK_HABITS = 100
+
 
 @habits_bp.route('', methods=['GET'])
 @login_required
@@ -109,35 +123,9 @@ def get_habits():
         paginated_habits = habits[start_idx:end_idx]
         
         # Convert to JSON format
-        habits_data = []
-        for habit in paginated_habits:
-            habit_dict = {
-                'id': habit.id,
-                'name': habit.name,
-                'description': habit.description,
-                'execution_time': habit.execution_time,
-                'frequency': habit.frequency,
-                'habit_type': habit.habit_type.value if habit.habit_type else None,
-                'reward': habit.reward,
-                'related_habit_id': habit.related_habit_id,
-                'category_id': habit.category_id,
-                'tracking_days': habit.tracking_days or 7,
-                'created_at': habit.created_at.isoformat() if habit.created_at else None,
-                'updated_at': habit.updated_at.isoformat() if habit.updated_at else None,
-                'is_archived': habit.is_archived
-            }
-            
-            # Add computed fields
-            if hasattr(habit, 'get_completion_rate'):
-                habit_dict['completion_rate'] = habit.get_completion_rate()
-            if hasattr(habit, 'can_be_completed_today'):
-                habit_dict['can_complete_today'] = habit.can_be_completed_today()
-            
-            # Add tags
-            if hasattr(habit, 'tags'):
-                habit_dict['tags'] = [{'id': tag.id, 'name': tag.name} for tag in habit.tags]
-            
-            habits_data.append(habit_dict)
+        habits_data = habit_service.Habit.bulk_to_dict(paginated_habits, fields=HABIT_LIST_FIELDS)
+        for habit, habit_dict in zip(paginated_habits, habits_data):
+            habit_dict['tags'] = [{'id': tag.id, 'name': tag.name} for tag in habit.tags]
         
         return jsonify({
             'habits': habits_data,
@@ -222,22 +210,12 @@ def create_habit():
         # Create habit using service layer
         habit_service = get_habit_service()
         habit = habit_service.create_habit(current_user.id, habit_data)
+        invalidate_analytics_cache(current_user.id)
+        invalidate_user_statistics(current_user.id)
         
         # Return created habit
         return jsonify({
-            'habit': {
-                'id': habit.id,
-                'name': habit.name,
-                'description': habit.description,
-                'execution_time': habit.execution_time,
-                'frequency': habit.frequency,
-                'habit_type': habit.habit_type.value if habit.habit_type else None,
-                'reward': habit.reward,
-                'related_habit_id': habit.related_habit_id,
-                'created_at': habit.created_at.isoformat() if habit.created_at else None,
-                'updated_at': habit.updated_at.isoformat() if habit.updated_at else None,
-                'is_archived': habit.is_archived
-            }
+            'habit': habit.to_dict(fields=HABIT_FIELDS)
         }), 201
         
     except ValidationError as e:
@@ -285,19 +263,7 @@ def get_habit(habit_id):
         habit = habit_service.get_habit_by_id(habit_id, current_user.id)
         
         return jsonify({
-            'habit': {
-                'id': habit.id,
-                'name': habit.name,
-                'description': habit.description,
-                'execution_time': habit.execution_time,
-                'frequency': habit.frequency,
-                'habit_type': habit.habit_type.value if habit.habit_type else None,
-                'reward': habit.reward,
-                'related_habit_id': habit.related_habit_id,
-                'created_at': habit.created_at.isoformat() if habit.created_at else None,
-                'updated_at': habit.updated_at.isoformat() if habit.updated_at else None,
-                'is_archived': habit.is_archived
-            }
+            'habit': habit.to_dict(fields=HABIT_FIELDS)
         }), 200
         
     except HabitNotFoundError:
@@ -380,22 +346,12 @@ def update_habit(habit_id):
         # Update habit using service layer
         habit_service = get_habit_service()
         habit = habit_service.update_habit(habit_id, current_user.id, habit_data)
+        invalidate_analytics_cache(current_user.id)
+        invalidate_user_statistics(current_user.id)
         
         # Return updated habit
         return jsonify({
-            'habit': {
-                'id': habit.id,
-                'name': habit.name,
-                'description': habit.description,
-                'execution_time': habit.execution_time,
-                'frequency': habit.frequency,
-                'habit_type': habit.habit_type.value if habit.habit_type else None,
-                'reward': habit.reward,
-                'related_habit_id': habit.related_habit_id,
-                'created_at': habit.created_at.isoformat() if habit.created_at else None,
-                'updated_at': habit.updated_at.isoformat() if habit.updated_at else None,
-                'is_archived': habit.is_archived
-            }
+            'habit': habit.to_dict(fields=HABIT_FIELDS)
         }), 200
         
     except HabitNotFoundError:
@@ -455,6 +411,8 @@ def delete_habit(habit_id):
         # Delete habit using service layer
         habit_service = get_habit_service()
         habit_service.delete_habit(habit_id, current_user.id)
+        invalidate_analytics_cache(current_user.id)
+        invalidate_user_statistics(current_user.id)
         
         # Return empty response with 204 No Content
         return '', 204
@@ -508,14 +466,10 @@ def archive_habit(habit_id):
         # Archive habit using service layer
         habit_service = get_habit_service()
         habit = habit_service.archive_habit(habit_id, current_user.id)
+        invalidate_user_statistics(current_user.id)
         
         return jsonify({
-            'habit': {
-                'id': habit.id,
-                'name': habit.name,
-                'is_archived': habit.is_archived,
-                'updated_at': habit.updated_at.isoformat() if habit.updated_at else None
-            }
+            'habit': habit.to_dict(fields=HABIT_STATUS_FIELDS)
         }), 200
         
     except HabitNotFoundError:
@@ -567,14 +521,10 @@ def restore_habit(habit_id):
         # Restore habit using service layer
         habit_service = get_habit_service()
         habit = habit_service.restore_habit(habit_id, current_user.id)
+        invalidate_user_statistics(current_user.id)
         
         return jsonify({
-            'habit': {
-                'id': habit.id,
-                'name': habit.name,
-                'is_archived': habit.is_archived,
-                'updated_at': habit.updated_at.isoformat() if habit.updated_at else None
-            }
+            'habit': habit.to_dict(fields=HABIT_STATUS_FIELDS)
         }), 200
         
     except HabitNotFoundError:
@@ -610,6 +560,143 @@ def restore_habit(habit_id):
         }), 500
 
 
+def _get_bulk_habit_ids():
+    """
+    Extract habit IDs from a bulk request body of the form {"ids": [...]}
+    
+    Returns:
+        tuple: (habit_ids, error_response) - exactly one of them is None
+    """
+    if not request.is_json:
+        return None, (jsonify({
+            'error': {
+                'code': 'INVALID_CONTENT_TYPE',
+                'message': 'Content-Type must be application/json'
+            }
+        }), 400)
+    
+    data = request.get_json()
+    habit_ids = data.get('ids') if isinstance(data, dict) else None
+    
+    if (not isinstance(habit_ids, list) or not habit_ids or
+            not all(isinstance(i, int) and not isinstance(i, bool) for i in habit_ids)):
+        return None, (jsonify({
+            'error': {
+                'code': 'VALIDATION_ERROR',
+                'message': 'ids must be a non-empty list of integers'
+            }
+        }), 400)
+    
+    if len(habit_ids) > MAX_BULK_HABITS:
+        return None, (jsonify({
+            'error': {
+                'code': 'VALIDATION_ERROR',
+                'message': f'At most {MAX_BULK_HABITS} habits can be changed at once'
+            }
+        }), 400)
+    
+    # Drop duplicates while keeping the client's order
+    return list(dict.fromkeys(habit_ids)), None
+
+
+@habits_bp.route('/archive', methods=['POST'])
+@login_required
+def archive_habits():
+    """
+    Archive several habits at once
+    
+    Expected JSON payload:
+    {
+        "ids": [1, 2, 3]
+    }
+    
+    Returns:
+        JSON response with archived habit IDs and IDs that were not found
+    """
+    habit_ids, error_response = _get_bulk_habit_ids()
+    if error_response:
+        return error_response
+    
+    try:
+        # Archive habits using service layer
+        habit_service = get_habit_service()
+        archived_ids = habit_service.archive_habits(habit_ids, current_user.id)
+        invalidate_user_statistics(current_user.id)
+        
+        archived = set(archived_ids)
+        return jsonify({
+            'archived': [habit_id for habit_id in habit_ids if habit_id in archived],
+            'not_found': [habit_id for habit_id in habit_ids if habit_id not in archived]
+        }), 200
+        
+    except HabitServiceError as e:
+        logger.error(f"Service error archiving habits for user {current_user.id}: {str(e)}")
+        return jsonify({
+            'error': {
+                'code': 'SERVICE_ERROR',
+                'message': 'Failed to archive habits',
+                'details': str(e)
+            }
+        }), 500
+    except Exception as e:
+        logger.error(f"Unexpected error archiving habits for user {current_user.id}: {str(e)}")
+        return jsonify({
+            'error': {
+                'code': 'INTERNAL_ERROR',
+                'message': 'An unexpected error occurred'
+            }
+        }), 500
+
+
+@habits_bp.route('/restore', methods=['POST'])
+@login_required
+def restore_habits():
+    """
+    Restore several archived habits at once
+    
+    Expected JSON payload:
+    {
+        "ids": [1, 2, 3]
+    }
+    
+    Returns:
+        JSON response with restored habit IDs and IDs that were not found
+    """
+    habit_ids, error_response = _get_bulk_habit_ids()
+    if error_response:
+        return error_response
+    
+    try:
+        # Restore habits using service layer
+        habit_service = get_habit_service()
+        restored_ids = habit_service.restore_habits(habit_ids, current_user.id)
+        invalidate_user_statistics(current_user.id)
+        
+        restored = set(restored_ids)
+        return jsonify({
+            'restored': [habit_id for habit_id in habit_ids if habit_id in restored],
+            'not_found': [habit_id for habit_id in habit_ids if habit_id not in restored]
+        }), 200
+        
+    except HabitServiceError as e:
+        logger.error(f"Service error restoring habits for user {current_user.id}: {str(e)}")
+        return jsonify({
+            'error': {
+                'code': 'SERVICE_ERROR',
+                'message': 'Failed to restore habits',
+                'details': str(e)
+            }
+        }), 500
+    except Exception as e:
+        logger.error(f"Unexpected error restoring habits for user {current_user.id}: {str(e)}")
+        return jsonify({
+            'error': {
+                'code': 'INTERNAL_ERROR',
+                'message': 'An unexpected error occurred'
+            }
+        }), 500
+
+
 # Error handlers for the blueprint
 @habits_bp.errorhandler(404)
 def handle_not_found(error):
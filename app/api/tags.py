@@ -5,24 +5,94 @@ RESTful API для управления тегами привычек
 """
 from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required, current_user
-from ..services.tag_service import TagService, TagNotFoundError, TagServiceError
+from ..services.tag_service import TagService, TagNotFoundError, TagServiceError, HabitNotFoundError
+from .. import cache
+from ..utils.conditional import make_conditional_response
+from ..utils.json_provider import (
+    encode_json, json_bytes_response, encode_error_prefix, json_error_details_response
+)
+from functools import lru_cache
 import logging
 
 # Создать blueprint
 tags_bp = Blueprint('tags_api', __name__, url_prefix='/api')
 
-# Сервис будет инициализирован при необходимости
-tag_service = None
-
+# Сервис создается один раз при первом обращении
+@lru_cache(maxsize=None)
 def get_tag_service():
-    """Получить или создать экземпляр TagService"""
-    global tag_service
-    if tag_service is None:
-        tag_service = TagService()
-    return tag_service
+    """Получить экземпляр TagService"""
+    return TagService()
 
 logger = logging.getLogger(__name__)
 
+# Заранее сериализованные начала ответов об ошибках сервиса (details добавляется при ответе)
+_GET_TAGS_SERVICE_ERROR = encode_error_prefix('SERVICE_ERROR', 'Не удалось получить теги')
+_ADD_TAGS_SERVICE_ERROR = encode_error_prefix('SERVICE_ERROR', 'Не удалось добавить теги')
+_REMOVE_TAG_SERVICE_ERROR = encode_error_prefix('SERVICE_ERROR', 'Не удалось удалить тег')
+_SUGGESTIONS_SERVICE_ERROR = encode_error_prefix('SERVICE_ERROR', 'Не удалось получить предложения тегов')
+
+# Заранее сериализованные тела постоянных ответов об ошибках
+_INTERNAL_ERROR_BODY = encode_json({
+    'error': {
+        'code': 'INTERNAL_ERROR',
+        'message': 'Произошла неожиданная ошибка'
+    }
+})
+_INVALID_CONTENT_TYPE_BODY = encode_json({
+    'error': {
+        'code': 'INVALID_CONTENT_TYPE',
+        'message': 'Content-Type должен быть application/json'
+    }
+})
+_NOT_FOUND_BODY = encode_json({
+    'error': {
+        'code': 'NOT_FOUND',
+        'message': 'Запрашиваемый ресурс не найден'
+    }
+})
+_METHOD_NOT_ALLOWED_BODY = encode_json({
+    'error': {
+        'code': 'METHOD_NOT_ALLOWED',
+        'message': 'Запрашиваемый метод не разрешен для этого ресурса'
+    }
+})
+
+# Время жизни закэшированных предложений тегов (секунды)
+SUGGESTIONS_CACHE_TIMEOUT = 30
+
+
+def _suggestions_version_key(user_id):
+    """Ключ версии кэша предложений тегов пользователя"""
+    return f'tag_suggestions_version:{user_id}'
+
+
+def _get_cached_suggestions(user_id, prefix):
+    """
+    Получить предложения тегов с кэшированием по (user_id, prefix)
+    
+    Args:
+        user_id: ID пользователя
+        prefix: Префикс для поиска
+        
+    Returns:
+        List[str]: Список предложенных тегов
+    """
+    version = cache.get(_suggestions_version_key(user_id)) or 0
+    key = f'tag_suggestions:{user_id}:{version}:{prefix.lower()}'
+    
+    suggestions = cache.get(key)
+    if suggestions is None:
+        suggestions = get_tag_service().get_tag_suggestions(user_id, prefix)
+        cache.set(key, suggestions, timeout=SUGGESTIONS_CACHE_TIMEOUT)
+    return suggestions
+
+
+def _invalidate_suggestions(user_id):
+    """Сбросить кэш предложений тегов пользователя после изменения тегов"""
+    key = _suggestions_version_key(user_id)
+    # Версия хранится без срока жизни, чтобы номера не повторялись
+    cache.set(key, (cache.get(key) or 0) + 1, timeout=0)
+
 
 @tags_bp.route('/habits/<int:habit_id>/tags', methods=['GET'])
 @login_required
@@ -41,38 +111,25 @@ def get_habit_tags(habit_id):
         tag_service = get_tag_service()
         tags = tag_service.get_habit_tags(habit_id, current_user.id)
         
-        # Преобразовать в JSON формат
-        tags_data = []
-        for tag in tags:
-            tag_dict = {
-                'id': tag.id,
-                'name': tag.name,
-                'created_at': tag.created_at.isoformat() if tag.created_at else None
-            }
-            tags_data.append(tag_dict)
+        # Преобразовать в JSON формат (теги загружены заранее, используются только их столбцы)
+        tags_data = [
+            {'id': tag.id, 'name': tag.name, 'created_at': tag.created_at}
+            for tag in tags
+        ]
         
-        return jsonify({
+        # ETag по содержимому ответа: при совпадении If-None-Match вернется 304
+        response = jsonify({
             'tags': tags_data,
             'total': len(tags_data)
-        }), 200
+        })
+        return make_conditional_response(response)
         
     except TagServiceError as e:
-        logger.error(f"Ошибка сервиса при получении тегов привычки {habit_id} для пользователя {current_user.id}: {str(e)}")
-        return jsonify({
-            'error': {
-                'code': 'SERVICE_ERROR',
-                'message': 'Не удалось получить теги',
-                'details': str(e)
-            }
-        }), 500
+        logger.error("Ошибка сервиса при получении тегов привычки %s для пользователя %s: %s", habit_id, current_user.id, e)
+        return json_error_details_response(_GET_TAGS_SERVICE_ERROR, str(e), 500)
     except Exception as e:
-        logger.error(f"Неожиданная ошибка при получении тегов привычки {habit_id} для пользователя {current_user.id}: {str(e)}")
-        return jsonify({
-            'error': {
-                'code': 'INTERNAL_ERROR',
-                'message': 'Произошла неожиданная ошибка'
-            }
-        }), 500
+        logger.error("Неожиданная ошибка при получении тегов привычки %s для пользователя %s: %s", habit_id, current_user.id, e)
+        return json_bytes_response(_INTERNAL_ERROR_BODY, 500)
 
 
 @tags_bp.route('/habits/<int:habit_id>/tags', methods=['POST'])
@@ -90,16 +147,10 @@ def add_tags_to_habit(habit_id):
         JSON ответ с добавленными тегами
     """
     try:
-        # Валидировать тип контента
-        if not request.is_json:
-            return jsonify({
-                'error': {
-                    'code': 'INVALID_CONTENT_TYPE',
-                    'message': 'Content-Type должен быть application/json'
-                }
-            }), 400
-        
-        data = request.get_json()
+        # Разобрать JSON; None означает неверный Content-Type или некорректный JSON
+        data = request.get_json(silent=True)
+        if data is None:
+            return json_bytes_response(_INVALID_CONTENT_TYPE_BODY, 400)
         
         # Валидировать обязательные поля
         if not data or not data.get('tags'):
@@ -119,13 +170,6 @@ def add_tags_to_habit(habit_id):
         )
         
         if not success:
-            if "не найдена" in errors[0]:
-                return jsonify({
-                    'error': {
-                        'code': 'HABIT_NOT_FOUND',
-                        'message': f'Привычка с ID {habit_id} не найдена'
-                    }
-                }), 404
             return jsonify({
                 'error': {
                     'code': 'VALIDATION_ERROR',
@@ -134,38 +178,32 @@ def add_tags_to_habit(habit_id):
                 }
             }), 400
         
+        _invalidate_suggestions(current_user.id)
+        
         # Вернуть добавленные теги
-        tags_data = []
-        for tag in tags:
-            tag_dict = {
-                'id': tag.id,
-                'name': tag.name,
-                'created_at': tag.created_at.isoformat() if tag.created_at else None
-            }
-            tags_data.append(tag_dict)
+        tags_data = [
+            {'id': tag.id, 'name': tag.name, 'created_at': tag.created_at}
+            for tag in tags
+        ]
         
         return jsonify({
             'tags': tags_data,
             'total': len(tags_data)
         }), 201
         
-    except TagServiceError as e:
-        logger.error(f"Ошибка сервиса при добавлении тегов к привычке {habit_id} для пользователя {current_user.id}: {str(e)}")
+    except HabitNotFoundError:
         return jsonify({
             'error': {
-                'code': 'SERVICE_ERROR',
-                'message': 'Не удалось добавить теги',
-                'details': str(e)
+                'code': 'HABIT_NOT_FOUND',
+                'message': f'Привычка с ID {habit_id} не найдена'
             }
-        }), 500
+        }), 404
+    except TagServiceError as e:
+        logger.error("Ошибка сервиса при добавлении тегов к привычке %s для пользователя %s: %s", habit_id, current_user.id, e)
+        return json_error_details_response(_ADD_TAGS_SERVICE_ERROR, str(e), 500)
     except Exception as e:
-        logger.error(f"Неожиданная ошибка при добавлении тегов к привычке {habit_id} для пользователя {current_user.id}: {str(e)}")
-        return jsonify({
-            'error': {
-                'code': 'INTERNAL_ERROR',
-                'message': 'Произошла неожиданная ошибка'
-            }
-        }), 500
+        logger.error("Неожиданная ошибка при добавлении тегов к привычке %s для пользователя %s: %s", habit_id, current_user.id, e)
+        return json_bytes_response(_INTERNAL_ERROR_BODY, 500)
 
 
 @tags_bp.route('/habits/<int:habit_id>/tags/<int:tag_id>', methods=['DELETE'])
@@ -187,20 +225,6 @@ def remove_tag_from_habit(habit_id, tag_id):
         success, errors = tag_service.remove_tag_from_habit(habit_id, tag_id, current_user.id)
         
         if not success:
-            if "не найдена" in errors[0]:
-                return jsonify({
-                    'error': {
-                        'code': 'HABIT_NOT_FOUND',
-                        'message': f'Привычка с ID {habit_id} не найдена'
-                    }
-                }), 404
-            elif "не найден" in errors[0]:
-                return jsonify({
-                    'error': {
-                        'code': 'TAG_NOT_FOUND',
-                        'message': f'Тег с ID {tag_id} не найден'
-                    }
-                }), 404
             return jsonify({
                 'error': {
                     'code': 'DELETE_ERROR',
@@ -209,26 +233,31 @@ def remove_tag_from_habit(habit_id, tag_id):
                 }
             }), 400
         
-        # Вернуть пустой ответ с кодом 204 No Content
-        return '', 204
+        _invalidate_suggestions(current_user.id)
         
-    except TagServiceError as e:
-        logger.error(f"Ошибка сервиса при удалении тега {tag_id} из привычки {habit_id} для пользователя {current_user.id}: {str(e)}")
+        # Вернуть пустой ответ с кодом 204 No Content (без разбора кортежа в make_response)
+        return current_app.response_class(status=204)
+        
+    except HabitNotFoundError:
         return jsonify({
             'error': {
-                'code': 'SERVICE_ERROR',
-                'message': 'Не удалось удалить тег',
-                'details': str(e)
+                'code': 'HABIT_NOT_FOUND',
+                'message': f'Привычка с ID {habit_id} не найдена'
             }
-        }), 500
-    except Exception as e:
-        logger.error(f"Неожиданная ошибка при удалении тега {tag_id} из привычки {habit_id} для пользователя {current_user.id}: {str(e)}")
+        }), 404
+    except TagNotFoundError:
         return jsonify({
             'error': {
-                'code': 'INTERNAL_ERROR',
-                'message': 'Произошла неожиданная ошибка'
+                'code': 'TAG_NOT_FOUND',
+                'message': f'Тег с ID {tag_id} не найден'
             }
-        }), 500
+        }), 404
+    except TagServiceError as e:
+        logger.error("Ошибка сервиса при удалении тега %s из привычки %s для пользователя %s: %s", tag_id, habit_id, current_user.id, e)
+        return json_error_details_response(_REMOVE_TAG_SERVICE_ERROR, str(e), 500)
+    except Exception as e:
+        logger.error("Неожиданная ошибка при удалении тега %s из привычки %s для пользователя %s: %s", tag_id, habit_id, current_user.id, e)
+        return json_bytes_response(_INTERNAL_ERROR_BODY, 500)
 
 
 @tags_bp.route('/tags/suggestions', methods=['GET'])
@@ -247,9 +276,8 @@ def get_tag_suggestions():
         # Получить параметры запроса
         prefix = request.args.get('prefix', '')
         
-        # Получить предложения используя сервис
-        tag_service = get_tag_service()
-        suggestions = tag_service.get_tag_suggestions(current_user.id, prefix)
+        # Получить предложения используя сервис (с кэшированием)
+        suggestions = _get_cached_suggestions(current_user.id, prefix)
         
         return jsonify({
             'suggestions': suggestions,
@@ -257,42 +285,21 @@ def get_tag_suggestions():
         }), 200
         
     except TagServiceError as e:
-        logger.error(f"Ошибка сервиса при получении предложений тегов для пользователя {current_user.id}: {str(e)}")
-        return jsonify({
-            'error': {
-                'code': 'SERVICE_ERROR',
-                'message': 'Не удалось получить предложения тегов',
-                'details': str(e)
-            }
-        }), 500
+        logger.error("Ошибка сервиса при получении предложений тегов для пользователя %s: %s", current_user.id, e)
+        return json_error_details_response(_SUGGESTIONS_SERVICE_ERROR, str(e), 500)
     except Exception as e:
-        logger.error(f"Неожиданная ошибка при получении предложений тегов для пользователя {current_user.id}: {str(e)}")
-        return jsonify({
-            'error': {
-                'code': 'INTERNAL_ERROR',
-                'message': 'Произошла неожиданная ошибка'
-            }
-        }), 500
+        logger.error("Неожиданная ошибка при получении предложений тегов для пользователя %s: %s", current_user.id, e)
+        return json_bytes_response(_INTERNAL_ERROR_BODY, 500)
 
 
 # Обработчики ошибок для blueprint
 @tags_bp.errorhandler(404)
 def handle_not_found(error):
     """Обработать ошибки 404 в API тегов"""
-    return jsonify({
-        'error': {
-            'code': 'NOT_FOUND',
-            'message': 'Запрашиваемый ресурс не найден'
-        }
-    }), 404
+    return json_bytes_response(_NOT_FOUND_BODY, 404)
 
 
 @tags_bp.errorhandler(405)
 def handle_method_not_allowed(error):
     """Обработать ошибки 405 в API тегов"""
-    return jsonify({
-        'error': {
-            'code': 'METHOD_NOT_ALLOWED',
-            'message': 'Запрашиваемый метод не разрешен для этого ресурса'
-        }
-    }), 405
+    return json_bytes_response(_METHOD_NOT_ALLOWED_BODY, 405)
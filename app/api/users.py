@@ -9,23 +9,86 @@ from ..services.user_service import (
     UserService, AuthenticationError, UserNotFoundError, 
     UserAlreadyExistsError, UserServiceError
 )
+from functools import lru_cache
+import re
+from ..utils.analytics_cache import invalidate_user_statistics, statistics_cache_key
+from ..utils.conditional import make_conditional_response
+from ..utils.json_provider import (
+    encode_json, json_bytes_response, encode_error_prefix, json_error_details_response
+)
+from .. import cache
 import logging
 
 # Create blueprint
 users_bp = Blueprint('users_api', __name__, url_prefix='/api/users')
 
-# Service will be initialized when needed
-user_service = None
-
+# Service is created once on first use
+@lru_cache(maxsize=None)
 def get_user_service():
-    """Get or create UserService instance"""
-    global user_service
-    if user_service is None:
-        user_service = UserService()
-    return user_service
+    """Get the shared UserService instance"""
+    return UserService()
 
 logger = logging.getLogger(__name__)
 
+# Statistics are cached briefly since dashboards re-fetch /me after every change
+STATISTICS_CACHE_TIMEOUT = 5
+
+
+def _get_cached_statistics(user_id):
+    """
+    Get user statistics, served from cache for up to STATISTICS_CACHE_TIMEOUT seconds
+    
+    Args:
+        user_id: ID of the user
+        
+    Returns:
+        Dict: User statistics
+    """
+    key = statistics_cache_key(user_id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = get_user_service().get_user_statistics(user_id)
+        cache.set(key, stats, timeout=STATISTICS_CACHE_TIMEOUT)
+    return stats
+
+
+# Profile fields that can be changed through PUT /me
+UPDATABLE_PROFILE_FIELDS = frozenset({'name', 'avatar_url', 'default_tracking_days'})
+AVATAR_URL_PATTERN = re.compile(r'^https?://', re.IGNORECASE)
+
+# Pre-encoded service error prefixes; details are appended per response
+_GET_PROFILE_SERVICE_ERROR = encode_error_prefix('SERVICE_ERROR', 'Failed to retrieve user profile')
+_UPDATE_PROFILE_SERVICE_ERROR = encode_error_prefix('SERVICE_ERROR', 'Failed to update user profile')
+_CHANGE_PASSWORD_SERVICE_ERROR = encode_error_prefix('SERVICE_ERROR', 'Failed to change password')
+_DEACTIVATE_SERVICE_ERROR = encode_error_prefix('SERVICE_ERROR', 'Failed to deactivate account')
+_STATISTICS_SERVICE_ERROR = encode_error_prefix('SERVICE_ERROR', 'Failed to retrieve user statistics')
+
+# Pre-encoded bodies of constant error responses
+_INTERNAL_ERROR_BODY = encode_json({
+    'error': {
+        'code': 'INTERNAL_ERROR',
+        'message': 'An unexpected error occurred'
+    }
+})
+_INVALID_CONTENT_TYPE_BODY = encode_json({
+    'error': {
+        'code': 'INVALID_CONTENT_TYPE',
+        'message': 'Content-Type must be application/json'
+    }
+})
+_NOT_FOUND_BODY = encode_json({
+    'error': {
+        'code': 'NOT_FOUND',
+        'message': 'The requested resource was not found'
+    }
+})
+_METHOD_NOT_ALLOWED_BODY = encode_json({
+    'error': {
+        'code': 'METHOD_NOT_ALLOWED',
+        'message': 'The requested method is not allowed for this resource'
+    }
+})
+
 
 @users_bp.route('/me', methods=['GET'])
 @login_required
@@ -37,41 +100,31 @@ def get_current_user():
         JSON response with user data
     """
     try:
-        # Get user statistics using service layer
-        user_service = get_user_service()
-        user_stats = user_service.get_user_statistics(current_user.id)
+        # Get user statistics using service layer (briefly cached)
+        user_stats = _get_cached_statistics(current_user.id)
         
-        return jsonify({
+        # Content-based ETag; a matching If-None-Match yields 304 Not Modified
+        response = jsonify({
             'user': {
                 'id': current_user.id,
                 'email': current_user.email,
                 'name': current_user.name,
                 'avatar_url': current_user.avatar_url,
                 'default_tracking_days': current_user.default_tracking_days or 7,
-                'created_at': current_user.created_at.isoformat() if current_user.created_at else None,
-                'updated_at': current_user.updated_at.isoformat() if current_user.updated_at else None,
+                'created_at': current_user.created_at,
+                'updated_at': current_user.updated_at,
                 'is_active': current_user.is_active,
                 'statistics': user_stats
             }
-        }), 200
+        })
+        return make_conditional_response(response)
         
     except UserServiceError as e:
-        logger.error(f"Service error getting user profile for user {current_user.id}: {str(e)}")
-        return jsonify({
-            'error': {
-                'code': 'SERVICE_ERROR',
-                'message': 'Failed to retrieve user profile',
-                'details': str(e)
-            }
-        }), 500
+        logger.error("Service error getting user profile for user %s: %s", current_user.id, e)
+        return json_error_details_response(_GET_PROFILE_SERVICE_ERROR, str(e), 500)
     except Exception as e:
-        logger.error(f"Unexpected error getting user profile for user {current_user.id}: {str(e)}")
-        return jsonify({
-            'error': {
-                'code': 'INTERNAL_ERROR',
-                'message': 'An unexpected error occurred'
-            }
-        }), 500
+        logger.error("Unexpected error getting user profile for user %s: %s", current_user.id, e)
+        return json_bytes_response(_INTERNAL_ERROR_BODY, 500)
 
 
 @users_bp.route('/me', methods=['PUT'])
@@ -91,25 +144,56 @@ def update_current_user():
         JSON response with updated user data
     """
     try:
-        # Validate content type
-        if not request.is_json:
+        # Parse JSON body; None means wrong Content-Type or malformed JSON
+        user_data = request.get_json(silent=True)
+        if user_data is None:
+            return json_bytes_response(_INVALID_CONTENT_TYPE_BODY, 400)
+        
+        if not user_data or not isinstance(user_data, dict):
             return jsonify({
                 'error': {
-                    'code': 'INVALID_CONTENT_TYPE',
-                    'message': 'Content-Type must be application/json'
+                    'code': 'EMPTY_REQUEST_BODY',
+                    'message': 'Request body cannot be empty'
                 }
             }), 400
         
-        user_data = request.get_json()
-        
+        # Keep only updatable fields so invalid requests never reach the database
+        user_data = {key: value for key, value in user_data.items() if key in UPDATABLE_PROFILE_FIELDS}
         if not user_data:
             return jsonify({
                 'error': {
-                    'code': 'EMPTY_REQUEST_BODY',
-                    'message': 'Request body cannot be empty'
+                    'code': 'VALIDATION_ERROR',
+                    'message': 'Request must contain at least one of: avatar_url, default_tracking_days, name'
                 }
             }), 400
         
+        # Validate name if provided
+        if 'name' in user_data:
+            name = user_data['name']
+            # null clears the name, as before payload validation was added
+            if name is not None and (not isinstance(name, str) or len(name) > 100):
+                return jsonify({
+                    'error': {
+                        'code': 'VALIDATION_ERROR',
+                        'message': 'name must be null or a string of at most 100 characters'
+                    }
+                }), 400
+        
+        # Validate avatar_url if provided
+        if 'avatar_url' in user_data:
+            avatar_url = user_data['avatar_url']
+            if avatar_url is not None and (
+                not isinstance(avatar_url, str)
+                or len(avatar_url) > 500
+                or not AVATAR_URL_PATTERN.match(avatar_url)
+            ):
+                return jsonify({
+                    'error': {
+                        'code': 'VALIDATION_ERROR',
+                        'message': 'avatar_url must be an http(s) URL of at most 500 characters'
+                    }
+                }), 400
+        
         # Validate default_tracking_days if provided
         if 'default_tracking_days' in user_data:
             tracking_days = user_data.get('default_tracking_days')
@@ -124,6 +208,7 @@ def update_current_user():
         # Update user using service layer
         user_service = get_user_service()
         updated_user = user_service.update_user(current_user.id, user_data)
+        invalidate_user_statistics(current_user.id)
         
         return jsonify({
             'user': {
@@ -132,27 +217,16 @@ def update_current_user():
                 'name': updated_user.name,
                 'avatar_url': updated_user.avatar_url,
                 'default_tracking_days': updated_user.default_tracking_days or 7,
-                'updated_at': updated_user.updated_at.isoformat() if updated_user.updated_at else None
+                'updated_at': updated_user.updated_at
             }
         }), 200
         
     except UserServiceError as e:
-        logger.error(f"Service error updating user profile for user {current_user.id}: {str(e)}")
-        return jsonify({
-            'error': {
-                'code': 'SERVICE_ERROR',
-                'message': 'Failed to update user profile',
-                'details': str(e)
-            }
-        }), 500
+        logger.error("Service error updating user profile for user %s: %s", current_user.id, e)
+        return json_error_details_response(_UPDATE_PROFILE_SERVICE_ERROR, str(e), 500)
     except Exception as e:
-        logger.error(f"Unexpected error updating user profile for user {current_user.id}: {str(e)}")
-        return jsonify({
-            'error': {
-                'code': 'INTERNAL_ERROR',
-                'message': 'An unexpected error occurred'
-            }
-        }), 500
+        logger.error("Unexpected error updating user profile for user %s: %s", current_user.id, e)
+        return json_bytes_response(_INTERNAL_ERROR_BODY, 500)
 
 
 @users_bp.route('/me/password', methods=['PUT'])
@@ -171,16 +245,10 @@ def change_password():
         JSON response confirming password change
     """
     try:
-        # Validate content type
-        if not request.is_json:
-            return jsonify({
-                'error': {
-                    'code': 'INVALID_CONTENT_TYPE',
-                    'message': 'Content-Type must be application/json'
-                }
-            }), 400
-        
-        password_data = request.get_json()
+        # Parse JSON body; None means wrong Content-Type or malformed JSON
+        password_data = request.get_json(silent=True)
+        if password_data is None:
+            return json_bytes_response(_INVALID_CONTENT_TYPE_BODY, 400)
         
         # Validate required fields
         if not password_data or not password_data.get('current_password') or not password_data.get('new_password'):
@@ -198,6 +266,7 @@ def change_password():
             password_data['current_password'],
             password_data['new_password']
         )
+        invalidate_user_statistics(current_user.id)
         
         if success:
             return jsonify({
@@ -219,22 +288,11 @@ def change_password():
             }
         }), 400
     except UserServiceError as e:
-        logger.error(f"Service error changing password for user {current_user.id}: {str(e)}")
-        return jsonify({
-            'error': {
-                'code': 'SERVICE_ERROR',
-                'message': 'Failed to change password',
-                'details': str(e)
-            }
-        }), 500
+        logger.error("Service error changing password for user %s: %s", current_user.id, e)
+        return json_error_details_response(_CHANGE_PASSWORD_SERVICE_ERROR, str(e), 500)
     except Exception as e:
-        logger.error(f"Unexpected error changing password for user {current_user.id}: {str(e)}")
-        return jsonify({
-            'error': {
-                'code': 'INTERNAL_ERROR',
-                'message': 'An unexpected error occurred'
-            }
-        }), 500
+        logger.error("Unexpected error changing password for user %s: %s", current_user.id, e)
+        return json_bytes_response(_INTERNAL_ERROR_BODY, 500)
 
 
 @users_bp.route('/me/deactivate', methods=['POST'])
@@ -250,33 +308,23 @@ def deactivate_account():
         # Deactivate user using service layer
         user_service = get_user_service()
         deactivated_user = user_service.deactivate_user(current_user.id)
+        invalidate_user_statistics(current_user.id)
         
         return jsonify({
             'message': 'Account deactivated successfully',
             'user': {
                 'id': deactivated_user.id,
                 'is_active': deactivated_user.is_active,
-                'updated_at': deactivated_user.updated_at.isoformat() if deactivated_user.updated_at else None
+                'updated_at': deactivated_user.updated_at
             }
         }), 200
         
     except UserServiceError as e:
-        logger.error(f"Service error deactivating account for user {current_user.id}: {str(e)}")
-        return jsonify({
-            'error': {
-                'code': 'SERVICE_ERROR',
-                'message': 'Failed to deactivate account',
-                'details': str(e)
-            }
-        }), 500
+        logger.error("Service error deactivating account for user %s: %s", current_user.id, e)
+        return json_error_details_response(_DEACTIVATE_SERVICE_ERROR, str(e), 500)
     except Exception as e:
-        logger.error(f"Unexpected error deactivating account for user {current_user.id}: {str(e)}")
-        return jsonify({
-            'error': {
-                'code': 'INTERNAL_ERROR',
-                'message': 'An unexpected error occurred'
-            }
-        }), 500
+        logger.error("Unexpected error deactivating account for user %s: %s", current_user.id, e)
+        return json_bytes_response(_INTERNAL_ERROR_BODY, 500)
 
 
 @users_bp.route('/me/statistics', methods=['GET'])
@@ -289,51 +337,29 @@ def get_user_statistics():
         JSON response with user statistics
     """
     try:
-        # Get user statistics using service layer
-        user_service = get_user_service()
-        stats = user_service.get_user_statistics(current_user.id)
+        # Get user statistics using service layer (briefly cached)
+        stats = _get_cached_statistics(current_user.id)
         
         return jsonify({
             'statistics': stats
         }), 200
         
     except UserServiceError as e:
-        logger.error(f"Service error getting statistics for user {current_user.id}: {str(e)}")
-        return jsonify({
-            'error': {
-                'code': 'SERVICE_ERROR',
-                'message': 'Failed to retrieve user statistics',
-                'details': str(e)
-            }
-        }), 500
+        logger.error("Service error getting statistics for user %s: %s", current_user.id, e)
+        return json_error_details_response(_STATISTICS_SERVICE_ERROR, str(e), 500)
     except Exception as e:
-        logger.error(f"Unexpected error getting statistics for user {current_user.id}: {str(e)}")
-        return jsonify({
-            'error': {
-                'code': 'INTERNAL_ERROR',
-                'message': 'An unexpected error occurred'
-            }
-        }), 500
+        logger.error("Unexpected error getting statistics for user %s: %s", current_user.id, e)
+        return json_bytes_response(_INTERNAL_ERROR_BODY, 500)
 
 
 # Error handlers for the blueprint
 @users_bp.errorhandler(404)
 def handle_not_found(error):
     """Handle 404 errors within the users API"""
-    return jsonify({
-        'error': {
-            'code': 'NOT_FOUND',
-            'message': 'The requested resource was not found'
-        }
-    }), 404
+    return json_bytes_response(_NOT_FOUND_BODY, 404)
 
 
 @users_bp.errorhandler(405)
 def handle_method_not_allowed(error):
     """Handle 405 errors within the users API"""
-    return jsonify({
-        'error': {
-            'code': 'METHOD_NOT_ALLOWED',
-            'message': 'The requested method is not allowed for this resource'
-        }
-    }), 405
\ No newline at end of file
+    return json_bytes_response(_METHOD_NOT_ALLOWED_BODY, 405)
\ No newline at end of file
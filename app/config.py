@@ -5,11 +5,51 @@ Supports environment-based configuration with validation
 import os
 from typing import Optional, List
 from dotenv import load_dotenv
+from sqlalchemy.pool import StaticPool
 
 # Load environment variables from .env file
 load_dotenv()
 
 
+def build_engine_options(database_uri: Optional[str]) -> dict:
+    """
+    Build SQLAlchemy engine options for a database URI
+    
+    Connection pool settings only apply to server databases; SQLite keeps
+    the pooling chosen by Flask-SQLAlchemy.
+    
+    Args:
+        database_uri: Database connection URI
+    
+    Returns:
+        dict: Options for SQLALCHEMY_ENGINE_OPTIONS
+    """
+    if not database_uri or database_uri.startswith('sqlite'):
+        return {}
+    
+    options = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 20)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+    }
+    
+    # Set DB_STATEMENT_TIMEOUT_MS=0 for poolers that reject startup options (e.g. PgBouncer)
+    statement_timeout = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 5000))
+    if database_uri.startswith('postgres') and statement_timeout > 0:
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    
+    return options
+
+
+# Flask-Caching backends shared by all worker processes
+SHARED_CACHE_TYPES = frozenset({
+    'RedisCache', 'RedisSentinelCache', 'RedisClusterCache',
+    'MemcachedCache', 'SASLMemcachedCache',
+})
+
+
 class Config:
     """Base configuration class"""
     
@@ -19,11 +59,35 @@ class Config:
     # Database settings
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = build_engine_options(SQLALCHEMY_DATABASE_URI)
     
     # CORS settings
-    CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '*').split(',')
-    CORS_METHODS = ['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS']
-    CORS_HEADERS = ['Content-Type', 'Authorization']
+    CORS_ORIGINS = tuple(
+        origin.strip() for origin in os.environ.get('CORS_ORIGINS', '*').split(',') if origin.strip()
+    )
+    CORS_ORIGINS_SET = frozenset(CORS_ORIGINS)
+    CORS_METHODS = ('GET', 'POST', 'PUT', 'DELETE', 'OPTIONS')
+    CORS_HEADERS = ('Content-Type', 'Authorization')
+    
+    # Response compression settings
+    COMPRESS_MIMETYPES = ['application/json']
+    COMPRESS_LEVEL = 6
+    COMPRESS_MIN_SIZE = 500
+    
+    # Cache settings
+    # Set CACHE_TYPE=RedisCache and CACHE_REDIS_URL to share the cache between workers
+    CACHE_TYPE = os.environ.get('CACHE_TYPE', 'SimpleCache')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+    CACHE_DEFAULT_TIMEOUT = 30
+    # Analytics are cached for minutes and invalidated by a version bump, which
+    # only reaches other workers through a shared backend
+    ANALYTICS_CACHE_ENABLED = CACHE_TYPE in SHARED_CACHE_TYPES
+    
+    # Logging settings
+    # Error handler log records are written by a background thread
+    ERROR_LOG_QUEUE_ENABLED = True
+    # Set ERROR_LOG_FORMAT=json to write those records as JSON lines to stderr
+    ERROR_LOG_FORMAT = os.environ.get('ERROR_LOG_FORMAT', 'text')
     
     # OAuth settings
     GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID')
@@ -31,6 +95,9 @@ class Config:
     GITHUB_CLIENT_ID = os.environ.get('GITHUB_CLIENT_ID')
     GITHUB_CLIENT_SECRET = os.environ.get('GITHUB_CLIENT_SECRET')
     
+    # Environment variables that must be set for this configuration
+    REQUIRED_VARS = ('SECRET_KEY',)
+    
     @classmethod
     def validate_required_vars(cls) -> tuple[bool, List[str]]:
         """
@@ -39,8 +106,7 @@ class Config:
         Returns:
             tuple: (is_valid, missing_vars)
         """
-        required_vars = ['SECRET_KEY']
-        missing_vars = [var for var in required_vars if not os.environ.get(var)]
+        missing_vars = [var for var in cls.REQUIRED_VARS if not os.environ.get(var)]
         return len(missing_vars) == 0, missing_vars
 
 
@@ -49,28 +115,28 @@ class DevelopmentConfig(Config):
     DEBUG = True
     TESTING = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('DEV_DATABASE_URL', 'sqlite:///dev.db')
+    SQLALCHEMY_ENGINE_OPTIONS = build_engine_options(SQLALCHEMY_DATABASE_URI)
     
-    @classmethod
-    def validate_required_vars(cls) -> tuple[bool, List[str]]:
-        """Development has relaxed requirements"""
-        required_vars = []  # No required vars for development
-        missing_vars = [var for var in required_vars if not os.environ.get(var)]
-        return len(missing_vars) == 0, missing_vars
+    # Development has relaxed requirements
+    REQUIRED_VARS = ()
 
 
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {'poolclass': StaticPool}
     WTF_CSRF_ENABLED = False
     SECRET_KEY = os.environ.get('SECRET_KEY', 'test-secret-key-for-testing-purposes-only')
     
-    @classmethod
-    def validate_required_vars(cls) -> tuple[bool, List[str]]:
-        """Testing has minimal requirements"""
-        required_vars = []  # No required vars for testing
-        missing_vars = [var for var in required_vars if not os.environ.get(var)]
-        return len(missing_vars) == 0, missing_vars
+    # Keep logging synchronous so tests can capture records
+    ERROR_LOG_QUEUE_ENABLED = False
+    
+    # Tests run in a single process, so the in-memory cache is shared
+    ANALYTICS_CACHE_ENABLED = True
+    
+    # Testing has minimal requirements
+    REQUIRED_VARS = ()
 
 
 class ProductionConfig(Config):
@@ -78,12 +144,8 @@ class ProductionConfig(Config):
     DEBUG = False
     TESTING = False
     
-    @classmethod
-    def validate_required_vars(cls) -> tuple[bool, List[str]]:
-        """Production requires all critical environment variables"""
-        required_vars = ['SECRET_KEY', 'DATABASE_URL']
-        missing_vars = [var for var in required_vars if not os.environ.get(var)]
-        return len(missing_vars) == 0, missing_vars
+    # Production requires all critical environment variables
+    REQUIRED_VARS = ('SECRET_KEY', 'DATABASE_URL')
 
 
 # Configuration mapping
@@ -3,10 +3,12 @@ Global Error Handlers
 
 Centralized error handling for the Flask application with standardized JSON responses
 """
-from flask import jsonify, request, current_app
-from werkzeug.exceptions import HTTPException
+from flask import g, request, Request
+from werkzeug.exceptions import HTTPException, InternalServerError
+import atexit
 import logging
-import traceback
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from typing import Tuple, Dict, Any
 
 from .exceptions import (
@@ -14,325 +16,350 @@ from .exceptions import (
     AuthenticationError, BusinessLogicError, ResourceNotFoundError,
     ConflictError, RateLimitError, ExternalServiceError, ConfigurationError
 )
+from .utils.json_logging import JsonLogFormatter
+from .utils.json_provider import encode_json, json_bytes_response
 
 logger = logging.getLogger(__name__)
 
+_log_listener = None
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Queue handler that leaves message and traceback formatting to the listener thread"""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _start_log_listener(json_format: bool = False):
+    """Route this module's log records through a queue drained by a background thread"""
+    global _log_listener
+    if _log_listener is not None:
+        return
+    
+    if json_format:
+        json_handler = logging.StreamHandler()
+        json_handler.setFormatter(JsonLogFormatter())
+        handlers = [json_handler]
+    else:
+        # Forward to the handlers the records would otherwise reach through propagation
+        handlers = logger.handlers + logging.getLogger().handlers
+        if not handlers:
+            return
+    
+    log_queue = queue.SimpleQueue()
+    _log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    logger.handlers = [_DeferredQueueHandler(log_queue)]
+    logger.propagate = False
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
+
+def _json_response(payload: Dict[str, Any], status: int):
+    """Encode an error payload with orjson, independent of the app's JSON provider"""
+    return json_bytes_response(encode_json(payload), status)
+
+
+def _encode_http_error_prefix(code: str, message: str, timestamp: Any) -> bytes:
+    """Encode the constant part of an HTTP error body up to the value of "path" """
+    body = encode_json({
+        'error': {'code': code, 'message': message, 'timestamp': timestamp},
+        'path': None
+    })
+    return body[:-len(b'null}')]
+
+
+def _http_error_response(prefix: bytes, status: int, req: Request):
+    """Complete a pre-encoded HTTP error body with the request path and method"""
+    body = prefix + encode_json(req.path) + b',"method":' + encode_json(req.method) + b'}'
+    return json_bytes_response(body, status)
+
+
+# Status code, log level, log format and extra log arguments per exception class.
+# The log format receives error.message followed by the extra arguments.
+_EXCEPTION_HANDLING = {
+    ValidationError: (
+        400, logging.WARNING, "Validation error: %s - Details: %s",
+        lambda error, req: (error.details,)
+    ),
+    AuthenticationError: (
+        401, logging.WARNING, "Authentication error: %s - IP: %s",
+        lambda error, req: (req.remote_addr,)
+    ),
+    AuthorizationError: (
+        403, logging.WARNING, "Authorization error: %s - User: %s - Resource: %s",
+        lambda error, req: (g.get('user_id', 'unknown'), error.resource)
+    ),
+    ResourceNotFoundError: (
+        404, logging.INFO, "Resource not found: %s - Path: %s",
+        lambda error, req: (req.path,)
+    ),
+    ConflictError: (
+        409, logging.WARNING, "Conflict error: %s - Resource: %s",
+        lambda error, req: (error.conflicting_resource,)
+    ),
+    BusinessLogicError: (
+        422, logging.WARNING, "Business logic error: %s - Rule: %s",
+        lambda error, req: (error.rule,)
+    ),
+    RateLimitError: (
+        429, logging.WARNING, "Rate limit exceeded: %s - IP: %s",
+        lambda error, req: (req.remote_addr,)
+    ),
+    ExternalServiceError: (
+        502, logging.ERROR, "External service error: %s - Service: %s - Status: %s",
+        lambda error, req: (error.service, error.status_code)
+    ),
+    ConfigurationError: (
+        500, logging.ERROR, "Configuration error: %s - Setting: %s",
+        lambda error, req: (error.setting,)
+    ),
+    HabitTrackerException: (
+        500, logging.ERROR, "Application error: %s - Code: %s",
+        lambda error, req: (error.error_code,)
+    ),
+}
+
+
+def _get_exception_handling(error_class: type) -> tuple:
+    """
+    Find the handling entry for an exception class
+    
+    Subclasses such as service-level errors use the entry of their closest
+    registered base class. The result is stored so later lookups are a single dict access.
+    """
+    handling = _EXCEPTION_HANDLING.get(error_class)
+    if handling is None:
+        handling = next(
+            _EXCEPTION_HANDLING[base] for base in error_class.__mro__ if base in _EXCEPTION_HANDLING
+        )
+        _EXCEPTION_HANDLING[error_class] = handling
+    return handling
+
 
 def register_error_handlers(app):
     """Register all error handlers with the Flask application"""
     
-    @app.errorhandler(ValidationError)
-    def handle_validation_error(error: ValidationError) -> Tuple[Dict[str, Any], int]:
-        """Handle validation errors with 400 Bad Request"""
-        logger.warning(f"Validation error: {error.message} - Details: {error.details}")
-        
-        return jsonify({
-            'error': error.to_dict(),
-            'path': request.path,
-            'method': request.method
-        }), 400
+    # Keep JSON output compact and unsorted even when the app uses Flask's default provider
+    app.json.compact = True
+    app.json.sort_keys = False
     
-    @app.errorhandler(AuthenticationError)
-    def handle_authentication_error(error: AuthenticationError) -> Tuple[Dict[str, Any], int]:
-        """Handle authentication errors with 401 Unauthorized"""
-        logger.warning(f"Authentication error: {error.message} - IP: {request.remote_addr}")
-        
-        return jsonify({
-            'error': error.to_dict(),
-            'path': request.path,
-            'method': request.method
-        }), 401
+    # Debug mode is fixed once the app is configured
+    debug_enabled = app.config.get('DEBUG')
     
-    @app.errorhandler(AuthorizationError)
-    def handle_authorization_error(error: AuthorizationError) -> Tuple[Dict[str, Any], int]:
-        """Handle authorization errors with 403 Forbidden"""
-        logger.warning(f"Authorization error: {error.message} - User: {getattr(request, 'user_id', 'unknown')} - Resource: {error.resource}")
-        
-        return jsonify({
-            'error': error.to_dict(),
-            'path': request.path,
-            'method': request.method
-        }), 403
+    if app.config.get('ERROR_LOG_QUEUE_ENABLED'):
+        _start_log_listener(app.config.get('ERROR_LOG_FORMAT') == 'json')
     
-    @app.errorhandler(ResourceNotFoundError)
-    def handle_not_found_error(error: ResourceNotFoundError) -> Tuple[Dict[str, Any], int]:
-        """Handle resource not found errors with 404 Not Found"""
-        logger.info(f"Resource not found: {error.message} - Path: {request.path}")
-        
-        return jsonify({
-            'error': error.to_dict(),
-            'path': request.path,
-            'method': request.method
-        }), 404
-    
-    @app.errorhandler(ConflictError)
-    def handle_conflict_error(error: ConflictError) -> Tuple[Dict[str, Any], int]:
-        """Handle conflict errors with 409 Conflict"""
-        logger.warning(f"Conflict error: {error.message} - Resource: {error.conflicting_resource}")
-        
-        return jsonify({
-            'error': error.to_dict(),
-            'path': request.path,
-            'method': request.method
-        }), 409
+    # HTTP error timestamps are a fixed placeholder in tests and null otherwise
+    test_timestamp = '2024-01-01T00:00:00' if app.config.get('TESTING') else None
     
-    @app.errorhandler(BusinessLogicError)
-    def handle_business_logic_error(error: BusinessLogicError) -> Tuple[Dict[str, Any], int]:
-        """Handle business logic errors with 422 Unprocessable Entity"""
-        logger.warning(f"Business logic error: {error.message} - Rule: {error.rule}")
-        
-        return jsonify({
-            'error': error.to_dict(),
-            'path': request.path,
-            'method': request.method
-        }), 422
+    # Bodies of HTTP errors with constant messages differ only in path and method
+    http_error_prefixes = {
+        401: _encode_http_error_prefix('UNAUTHORIZED', 'Authentication required', test_timestamp),
+        403: _encode_http_error_prefix('FORBIDDEN', 'Access forbidden', test_timestamp),
+        404: _encode_http_error_prefix('NOT_FOUND', 'The requested resource was not found', test_timestamp),
+        413: _encode_http_error_prefix('PAYLOAD_TOO_LARGE', 'Request payload is too large', test_timestamp),
+        415: _encode_http_error_prefix('UNSUPPORTED_MEDIA_TYPE', 'Unsupported media type', test_timestamp),
+        429: _encode_http_error_prefix('TOO_MANY_REQUESTS', 'Too many requests', test_timestamp),
+    }
     
-    @app.errorhandler(RateLimitError)
-    def handle_rate_limit_error(error: RateLimitError) -> Tuple[Dict[str, Any], int]:
-        """Handle rate limit errors with 429 Too Many Requests"""
-        logger.warning(f"Rate limit exceeded: {error.message} - IP: {request.remote_addr}")
+    def handle_habit_tracker_exception(error: HabitTrackerException) -> Tuple[Dict[str, Any], int]:
+        """Handle application exceptions using the status and log format of their class"""
+        req = request._get_current_object()
+        status, level, log_format, log_args = _get_exception_handling(type(error))
+        logger.log(level, log_format, error.message, *log_args(error, req))
         
-        response = jsonify({
+        response = _json_response({
             'error': error.to_dict(),
-            'path': request.path,
-            'method': request.method
-        })
+            'path': req.path,
+            'method': req.method
+        }, status)
         
         # Add Retry-After header if specified
-        if error.retry_after:
+        if status == 429 and error.retry_after:
             response.headers['Retry-After'] = str(error.retry_after)
         
-        return response, 429
-    
-    @app.errorhandler(ExternalServiceError)
-    def handle_external_service_error(error: ExternalServiceError) -> Tuple[Dict[str, Any], int]:
-        """Handle external service errors with 502 Bad Gateway"""
-        logger.error(f"External service error: {error.message} - Service: {error.service} - Status: {error.status_code}")
-        
-        return jsonify({
-            'error': error.to_dict(),
-            'path': request.path,
-            'method': request.method
-        }), 502
+        return response
     
-    @app.errorhandler(ConfigurationError)
-    def handle_configuration_error(error: ConfigurationError) -> Tuple[Dict[str, Any], int]:
-        """Handle configuration errors with 500 Internal Server Error"""
-        logger.error(f"Configuration error: {error.message} - Setting: {error.setting}")
-        
-        return jsonify({
-            'error': error.to_dict(),
-            'path': request.path,
-            'method': request.method
-        }), 500
-    
-    @app.errorhandler(HabitTrackerException)
-    def handle_habit_tracker_exception(error: HabitTrackerException) -> Tuple[Dict[str, Any], int]:
-        """Handle generic application exceptions with 500 Internal Server Error"""
-        logger.error(f"Application error: {error.message} - Code: {error.error_code}")
-        
-        return jsonify({
-            'error': error.to_dict(),
-            'path': request.path,
-            'method': request.method
-        }), 500
-    
-    @app.errorhandler(400)
     def handle_bad_request(error: HTTPException) -> Tuple[Dict[str, Any], int]:
         """Handle HTTP 400 Bad Request errors"""
-        logger.warning(f"Bad request: {error.description} - Path: {request.path}")
+        req = request._get_current_object()
+        logger.warning("Bad request: %s - Path: %s", error.description, req.path)
         
-        return jsonify({
+        return _json_response({
             'error': {
                 'code': 'BAD_REQUEST',
                 'message': error.description or 'Bad request',
-                'timestamp': current_app.config.get('TESTING') and '2024-01-01T00:00:00' or None
+                'timestamp': test_timestamp
             },
-            'path': request.path,
-            'method': request.method
-        }), 400
+            'path': req.path,
+            'method': req.method
+        }, 400)
     
-    @app.errorhandler(401)
     def handle_unauthorized(error: HTTPException) -> Tuple[Dict[str, Any], int]:
         """Handle HTTP 401 Unauthorized errors"""
-        logger.warning(f"Unauthorized access: {request.path} - IP: {request.remote_addr}")
+        req = request._get_current_object()
+        logger.warning("Unauthorized access: %s - IP: %s", req.path, req.remote_addr)
         
-        return jsonify({
-            'error': {
-                'code': 'UNAUTHORIZED',
-                'message': 'Authentication required',
-                'timestamp': current_app.config.get('TESTING') and '2024-01-01T00:00:00' or None
-            },
-            'path': request.path,
-            'method': request.method
-        }), 401
+        return _http_error_response(http_error_prefixes[401], 401, req)
     
-    @app.errorhandler(403)
     def handle_forbidden(error: HTTPException) -> Tuple[Dict[str, Any], int]:
         """Handle HTTP 403 Forbidden errors"""
-        logger.warning(f"Forbidden access: {request.path} - IP: {request.remote_addr}")
+        req = request._get_current_object()
+        logger.warning("Forbidden access: %s - IP: %s", req.path, req.remote_addr)
         
-        return jsonify({
-            'error': {
-                'code': 'FORBIDDEN',
-                'message': 'Access forbidden',
-                'timestamp': current_app.config.get('TESTING') and '2024-01-01T00:00:00' or None
-            },
-            'path': request.path,
-            'method': request.method
-        }), 403
+        return _http_error_response(http_error_prefixes[403], 403, req)
     
-    @app.errorhandler(404)
     def handle_not_found(error: HTTPException) -> Tuple[Dict[str, Any], int]:
         """Handle HTTP 404 Not Found errors"""
-        logger.info(f"Not found: {request.path}")
+        req = request._get_current_object()
+        logger.info("Not found: %s", req.path)
         
-        return jsonify({
-            'error': {
-                'code': 'NOT_FOUND',
-                'message': 'The requested resource was not found',
-                'timestamp': current_app.config.get('TESTING') and '2024-01-01T00:00:00' or None
-            },
-            'path': request.path,
-            'method': request.method
-        }), 404
+        return _http_error_response(http_error_prefixes[404], 404, req)
     
-    @app.errorhandler(405)
     def handle_method_not_allowed(error: HTTPException) -> Tuple[Dict[str, Any], int]:
         """Handle HTTP 405 Method Not Allowed errors"""
-        logger.warning(f"Method not allowed: {request.method} {request.path}")
+        req = request._get_current_object()
+        logger.warning("Method not allowed: %s %s", req.method, req.path)
         
-        return jsonify({
+        return _json_response({
             'error': {
                 'code': 'METHOD_NOT_ALLOWED',
-                'message': f'Method {request.method} not allowed for this resource',
-                'timestamp': current_app.config.get('TESTING') and '2024-01-01T00:00:00' or None
+                'message': f'Method {req.method} not allowed for this resource',
+                'timestamp': test_timestamp
             },
-            'path': request.path,
-            'method': request.method
-        }), 405
+            'path': req.path,
+            'method': req.method
+        }, 405)
     
-    @app.errorhandler(413)
     def handle_payload_too_large(error: HTTPException) -> Tuple[Dict[str, Any], int]:
         """Handle HTTP 413 Payload Too Large errors"""
-        logger.warning(f"Payload too large: {request.path} - Content-Length: {request.content_length}")
+        req = request._get_current_object()
+        logger.warning("Payload too large: %s - Content-Length: %s", req.path, req.content_length)
         
-        return jsonify({
-            'error': {
-                'code': 'PAYLOAD_TOO_LARGE',
-                'message': 'Request payload is too large',
-                'timestamp': current_app.config.get('TESTING') and '2024-01-01T00:00:00' or None
-            },
-            'path': request.path,
-            'method': request.method
-        }), 413
+        return _http_error_response(http_error_prefixes[413], 413, req)
     
-    @app.errorhandler(415)
     def handle_unsupported_media_type(error: HTTPException) -> Tuple[Dict[str, Any], int]:
         """Handle HTTP 415 Unsupported Media Type errors"""
-        logger.warning(f"Unsupported media type: {request.content_type} - Path: {request.path}")
+        req = request._get_current_object()
+        logger.warning("Unsupported media type: %s - Path: %s", req.content_type, req.path)
         
-        return jsonify({
-            'error': {
-                'code': 'UNSUPPORTED_MEDIA_TYPE',
-                'message': 'Unsupported media type',
-                'timestamp': current_app.config.get('TESTING') and '2024-01-01T00:00:00' or None
-            },
-            'path': request.path,
-            'method': request.method
-        }), 415
+        return _http_error_response(http_error_prefixes[415], 415, req)
     
-    @app.errorhandler(429)
     def handle_too_many_requests(error: HTTPException) -> Tuple[Dict[str, Any], int]:
         """Handle HTTP 429 Too Many Requests errors"""
-        logger.warning(f"Too many requests: {request.path} - IP: {request.remote_addr}")
+        req = request._get_current_object()
+        logger.warning("Too many requests: %s - IP: %s", req.path, req.remote_addr)
         
-        return jsonify({
-            'error': {
-                'code': 'TOO_MANY_REQUESTS',
-                'message': 'Too many requests',
-                'timestamp': current_app.config.get('TESTING') and '2024-01-01T00:00:00' or None
-            },
-            'path': request.path,
-            'method': request.method
-        }), 429
+        return _http_error_response(http_error_prefixes[429], 429, req)
     
-    @app.errorhandler(500)
     def handle_internal_server_error(error: HTTPException) -> Tuple[Dict[str, Any], int]:
         """Handle HTTP 500 Internal Server Error"""
-        # Log the full traceback for debugging
-        logger.error(f"Internal server error: {request.path}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        req = request._get_current_object()
+        # Log the full traceback for debugging; it is formatted when the record is emitted
+        logger.error("Internal server error: %s", req.path, exc_info=True)
         
         # Don't expose internal error details in production
-        if current_app.config.get('DEBUG'):
-            message = str(error) if str(error) != '500 Internal Server Error: The server encountered an internal error and was unable to complete your request. Either the server is overloaded or there is an error in the application.' else 'An internal server error occurred'
+        description = error.description if debug_enabled else None
+        if description and description != InternalServerError.description:
+            message = description
         else:
             message = 'An internal server error occurred'
         
-        return jsonify({
+        return _json_response({
             'error': {
                 'code': 'INTERNAL_SERVER_ERROR',
                 'message': message,
-                'timestamp': current_app.config.get('TESTING') and '2024-01-01T00:00:00' or None
+                'timestamp': test_timestamp
             },
-            'path': request.path,
-            'method': request.method
-        }), 500
+            'path': req.path,
+            'method': req.method
+        }, 500)
     
-    @app.errorhandler(Exception)
     def handle_unexpected_error(error: Exception) -> Tuple[Dict[str, Any], int]:
         """Handle unexpected exceptions"""
-        # Log the full traceback for debugging
-        logger.error(f"Unexpected error: {request.path}")
-        logger.error(f"Error type: {type(error).__name__}")
-        logger.error(f"Error message: {str(error)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        req = request._get_current_object()
+        # Log the full traceback for debugging; it is formatted when the record is emitted
+        logger.error(
+            "Unexpected error: %s - %s: %s", req.path, type(error).__name__, error,
+            exc_info=error
+        )
         
         # Don't expose internal error details in production
-        if current_app.config.get('DEBUG'):
+        if debug_enabled:
             message = f"Unexpected error: {str(error)}"
         else:
             message = 'An unexpected error occurred'
         
-        return jsonify({
+        return _json_response({
             'error': {
                 'code': 'UNEXPECTED_ERROR',
                 'message': message,
-                'timestamp': current_app.config.get('TESTING') and '2024-01-01T00:00:00' or None
+                'timestamp': test_timestamp
             },
-            'path': request.path,
-            'method': request.method
-        }), 500
+            'path': req.path,
+            'method': req.method
+        }, 500)
+    
+    http_error_handlers = {
+        400: handle_bad_request,
+        401: handle_unauthorized,
+        403: handle_forbidden,
+        404: handle_not_found,
+        405: handle_method_not_allowed,
+        413: handle_payload_too_large,
+        415: handle_unsupported_media_type,
+        429: handle_too_many_requests,
+        500: handle_internal_server_error,
+    }
+    
+    # A single app-level handler dispatches on the error type itself.
+    # Blueprint-specific handlers still take precedence for their codes.
+    @app.errorhandler(Exception)
+    def dispatch_error(error: Exception):
+        """Route an error to the handler for its exception family or HTTP status code"""
+        if isinstance(error, HabitTrackerException):
+            return handle_habit_tracker_exception(error)
+        if isinstance(error, HTTPException):
+            return http_error_handlers.get(error.code, handle_unexpected_error)(error)
+        return handle_unexpected_error(error)
 
 
 def log_request_info():
     """Log request information for debugging"""
-    if current_app.config.get('DEBUG'):
-        logger.debug(f"Request: {request.method} {request.path}")
-        logger.debug(f"Headers: {dict(request.headers)}")
-        if request.is_json:
-            try:
-                json_data = request.get_json(silent=True)
-                if json_data:
-                    logger.debug(f"JSON data: {json_data}")
-            except Exception:
-                logger.debug("JSON data: <failed to parse>")
-        elif request.form:
-            logger.debug(f"Form data: {dict(request.form)}")
+    # Skip building header and body dumps when DEBUG records would be filtered out
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    
+    logger.debug("Request: %s %s", request.method, request.path)
+    logger.debug("Headers: %s", request.headers)
+    if request.is_json:
+        try:
+            json_data = request.get_json(silent=True)
+            if json_data:
+                logger.debug("JSON data: %s", json_data)
+        except Exception:
+            logger.debug("JSON data: <failed to parse>")
+    elif request.form:
+        logger.debug("Form data: %s", request.form)
 
 
 def setup_request_logging(app):
     """Set up request logging for debugging"""
+    # Debug mode is fixed once the app is configured, so check it only once
+    debug_enabled = app.debug
     
     @app.before_request
     def before_request():
         """Log request information before processing"""
+        if not debug_enabled:
+            return
         log_request_info()
     
     @app.after_request
     def after_request(response):
         """Log response information after processing"""
-        if current_app.config.get('DEBUG'):
-            logger.debug(f"Response: {response.status_code}")
-        return response
\ No newline at end of file
+        if not debug_enabled:
+            return response
+        logger.debug("Response: %s", response.status_code)
+        return response
@@ -5,11 +5,14 @@ Application-specific exceptions for standardized error handling
 """
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+import time
 
 
 class HabitTrackerException(Exception):
     """Base exception for all Habit Tracker application errors"""
     
+    __slots__ = ('message', 'error_code', 'details', '_ts_epoch', '_dict_cache')
+    
     def __init__(self, message: str, error_code: str = None, details: Any = None):
         """
         Initialize base exception
@@ -22,26 +25,43 @@ class HabitTrackerException(Exception):
         self.message = message
         self.error_code = error_code or self.__class__.__name__.upper()
         self.details = details
-        self.timestamp = datetime.utcnow()
+        # Only the epoch time is recorded here; it is formatted when the error is serialized
+        self._ts_epoch = time.time()
+        self._dict_cache = None
         super().__init__(message)
     
+    @property
+    def timestamp(self) -> datetime:
+        """UTC time at which the exception was created"""
+        return datetime.utcfromtimestamp(self._ts_epoch)
+    
     def to_dict(self) -> Dict[str, Any]:
-        """Convert exception to dictionary for JSON serialization"""
-        error_dict = {
-            'code': self.error_code,
-            'message': self.message,
-            'timestamp': self.timestamp.isoformat()
-        }
-        
-        if self.details:
-            error_dict['details'] = self.details
+        """
+        Convert exception to dictionary for JSON serialization
+        
+        The dictionary is built on the first call and reused afterwards,
+        so callers must not modify it.
+        """
+        if self._dict_cache is None:
+            error_dict = {
+                'code': self.error_code,
+                'message': self.message,
+                'timestamp': self.timestamp.isoformat()
+            }
             
-        return error_dict
+            if self.details:
+                error_dict['details'] = self.details
+            
+            self._dict_cache = error_dict
+            
+        return self._dict_cache
 
 
 class ValidationError(HabitTrackerException):
     """Raised when data validation fails"""
     
+    __slots__ = ('errors', 'field')
+    
     def __init__(self, errors: List[str], field: str = None):
         """
         Initialize validation error
@@ -58,12 +78,11 @@ class ValidationError(HabitTrackerException):
         else:
             message = "Data validation failed"
             
-        details = []
-        for error in errors:
-            error_detail = {'message': error}
-            if field:
-                error_detail['field'] = field
-            details.append(error_detail)
+        # The field is shared by all messages, so it is stored once
+        if field:
+            details = {'field': field, 'messages': list(errors)}
+        else:
+            details = list(errors)
         
         super().__init__(message, 'VALIDATION_ERROR', details)
 
@@ -71,6 +90,8 @@ class ValidationError(HabitTrackerException):
 class AuthorizationError(HabitTrackerException):
     """Raised when user lacks permission for an operation"""
     
+    __slots__ = ('resource', 'action')
+    
     def __init__(self, message: str = "Access denied", resource: str = None, action: str = None):
         """
         Initialize authorization error
@@ -95,6 +116,8 @@ class AuthorizationError(HabitTrackerException):
 class AuthenticationError(HabitTrackerException):
     """Raised when authentication fails"""
     
+    __slots__ = ()
+    
     def __init__(self, message: str = "Authentication failed"):
         """
         Initialize authentication error
@@ -108,6 +131,8 @@ class AuthenticationError(HabitTrackerException):
 class BusinessLogicError(HabitTrackerException):
     """Raised when business logic rules are violated"""
     
+    __slots__ = ('rule', 'context')
+    
     def __init__(self, message: str, rule: str = None, context: Dict[str, Any] = None):
         """
         Initialize business logic error
@@ -132,6 +157,8 @@ class BusinessLogicError(HabitTrackerException):
 class ResourceNotFoundError(HabitTrackerException):
     """Raised when a requested resource is not found"""
     
+    __slots__ = ('resource_type', 'resource_id')
+    
     def __init__(self, resource_type: str, resource_id: Any = None, message: str = None):
         """
         Initialize resource not found error
@@ -160,6 +187,8 @@ class ResourceNotFoundError(HabitTrackerException):
 class ConflictError(HabitTrackerException):
     """Raised when a resource conflict occurs"""
     
+    __slots__ = ('conflicting_resource',)
+    
     def __init__(self, message: str, conflicting_resource: str = None):
         """
         Initialize conflict error
@@ -180,6 +209,8 @@ class ConflictError(HabitTrackerException):
 class RateLimitError(HabitTrackerException):
     """Raised when rate limits are exceeded"""
     
+    __slots__ = ('retry_after',)
+    
     def __init__(self, message: str = "Rate limit exceeded", retry_after: int = None):
         """
         Initialize rate limit error
@@ -200,6 +231,8 @@ class RateLimitError(HabitTrackerException):
 class ExternalServiceError(HabitTrackerException):
     """Raised when external service calls fail"""
     
+    __slots__ = ('service', 'status_code')
+    
     def __init__(self, service: str, message: str = None, status_code: int = None):
         """
         Initialize external service error
@@ -225,6 +258,8 @@ class ExternalServiceError(HabitTrackerException):
 class ConfigurationError(HabitTrackerException):
     """Raised when application configuration is invalid"""
     
+    __slots__ = ('setting',)
+    
     def __init__(self, setting: str, message: str = None):
         """
         Initialize configuration error
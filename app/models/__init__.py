@@ -3,6 +3,15 @@ Data Models Package
 
 Enhanced models with new fields and business logic
 """
+import threading
+
+from . import habit_types
+from . import user
+from . import habit
+from . import habit_log
+from . import category
+from . import tag
+from . import comment
 
 # Global model classes - will be set after initialization
 User = None
@@ -15,23 +24,26 @@ habit_tags = None
 
 # Track if models have been initialized
 _models_initialized = False
+_models = None
+_db = None
+_init_lock = threading.Lock()
 
 def init_db(database):
     """Initialize models with database instance"""
-    global User, Habit, HabitLog, Category, Tag, Comment, habit_tags, _models_initialized
-    
-    # Only initialize once
+    # Fast path once the models exist
     if _models_initialized:
         return
     
-    # Import all model modules and create model classes
-    from . import habit_types
-    from . import user
-    from . import habit
-    from . import habit_log
-    from . import category
-    from . import tag
-    from . import comment
+    with _init_lock:
+        _create_models(database)
+
+def _create_models(database):
+    """Create model classes; must be called with _init_lock held"""
+    global User, Habit, HabitLog, Category, Tag, Comment, habit_tags, _models, _db, _models_initialized
+    
+    # Another thread may have finished initialization while we waited for the lock
+    if _models_initialized:
+        return
     
     # Create model classes with database instance
     User = user.create_user_model(database)
@@ -50,6 +62,15 @@ def init_db(database):
     tag.habit_tags = habit_tags
     comment.Comment = Comment
     
+    # Bind sibling models used inside model methods
+    user.Habit = Habit
+    user.HabitLog = HabitLog
+    habit.HabitLog = HabitLog
+    
+    # Build the tuple returned by get_models() once
+    _models = (User, Habit, HabitLog, Category, Tag, Comment)
+    _db = database
+    
     # Mark as initialized
     _models_initialized = True
 
@@ -58,13 +79,19 @@ from .habit_types import HabitType
 
 def get_models():
     """Get model classes after initialization"""
-    if not _models_initialized:
+    if _models is None:
+        raise RuntimeError("Models not initialized. Call init_db() first.")
+    return _models
+
+def get_db():
+    """Get the database instance the models were initialized with"""
+    if _db is None:
         raise RuntimeError("Models not initialized. Call init_db() first.")
-    return User, Habit, HabitLog, Category, Tag, Comment
+    return _db
 
 def reset_models():
     """Reset models for testing purposes"""
-    global User, Habit, HabitLog, Category, Tag, Comment, habit_tags, _models_initialized
+    global User, Habit, HabitLog, Category, Tag, Comment, habit_tags, _models, _db, _models_initialized
     User = None
     Habit = None
     HabitLog = None
@@ -72,12 +99,15 @@ def reset_models():
     Tag = None
     Comment = None
     habit_tags = None
+    _models = None
+    _db = None
     _models_initialized = False
 
 __all__ = [
     'HabitType',
     'init_db',
     'get_models',
+    'get_db',
     'reset_models',
     'User',
     'Habit', 
@@ -3,7 +3,10 @@
 
 Модель для организации привычек по категориям
 """
-from datetime import datetime, timezone
+from sqlalchemy import func, select
+from sqlalchemy.orm import column_property
+
+from ..utils.dates import utcnow
 
 # Это будет инициализировано фабрикой приложения
 db = None
@@ -14,6 +17,9 @@ def create_category_model(database):
     global db
     db = database
     
+    # Модель Habit создается раньше, поэтому ее таблица уже есть в метаданных
+    habits_table = db.Model.metadata.tables['habits']
+    
     class Category(db.Model):
         """
         Модель категории для организации привычек
@@ -25,12 +31,20 @@ def create_category_model(database):
         name = db.Column(db.String(50), nullable=False)
         color = db.Column(db.String(7), default='#6366f1')  # Hex цвет
         icon = db.Column(db.String(50))  # Имя иконки
-        created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+        created_at = db.Column(db.DateTime, server_default=utcnow(), index=True)
         
         # Связи
         habits = db.relationship('Habit', backref='category', lazy=True)
         user = db.relationship('User', backref='categories')
         
+        # Количество привычек считается в SQL, без загрузки связанных объектов
+        habits_count = column_property(
+            select(func.count(habits_table.c.id))
+            .where(habits_table.c.category_id == id)
+            .correlate_except(habits_table)
+            .scalar_subquery()
+        )
+        
         # Индексы и ограничения
         __table_args__ = (
             db.UniqueConstraint('user_id', 'name', name='unique_user_category'),
@@ -54,7 +68,7 @@ def create_category_model(database):
                 'color': self.color,
                 'icon': self.icon,
                 'created_at': self.created_at.isoformat() if self.created_at else None,
-                'habits_count': len(self.habits)
+                'habits_count': self.habits_count
             }
     
     return Category
@@ -3,7 +3,9 @@
 
 Модель для добавления комментариев к выполнению привычек
 """
-from datetime import datetime, timezone
+from sqlalchemy import event, inspect
+
+from ..utils.dates import utcnow
 
 # Это будет инициализировано фабрикой приложения
 db = None
@@ -24,9 +26,10 @@ def create_comment_model(database):
         habit_id = db.Column(db.Integer, db.ForeignKey('habits.id'), nullable=False, index=True)
         habit_log_id = db.Column(db.Integer, db.ForeignKey('habit_logs.id'), nullable=False, index=True)
         text = db.Column(db.String(500), nullable=False)
-        created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
-        updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), 
-                              onupdate=lambda: datetime.now(timezone.utc))
+        # Время проставляется базой данных, а не Python-колбэками
+        created_at = db.Column(db.DateTime, server_default=utcnow(), index=True)
+        updated_at = db.Column(db.DateTime, server_default=utcnow(), onupdate=utcnow())
+        is_edited = db.Column(db.Boolean, default=False, nullable=False)
         
         # Связи
         habit = db.relationship('Habit', backref='comments')
@@ -55,9 +58,15 @@ def create_comment_model(database):
                 'text': self.text,
                 'created_at': self.created_at.isoformat() if self.created_at else None,
                 'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-                'is_edited': self.created_at != self.updated_at if self.created_at and self.updated_at else False
+                'is_edited': self.is_edited
             }
     
+    @event.listens_for(Comment, 'before_update')
+    def mark_comment_edited(mapper, connection, target):
+        """Отметить комментарий как отредактированный при изменении текста"""
+        if inspect(target).attrs.text.history.has_changes():
+            target.is_edited = True
+    
     return Comment
 
 
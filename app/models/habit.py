@@ -3,12 +3,111 @@ Habit Model
 
 Enhanced habit model with new fields for improved tracking
 """
+from collections import defaultdict
 from datetime import datetime, timezone, timedelta
 from .habit_types import HabitType
+from ..utils.dates import today_utc
 
 # This will be initialized by the app factory
 db = None
 
+# Sibling model classes, bound by app.models.init_db once all models exist
+HabitLog = None
+
+# Named frequencies for Habit.get_frequency_description; a missing frequency means daily
+_FREQUENCY_NAMES = {
+    None: "Ежедневно",
+    0: "Ежедневно",
+    1: "Ежедневно",
+    7: "Еженедельно",
+    30: "Ежемесячно",
+}
+
+# Computed (query-backed) fields available through Habit.to_dict.
+# Each getter receives the habit and the fields computed so far, so later
+# fields can reuse earlier results instead of recomputing them.
+COMPUTED_FIELDS = {
+    'completion_rate': lambda habit, data: habit.get_completion_rate(),
+    'can_complete_today': lambda habit, data: habit.can_be_completed_today(),
+    'next_due_date': lambda habit, data: _isoformat_or_none(
+        habit.get_next_due_date(can_complete=data.get('can_complete_today'))
+    ),
+    'execution_time_minutes': lambda habit, data: habit.get_execution_time_minutes(),
+    'frequency_description': lambda habit, data: habit.get_frequency_description(),
+}
+
+
+# Archived habits are not actionable, so their log-based fields are static
+ARCHIVED_COMPUTED_VALUES = {
+    'completion_rate': None,
+    'can_complete_today': False,
+    'next_due_date': None,
+}
+
+
+def _isoformat_or_none(value):
+    """Format a date for API output, keeping None as is"""
+    return value.isoformat() if value else None
+
+
+def check_business_rules(data):
+    """
+    Check habit business rules against plain habit data
+    
+    Shared by Habit.validate_business_rules and HabitValidator, so invalid
+    input can be rejected before a Habit instance is constructed.
+    
+    Args:
+        data: Dictionary with habit_type, reward, related_habit_id,
+            execution_time, frequency and name
+    
+    Returns:
+        tuple: (is_valid: bool, errors: List[str])
+    """
+    errors = []
+    
+    habit_type = data.get('habit_type')
+    if isinstance(habit_type, str):
+        try:
+            habit_type = HabitType(habit_type)
+        except ValueError:
+            habit_type = None
+    reward = data.get('reward')
+    has_related = bool(data.get('related_habit_id'))
+    execution_time = data.get('execution_time')
+    frequency = data.get('frequency')
+    name = data.get('name')
+    
+    if habit_type is HabitType.PLEASANT:
+        # Rule 1: Pleasant habits cannot have rewards
+        if reward:
+            errors.append("Приятная привычка не может иметь вознаграждение")
+        
+        # Rule 2: Pleasant habits cannot be related to other habits
+        if has_related:
+            errors.append("Приятная привычка не может быть связана с другой привычкой")
+    
+    # Rule 3: Useful habits can have either reward OR related habit, but not both
+    elif habit_type is HabitType.USEFUL and reward and has_related:
+        errors.append("Полезная привычка может иметь либо вознаграждение, либо связанную привычку, но не оба")
+    
+    # Rule 4: Execution time must be <= 120 seconds
+    if execution_time and execution_time > 120:
+        errors.append("Время выполнения не может превышать 120 секунд")
+    
+    # Rule 5: Frequency must be >= 7 days
+    if frequency and frequency < 7:
+        errors.append("Периодичность не может быть чаще чем раз в 7 дней")
+    
+    # Rule 6: Name cannot be empty
+    if not name or name.isspace():
+        errors.append("Название привычки не может быть пустым")
+    
+    # Rule 7: Reward length limit
+    if reward and len(reward) > 200:
+        errors.append("Вознаграждение не может превышать 200 символов")
+    
+    return not errors, errors
 
 def create_habit_model(database):
     """Create Habit model with database instance"""
@@ -44,13 +143,19 @@ def create_habit_model(database):
                               onupdate=lambda: datetime.now(timezone.utc))
         is_archived = db.Column(db.Boolean, default=False)
         
+        # Denormalized completion summary, kept in sync by HabitLog
+        last_completed_date = db.Column(db.Date, nullable=True, index=True)
+        completions_count = db.Column(db.Integer, nullable=False, default=0)
+        
         # Relationships
-        logs = db.relationship('HabitLog', backref='habit', lazy=True, cascade='all, delete-orphan')
+        user = db.relationship('User', back_populates='habits')
+        logs = db.relationship('HabitLog', back_populates='habit', lazy='select', cascade='all, delete-orphan')
         related_habit = db.relationship('Habit', remote_side=[id], backref='related_habits')
         
         # Indexes for performance
         __table_args__ = (
             db.Index('idx_habits_user_type', 'user_id', 'habit_type'),
+            db.Index('idx_habits_user_archived', 'user_id', 'is_archived'),
             db.Index('idx_habits_frequency', 'frequency'),
             db.Index('idx_habits_related', 'related_habit_id'),
         )
@@ -65,64 +170,70 @@ def create_habit_model(database):
             Returns:
                 tuple: (is_valid: bool, errors: List[str])
             """
-            errors = []
-            
-            # Rule 1: Pleasant habits cannot have rewards
-            if self.habit_type == HabitType.PLEASANT and self.reward:
-                errors.append("Приятная привычка не может иметь вознаграждение")
-            
-            # Rule 2: Pleasant habits cannot be related to other habits
-            if self.habit_type == HabitType.PLEASANT and self.related_habit_id:
-                errors.append("Приятная привычка не может быть связана с другой привычкой")
-            
-            # Rule 3: Useful habits can have either reward OR related habit, but not both
-            if (self.habit_type == HabitType.USEFUL and 
-                self.reward and self.related_habit_id):
-                errors.append("Полезная привычка может иметь либо вознаграждение, либо связанную привычку, но не оба")
-            
-            # Rule 4: Execution time must be <= 120 seconds
-            if self.execution_time and self.execution_time > 120:
-                errors.append("Время выполнения не может превышать 120 секунд")
-            
-            # Rule 5: Frequency must be >= 7 days
-            if self.frequency and self.frequency < 7:
-                errors.append("Периодичность не может быть чаще чем раз в 7 дней")
-            
-            # Rule 6: Name cannot be empty
-            if not self.name or not self.name.strip():
-                errors.append("Название привычки не может быть пустым")
-            
-            # Rule 7: Reward length limit
-            if self.reward and len(self.reward) > 200:
-                errors.append("Вознаграждение не может превышать 200 символов")
-            
-            return len(errors) == 0, errors
+            return check_business_rules({
+                'habit_type': self.habit_type,
+                'reward': self.reward,
+                'related_habit_id': self.related_habit_id,
+                'execution_time': self.execution_time,
+                'frequency': self.frequency,
+                'name': self.name,
+            })
         
         def get_last_7_days(self):
             """
             Get the completion status for the last 7 days
             Returns a list of dictionaries with date and completion status
+            
+            The result is memoized per instance for the current day and reset
+            by invalidate_computed_cache() whenever a completion changes.
+            The returned list is shared and must not be mutated by callers.
             """
-            today = datetime.now(timezone.utc).date()
-            last_7_days = []
+            today = today_utc()
+            cached = self.__dict__.get('_last_7_days_cache')
+            if cached is not None and cached[0] == today:
+                return cached[1]
             
-            for i in range(6, -1, -1):
-                date = today - timedelta(days=i)
-                
-                # Import here to avoid circular imports
-                from .habit_log import HabitLog
-                log = HabitLog.query.filter_by(
-                    habit_id=self.id,
-                    date=date
-                ).first()
+            start = today - timedelta(days=6)
+            
+            # Load the whole window in one query instead of one query per day
+            completed_by_date = {
+                log_date: completed
+                for log_date, completed in db.session.query(HabitLog.date, HabitLog.completed).filter(
+                    HabitLog.habit_id == self.id,
+                    HabitLog.date >= start,
+                    HabitLog.date <= today
+                )
+            }
+            
+            return self._store_last_7_days(today, completed_by_date)
+        
+        def _store_last_7_days(self, today, completed_by_date):
+            """
+            Build and memoize the 7-day window from a {date: completed} mapping
+            
+            Args:
+                today: Last day of the window
+                completed_by_date: Completion flags of this habit's logs in the window
                 
-                last_7_days.append({
+            Returns:
+                list: Days in the same format as get_last_7_days()
+            """
+            start = today - timedelta(days=6)
+            days = [start + timedelta(days=i) for i in range(7)]
+            result = [
+                {
                     'date': date,
-                    'completed': log.completed if log else False,
+                    'completed': bool(completed_by_date.get(date, False)),
                     'date_str': date.strftime('%b %d')
-                })
-            
-            return last_7_days
+                }
+                for date in days
+            ]
+            self._last_7_days_cache = (today, result)
+            return result
+        
+        def invalidate_computed_cache(self):
+            """Drop memoized log-based values after this habit's completions change"""
+            self.__dict__.pop('_last_7_days_cache', None)
         
         def get_completion_rate(self):
             """
@@ -142,58 +253,43 @@ def create_habit_model(database):
             if not self.frequency:
                 return True  # Default to daily if no frequency set
             
-            today = datetime.now(timezone.utc).date()
-            
-            # Import here to avoid circular imports
-            from .habit_log import HabitLog
-            
-            # Find the last completion
-            last_log = HabitLog.query.filter_by(
-                habit_id=self.id,
-                completed=True
-            ).order_by(HabitLog.date.desc()).first()
-            
-            if not last_log:
+            if self.last_completed_date is None:
                 return True  # Never completed, can be done today
             
             # Check if enough days have passed
-            days_since_last = (today - last_log.date).days
+            today = today_utc()
+            days_since_last = (today - self.last_completed_date).days
             return days_since_last >= self.frequency
         
-        def get_next_due_date(self):
+        def get_next_due_date(self, can_complete=None):
             """
             Get the next date when this habit is due
             
+            Args:
+                can_complete: Already known can_be_completed_today() result, if any
+            
             Returns:
                 date: Next due date or None if can be done today
             """
-            if self.can_be_completed_today():
-                return datetime.now(timezone.utc).date()
-            
-            # Import here to avoid circular imports
-            from .habit_log import HabitLog
-            
-            last_log = HabitLog.query.filter_by(
-                habit_id=self.id,
-                completed=True
-            ).order_by(HabitLog.date.desc()).first()
+            if can_complete is None:
+                can_complete = self.can_be_completed_today()
+            if can_complete:
+                return today_utc()
             
-            if last_log:
-                return last_log.date + timedelta(days=self.frequency)
-            
-            return datetime.now(timezone.utc).date()
+            return self.last_completed_date + timedelta(days=self.frequency)
         
         def is_pleasant_habit(self):
             """Check if this is a pleasant habit"""
-            return self.habit_type == HabitType.PLEASANT
+            return self.habit_type is HabitType.PLEASANT
         
         def is_useful_habit(self):
             """Check if this is a useful habit"""
-            return self.habit_type == HabitType.USEFUL
+            return self.habit_type is HabitType.USEFUL
         
         def has_reward(self):
             """Check if this habit has a reward"""
-            return bool(self.reward and self.reward.strip())
+            reward = self.reward
+            return bool(reward) and not reward.isspace()
         
         def has_related_habit(self):
             """Check if this habit is related to another habit"""
@@ -205,43 +301,103 @@ def create_habit_model(database):
         
         def get_frequency_description(self):
             """Get human-readable frequency description"""
-            if not self.frequency:
-                return "Ежедневно"
-            elif self.frequency == 1:
-                return "Ежедневно"
-            elif self.frequency == 7:
-                return "Еженедельно"
-            elif self.frequency == 30:
-                return "Ежемесячно"
-            else:
-                return f"Каждые {self.frequency} дней"
+            frequency = self.frequency
+            return _FREQUENCY_NAMES.get(frequency) or f"Каждые {frequency} дней"
         
-        def to_dict(self):
+        def _serialized_columns(self):
+            """
+            Get column-backed fields as a dictionary, memoized per instance
+
+            The cache is keyed by (id, updated_at), so any committed change
+            to the habit produces a fresh representation.
+
+            Returns:
+                dict: Column data (shared, must not be mutated by callers)
+            """
+            key = (self.id, self.updated_at)
+            cached = getattr(self, '_serialized_cache', None)
+            if cached is None or cached[0] != key:
+                cached = (key, {
+                    'id': self.id,
+                    'user_id': self.user_id,
+                    'name': self.name,
+                    'description': self.description,
+                    'execution_time': self.execution_time,
+                    'frequency': self.frequency,
+                    'habit_type': self.habit_type.value if self.habit_type else None,
+                    'reward': self.reward,
+                    'related_habit_id': self.related_habit_id,
+                    'category_id': self.category_id,
+                    'tracking_days': self.tracking_days or 7,
+                    'created_at': self.created_at.isoformat() if self.created_at else None,
+                    'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+                    'is_archived': self.is_archived
+                })
+                self._serialized_cache = cached
+            return cached[1]
+        
+        def to_dict(self, *, fields=None):
             """
             Convert habit to dictionary for API responses
             
+            Args:
+                fields: Optional iterable of keys to include (default: all).
+                        Computed fields are only evaluated when requested.
+            
             Returns:
                 dict: Habit data as dictionary
             """
-            return {
-                'id': self.id,
-                'user_id': self.user_id,
-                'name': self.name,
-                'description': self.description,
-                'execution_time': self.execution_time,
-                'frequency': self.frequency,
-                'habit_type': self.habit_type.value if self.habit_type else 'useful',
-                'reward': self.reward,
-                'related_habit_id': self.related_habit_id,
-                'created_at': self.created_at.isoformat() if self.created_at else None,
-                'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-                'is_archived': self.is_archived,
-                'completion_rate': self.get_completion_rate(),
-                'can_complete_today': self.can_be_completed_today(),
-                'next_due_date': self.get_next_due_date().isoformat() if self.get_next_due_date() else None,
-                'execution_time_minutes': self.get_execution_time_minutes(),
-                'frequency_description': self.get_frequency_description()
-            }
+            columns = self._serialized_columns()
+            if fields is None:
+                data = dict(columns)
+                wanted = COMPUTED_FIELDS
+            else:
+                data = {key: columns[key] for key in fields if key in columns}
+                wanted = fields
+            
+            archived = columns['is_archived']
+            for key in COMPUTED_FIELDS:
+                if key in wanted:
+                    if archived and key in ARCHIVED_COMPUTED_VALUES:
+                        data[key] = ARCHIVED_COMPUTED_VALUES[key]
+                    else:
+                        data[key] = COMPUTED_FIELDS[key](self, data)
+            
+            return data
+        
+        @classmethod
+        def bulk_to_dict(cls, habits, *, fields=None):
+            """
+            Convert many habits to dictionaries for API responses
+            
+            Logs of all habits for the last 7 days are loaded with one query
+            up front, so completion rates do not cost a query per habit.
+            
+            Args:
+                habits: List of Habit instances
+                fields: Optional iterable of keys to include (default: all)
+                
+            Returns:
+                List[dict]: Habit data in the order of habits
+            """
+            # Archived habits get static log-based fields, see ARCHIVED_COMPUTED_VALUES
+            active_habits = [habit for habit in habits if not habit.is_archived]
+            if active_habits and (fields is None or 'completion_rate' in fields):
+                today = today_utc()
+                completed_by_habit = defaultdict(dict)
+                for habit_id, log_date, completed in db.session.query(
+                    HabitLog.habit_id, HabitLog.date, HabitLog.completed
+                ).filter(
+                    HabitLog.habit_id.in_([habit.id for habit in active_habits]),
+                    HabitLog.date >= today - timedelta(days=6),
+                    HabitLog.date <= today
+                ):
+                    completed_by_habit[habit_id][log_date] = completed
+                
+                for habit in active_habits:
+                    habit._store_last_7_days(today, completed_by_habit.get(habit.id, {}))
+            
+            return [habit.to_dict(fields=fields) for habit in habits]
         
         @classmethod
         def create_with_validation(cls, **kwargs):
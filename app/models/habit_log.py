@@ -4,16 +4,42 @@ Habit Log Model
 Model for tracking daily completion status for each habit
 """
 from datetime import datetime, timezone
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.attributes import set_committed_value
+from ..utils.analytics_cache import invalidate_analytics_cache, invalidate_user_statistics
 
 # This will be initialized by the app factory
 db = None
 
+# session.info key collecting users whose completions changed in the transaction
+_STALE_ANALYTICS_USERS = 'stale_analytics_users'
+
+
+def _invalidate_stale_analytics(session):
+    """Drop cached analytics of users whose completion changes were committed"""
+    for user_id in session.info.pop(_STALE_ANALYTICS_USERS, ()):
+        invalidate_analytics_cache(user_id)
+        invalidate_user_statistics(user_id)
+
+
+def _discard_stale_analytics(session):
+    """Forget pending invalidations when the transaction is rolled back"""
+    session.info.pop(_STALE_ANALYTICS_USERS, None)
+
 
 def create_habit_log_model(database):
     """Create HabitLog model with database instance"""
     global db
     db = database
     
+    # Invalidate only after commit: bumping the version mid-flush would let a
+    # concurrent request cache pre-commit data under the new version
+    if not event.contains(db.session, 'after_commit', _invalidate_stale_analytics):
+        event.listen(db.session, 'after_commit', _invalidate_stale_analytics)
+        event.listen(db.session, 'after_rollback', _discard_stale_analytics)
+    
     class HabitLog(db.Model):
         """
         HabitLog model tracking daily completion status for each habit
@@ -28,10 +54,20 @@ def create_habit_log_model(database):
         duration = db.Column(db.Integer, nullable=True)  # Actual duration in seconds
         created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
         
+        # Relationships
+        habit = db.relationship('Habit', back_populates='logs')
+        
         # Ensure one log per habit per date and optimize foreign key relationships
         __table_args__ = (
             db.UniqueConstraint('habit_id', 'date', name='unique_habit_date'),
-            db.Index('idx_habit_date', 'habit_id', 'date'),
+            # Covers range scans on date that also read completed (7-day window, analytics)
+            db.Index('idx_habit_date_completed', 'habit_id', 'date', 'completed'),
+            # Partial index for MAX(date) of completed logs (last completion, analytics)
+            db.Index(
+                'idx_habit_completed_date', 'habit_id', 'date',
+                postgresql_where=db.text('completed = true'),
+                sqlite_where=db.text('completed = 1')
+            ),
         )
         
         def __repr__(self):
@@ -67,10 +103,25 @@ def create_habit_log_model(database):
                 HabitLog: Existing or new habit log
             """
             log = cls.query.filter_by(habit_id=habit_id, date=date).first()
-            if not log:
+            if log:
+                return log
+            
+            # RETURNING from an upsert needs PostgreSQL in SQLAlchemy 1.4
+            if db.engine.dialect.name != 'postgresql':
                 log = cls(habit_id=habit_id, date=date, completed=False)
                 db.session.add(log)
-            return log
+                return log
+            
+            # A concurrent request may create the same log; the no-op update makes
+            # the unique conflict return the existing row in the same round trip
+            insert = postgresql.insert(cls.__table__).values(
+                habit_id=habit_id, date=date, completed=False
+            )
+            upsert = insert.on_conflict_do_update(
+                index_elements=['habit_id', 'date'],
+                set_={'habit_id': insert.excluded.habit_id}
+            ).returning(*cls.__table__.c)
+            return db.session.execute(select(cls).from_statement(upsert)).scalar_one()
         
         def toggle_completion(self):
             """
@@ -82,6 +133,69 @@ def create_habit_log_model(database):
             self.completed = not self.completed
             return self.completed
     
+    def refresh_last_completed_date(connection, target):
+        """Recompute the completion summary of the habit of this log"""
+        logs = HabitLog.__table__
+        habits = db.Model.metadata.tables['habits']
+        
+        last_completed, completions_count = connection.execute(
+            select(func.max(logs.c.date), func.count()).where(
+                logs.c.habit_id == target.habit_id,
+                logs.c.completed.is_(True)
+            )
+        ).one()
+        
+        # Keep updated_at as is: logging a completion is not an edit of the habit
+        connection.execute(
+            habits.update().where(habits.c.id == target.habit_id).values(
+                last_completed_date=last_completed,
+                completions_count=completions_count,
+                updated_at=habits.c.updated_at
+            )
+        )
+        
+        # Sync a habit already loaded in the session without triggering a lazy load mid-flush
+        session = object_session(target)
+        habit = None
+        if session is not None:
+            habit_mapper = HabitLog.habit.property.mapper
+            habit = session.identity_map.get(habit_mapper.identity_key_from_primary_key([target.habit_id]))
+        if habit is not None:
+            set_committed_value(habit, 'last_completed_date', last_completed)
+            set_committed_value(habit, 'completions_count', completions_count)
+            habit.invalidate_computed_cache()
+            user_id = habit.user_id
+        else:
+            user_id = connection.execute(
+                select(habits.c.user_id).where(habits.c.id == target.habit_id)
+            ).scalar()
+        
+        # Completion changes are what analytics count; cached results go stale on commit
+        if session is not None:
+            session.info.setdefault(_STALE_ANALYTICS_USERS, set()).add(user_id)
+        else:
+            invalidate_analytics_cache(user_id)
+            invalidate_user_statistics(user_id)
+    
+    @event.listens_for(HabitLog, 'after_insert')
+    def habit_log_inserted(mapper, connection, target):
+        """Update the last completion date when a completed log is added"""
+        if target.completed:
+            refresh_last_completed_date(connection, target)
+    
+    @event.listens_for(HabitLog, 'after_update')
+    def habit_log_updated(mapper, connection, target):
+        """Update the last completion date when completion status or date changes"""
+        attrs = inspect(target).attrs
+        if attrs.completed.history.has_changes() or attrs.date.history.has_changes():
+            refresh_last_completed_date(connection, target)
+    
+    @event.listens_for(HabitLog, 'after_delete')
+    def habit_log_deleted(mapper, connection, target):
+        """Update the last completion date when a completed log is removed"""
+        if target.completed:
+            refresh_last_completed_date(connection, target)
+    
     return HabitLog
 
 
@@ -4,6 +4,8 @@
 Модель для добавления тегов к привычкам
 """
 from datetime import datetime, timezone
+from sqlalchemy import func, select
+from sqlalchemy.orm import column_property
 
 # Это будет инициализировано фабрикой приложения
 db = None
@@ -35,6 +37,16 @@ def create_tag_model(database):
         habits = db.relationship('Habit', secondary=habit_tags, backref='tags')
         user = db.relationship('User', backref='tags')
         
+        # Количество привычек считается в SQL, без загрузки связанных объектов;
+        # отложено, так как теги чаще загружаются без него (списки тегов привычки)
+        habits_count = column_property(
+            select(func.count(habit_tags.c.habit_id))
+            .where(habit_tags.c.tag_id == id)
+            .correlate_except(habit_tags)
+            .scalar_subquery(),
+            deferred=True
+        )
+        
         # Индексы и ограничения
         __table_args__ = (
             db.UniqueConstraint('user_id', 'name', name='unique_user_tag'),
@@ -56,7 +68,7 @@ def create_tag_model(database):
                 'user_id': self.user_id,
                 'name': self.name,
                 'created_at': self.created_at.isoformat() if self.created_at else None,
-                'habits_count': len(self.habits)
+                'habits_count': self.habits_count
             }
     
     return Tag, habit_tags
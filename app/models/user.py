@@ -6,11 +6,58 @@ Enhanced user model for authentication and habit management
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import case, func, or_
+from ..utils.dates import today_utc
 
 # This will be initialized by the app factory
 db = None
 
+# Sibling model classes, bound by app.models.init_db once all models exist
+Habit = None
+HabitLog = None
+
+
+def _compute_stats_bulk(habits):
+    """
+    Compute completion statistics for habits with one aggregated log query
+    
+    Args:
+        habits: List of Habit instances
+        
+    Returns:
+        tuple: (completion_rates: List[int], habits_completed_today: int, habits_due_today: int)
+    """
+    today = today_utc()
+    week_start = today - timedelta(days=6)
+    
+    # Only the 7-day window is scanned; the last completion is stored on Habit
+    rows = db.session.query(
+        HabitLog.habit_id,
+        func.count(),
+        func.count(case((HabitLog.date == today, 1)))
+    ).filter(
+        HabitLog.habit_id.in_([habit.id for habit in habits]),
+        HabitLog.date.between(week_start, today),
+        HabitLog.completed.is_(True)
+    ).group_by(HabitLog.habit_id).all()
+    log_stats = {habit_id: values for habit_id, *values in rows}
+    
+    completion_rates = []
+    habits_completed_today = 0
+    habits_due_today = 0
+    
+    for habit in habits:
+        completed_this_week, completed_today = log_stats.get(habit.id, (0, 0))
+        # Same rule as Habit.get_completion_rate()
+        completion_rates.append(int((completed_this_week / 7) * 100))
+        if habit.can_be_completed_today():
+            habits_due_today += 1
+            if completed_today:
+                habits_completed_today += 1
+    
+    return completion_rates, habits_completed_today, habits_due_today
+
 
 def create_user_model(database):
     """Create User model with database instance"""
@@ -39,7 +86,7 @@ def create_user_model(database):
         default_tracking_days = db.Column(db.Integer, default=7)  # Период отслеживания по умолчанию
         
         # Relationship to habits
-        habits = db.relationship('Habit', backref='user', lazy=True, cascade='all, delete-orphan')
+        habits = db.relationship('Habit', back_populates='user', lazy='select', cascade='all, delete-orphan')
         
         def __repr__(self):
             return f'<User {self.email}>'
@@ -116,19 +163,21 @@ def create_user_model(database):
             Returns:
                 User: User instance
             """
-            user = User.query.filter_by(google_id=google_user['id']).first()
-            if not user:
-                user = User.query.filter_by(email=google_user['email']).first()
-                if user:
-                    user.google_id = google_user['id']
-                else:
-                    user = User(
-                        email=google_user['email'],
-                        google_id=google_user['id'],
-                        name=google_user.get('name'),
-                        avatar_url=google_user.get('picture')
-                    )
-                    db.session.add(user)
+            google_id = google_user['id']
+            user = User._find_oauth_user('google_id', google_id, google_user['email'])
+            if user is not None and user.google_id == google_id:
+                return user  # Already linked, nothing to commit
+            
+            if user:
+                user.google_id = google_id
+            else:
+                user = User(
+                    email=google_user['email'],
+                    google_id=google_id,
+                    name=google_user.get('name'),
+                    avatar_url=google_user.get('picture')
+                )
+                db.session.add(user)
             db.session.commit()
             return user
         
@@ -143,22 +192,48 @@ def create_user_model(database):
             Returns:
                 User: User instance
             """
-            user = User.query.filter_by(github_id=str(github_user['id'])).first()
-            if not user:
-                user = User.query.filter_by(email=github_user['email']).first()
-                if user:
-                    user.github_id = str(github_user['id'])
-                else:
-                    user = User(
-                        email=github_user.get('email') or f"{github_user['login']}@github.local",
-                        github_id=str(github_user['id']),
-                        name=github_user.get('name') or github_user['login'],
-                        avatar_url=github_user.get('avatar_url')
-                    )
-                    db.session.add(user)
+            github_id = str(github_user['id'])
+            user = User._find_oauth_user('github_id', github_id, github_user.get('email'))
+            if user is not None and user.github_id == github_id:
+                return user  # Already linked, nothing to commit
+            
+            if user:
+                user.github_id = github_id
+            else:
+                user = User(
+                    email=github_user.get('email') or f"{github_user['login']}@github.local",
+                    github_id=github_id,
+                    name=github_user.get('name') or github_user['login'],
+                    avatar_url=github_user.get('avatar_url')
+                )
+                db.session.add(user)
             db.session.commit()
             return user
         
+        @staticmethod
+        def _find_oauth_user(id_field, provider_id, email):
+            """
+            Find a user by OAuth provider ID or email with a single query
+            
+            Args:
+                id_field: Name of the provider ID column ('google_id' or 'github_id')
+                provider_id: User ID at the OAuth provider
+                email: Email reported by the provider, may be None
+                
+            Returns:
+                User: User with this provider ID, else user with this email, else None
+            """
+            condition = getattr(User, id_field) == provider_id
+            if email:
+                condition = or_(condition, User.email == email)
+            
+            # Both columns are unique, so at most two users match
+            candidates = User.query.filter(condition).all()
+            for user in candidates:
+                if getattr(user, id_field) == provider_id:
+                    return user
+            return candidates[0] if candidates else None
+        
         def get_active_habits(self):
             """
             Get all active (non-archived) habits for this user
@@ -166,7 +241,8 @@ def create_user_model(database):
             Returns:
                 List[Habit]: List of active habits
             """
-            return [habit for habit in self.habits if not habit.is_archived]
+            # Filter in SQL so archived habits are never loaded
+            return Habit.query.filter_by(user_id=self.id, is_archived=False).all()
         
         def get_habits_by_type(self, habit_type):
             """
@@ -178,50 +254,42 @@ def create_user_model(database):
             Returns:
                 List[Habit]: List of habits of the specified type
             """
-            return [habit for habit in self.get_active_habits() if habit.habit_type == habit_type]
+            return Habit.query.filter_by(
+                user_id=self.id,
+                is_archived=False,
+                habit_type=habit_type
+            ).all()
         
-        def get_completion_stats(self):
+        def get_completion_stats(self, active_habits=None):
             """
             Get completion statistics for this user
             
+            Args:
+                active_habits: Already loaded active habits (loaded if omitted)
+            
             Returns:
                 dict: Statistics including total habits, completion rates, etc.
             """
-            active_habits = self.get_active_habits()
+            if active_habits is None:
+                active_habits = self.get_active_habits()
             
             if not active_habits:
                 return {
                     'total_habits': 0,
                     'average_completion_rate': 0,
                     'habits_completed_today': 0,
-                    'streak_count': 0
+                    'habits_due_today': 0
                 }
             
             total_habits = len(active_habits)
-            completion_rates = [habit.get_completion_rate() for habit in active_habits]
+            completion_rates, habits_completed_today, habits_due_today = _compute_stats_bulk(active_habits)
             average_completion_rate = sum(completion_rates) / len(completion_rates)
             
-            # Count habits that can be completed today and are completed
-            today = datetime.now(timezone.utc).date()
-            habits_completed_today = 0
-            
-            for habit in active_habits:
-                if habit.can_be_completed_today():
-                    # Import here to avoid circular imports
-                    from .habit_log import HabitLog
-                    log = HabitLog.query.filter_by(
-                        habit_id=habit.id,
-                        date=today,
-                        completed=True
-                    ).first()
-                    if log:
-                        habits_completed_today += 1
-            
             return {
                 'total_habits': total_habits,
                 'average_completion_rate': round(average_completion_rate, 1),
                 'habits_completed_today': habits_completed_today,
-                'habits_due_today': len([h for h in active_habits if h.can_be_completed_today()])
+                'habits_due_today': habits_due_today
             }
         
         def to_dict(self):
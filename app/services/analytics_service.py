@@ -4,9 +4,10 @@
 Бизнес-логика для расчета статистики и аналитики привычек
 """
 from typing import List, Optional, Dict, Tuple
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
+from sqlalchemy import Date, case, func, literal, select
 from ..validators.tracking_days_validator import TrackingDaysValidator
-from ..models import get_models
+from ..models import get_db, get_models
 from ..exceptions import (
     ValidationError, ResourceNotFoundError, HabitTrackerException
 )
@@ -14,7 +15,7 @@ from ..exceptions import (
 
 class AnalyticsServiceError(HabitTrackerException):
     """Базовое исключение для ошибок AnalyticsService"""
-    pass
+    __slots__ = ()
 
 
 class AnalyticsService:
@@ -33,9 +34,8 @@ class AnalyticsService:
         # Получить модели после инициализации
         self.User, self.Habit, self.HabitLog, self.Category, self.Tag, self.Comment = get_models()
         
-        # Импортировать db из моделей
-        from ..models.habit_log import db
-        self.db = db
+        # Общий экземпляр базы данных моделей
+        self.db = get_db()
     
     def get_habit_statistics(self, habit_id: int, user_id: int, days: int = 7) -> Tuple[Optional[Dict], bool, List[str]]:
         """
@@ -55,44 +55,38 @@ class AnalyticsService:
             return None, False, result.errors
         
         try:
-            # Получить привычку
-            habit = self.Habit.query.filter_by(id=habit_id, user_id=user_id).first()
-            if not habit:
-                return None, False, ["Привычка не найдена"]
-            
-            # Получить логи за период
             today = datetime.now(timezone.utc).date()
             start_date = today - timedelta(days=days - 1)
             
-            logs = self.HabitLog.query.filter(
+            # Выполнения за период считаются подзапросом в том же запросе, что и привычка
+            period_completions = select(func.count(self.HabitLog.id)).where(
                 self.HabitLog.habit_id == habit_id,
-                self.HabitLog.date >= start_date,
-                self.HabitLog.date <= today
-            ).all()
+                self.HabitLog.date.between(start_date, today),
+                self.HabitLog.completed.is_(True)
+            ).scalar_subquery()
+            
+            # Получить только нужные столбцы привычки: без ORM-объекта и ленивых загрузок
+            habit = self.db.session.query(
+                self.Habit.name,
+                self.Habit.completions_count,
+                self.Habit.last_completed_date,
+                period_completions.label('completed_count')
+            ).filter_by(id=habit_id, user_id=user_id).first()
+            if not habit:
+                return None, False, ["Привычка не найдена"]
             
             # Рассчитать статистику
-            completed_count = sum(1 for log in logs if log.completed)
+            completed_count = habit.completed_count
             completion_percentage = int((completed_count / days) * 100) if days > 0 else 0
             
-            # Рассчитать текущий streak
-            current_streak = self._calculate_current_streak(habit_id)
-            
-            # Рассчитать лучший streak
-            best_streak = self._calculate_best_streak(habit_id)
+            # Рассчитать текущий и лучший streak одним запросом
+            current_streak, best_streak = self._calculate_streaks([habit_id], today)[habit_id]
             
-            # Получить общее количество выполнений
-            total_completions = self.HabitLog.query.filter_by(
-                habit_id=habit_id,
-                completed=True
-            ).count()
-            
-            # Получить последний день выполнения
-            last_completion = self.HabitLog.query.filter_by(
-                habit_id=habit_id,
-                completed=True
-            ).order_by(self.HabitLog.date.desc()).first()
-            
-            last_completion_date = last_completion.date.isoformat() if last_completion else None
+            # Общее количество и последний день выполнения хранятся в самой привычке
+            total_completions = habit.completions_count
+            last_completion_date = (
+                habit.last_completed_date.isoformat() if habit.last_completed_date else None
+            )
             
             return {
                 'habit_id': habit_id,
@@ -128,40 +122,30 @@ class AnalyticsService:
             return None, False, result.errors
         
         try:
-            # Получить категорию
-            category = self.Category.query.filter_by(id=category_id, user_id=user_id).first()
+            # Получить только имя категории
+            category = self.db.session.query(self.Category.name).filter_by(
+                id=category_id, user_id=user_id
+            ).first()
             if not category:
                 return None, False, ["Категория не найдена"]
             
-            # Получить все привычки в категории
-            habits = self.Habit.query.filter_by(category_id=category_id).all()
-            
-            if not habits:
-                return {
-                    'category_id': category_id,
-                    'category_name': category.name,
-                    'habits_count': 0,
-                    'average_completion_percentage': 0,
-                    'total_completions': 0,
-                    'period_days': days
-                }, True, []
-            
-            # Рассчитать статистику для каждой привычки
-            total_completion_percentage = 0
-            total_completions = 0
+            # Получить ID привычек в категории
+            habit_ids = [
+                habit_id for (habit_id,) in
+                self.db.session.query(self.Habit.id).filter_by(category_id=category_id)
+            ]
             
-            for habit in habits:
-                stats, is_valid, errors = self.get_habit_statistics(habit.id, user_id, days)
-                if is_valid and stats:
-                    total_completion_percentage += stats['completion_percentage']
-                    total_completions += stats['total_completions']
-            
-            average_completion_percentage = int(total_completion_percentage / len(habits)) if habits else 0
+            today = datetime.now(timezone.utc).date()
+            start_date = today - timedelta(days=days - 1)
+            counts = self._get_completion_counts(habit_ids, start_date, today)
+            average_completion_percentage, total_completions = self._summarize_completions(
+                habit_ids, counts, days
+            )
             
             return {
                 'category_id': category_id,
                 'category_name': category.name,
-                'habits_count': len(habits),
+                'habits_count': len(habit_ids),
                 'average_completion_percentage': average_completion_percentage,
                 'total_completions': total_completions,
                 'period_days': days
@@ -186,8 +170,10 @@ class AnalyticsService:
             return None, False, result.errors
         
         try:
-            # Получить все привычки пользователя
-            habits = self.Habit.query.filter_by(user_id=user_id).all()
+            # Получить привычки пользователя (только нужные столбцы)
+            habits = self.db.session.query(
+                self.Habit.id, self.Habit.category_id
+            ).filter_by(user_id=user_id).all()
             
             if not habits:
                 return {
@@ -199,26 +185,38 @@ class AnalyticsService:
                     'categories': []
                 }, True, []
             
-            # Рассчитать общую статистику
-            total_completion_percentage = 0
-            total_completions = 0
+            # Все счетчики выполнений считаются одним запросом и переиспользуются для категорий
+            today = datetime.now(timezone.utc).date()
+            start_date = today - timedelta(days=days - 1)
+            habit_ids = [habit_id for habit_id, _ in habits]
+            counts = self._get_completion_counts(habit_ids, start_date, today)
             
-            for habit in habits:
-                stats, is_valid, errors = self.get_habit_statistics(habit.id, user_id, days)
-                if is_valid and stats:
-                    total_completion_percentage += stats['completion_percentage']
-                    total_completions += stats['total_completions']
+            average_completion_percentage, total_completions = self._summarize_completions(
+                habit_ids, counts, days
+            )
             
-            average_completion_percentage = int(total_completion_percentage / len(habits)) if habits else 0
+            # Сгруппировать привычки по категориям
+            habits_by_category = {}
+            for habit_id, category_id in habits:
+                habits_by_category.setdefault(category_id, []).append(habit_id)
             
             # Получить статистику по категориям
-            categories = self.Category.query.filter_by(user_id=user_id).all()
+            categories = self.db.session.query(
+                self.Category.id, self.Category.name
+            ).filter_by(user_id=user_id).all()
             category_stats = []
             
-            for category in categories:
-                cat_stats, is_valid, errors = self.get_category_statistics(category.id, user_id, days)
-                if is_valid and cat_stats:
-                    category_stats.append(cat_stats)
+            for category_id, category_name in categories:
+                category_habit_ids = habits_by_category.get(category_id, [])
+                cat_average, cat_total = self._summarize_completions(category_habit_ids, counts, days)
+                category_stats.append({
+                    'category_id': category_id,
+                    'category_name': category_name,
+                    'habits_count': len(category_habit_ids),
+                    'average_completion_percentage': cat_average,
+                    'total_completions': cat_total,
+                    'period_days': days
+                })
             
             return {
                 'user_id': user_id,
@@ -231,63 +229,129 @@ class AnalyticsService:
         except Exception as e:
             return None, False, [f"Ошибка при расчете аналитики: {str(e)}"]
     
-    def _calculate_current_streak(self, habit_id: int) -> int:
+    def _get_completion_counts(self, habit_ids: List[int], start_date, end_date) -> Dict[int, Tuple[int, int]]:
         """
-        Рассчитать текущий streak (количество дней подряд выполнения)
+        Посчитать выполнения привычек за период и за все время одним запросом
         
         Args:
-            habit_id: ID привычки
+            habit_ids: ID привычек
+            start_date: Начало периода
+            end_date: Конец периода
             
         Returns:
-            int: Текущий streak
+            Dict[int, Tuple[int, int]]: habit_id -> (выполнений за период, выполнений всего);
+            привычки без выполнений отсутствуют
         """
-        today = datetime.now(timezone.utc).date()
-        streak = 0
+        if not habit_ids:
+            return {}
         
-        for i in range(365):  # Проверить до 365 дней назад
-            check_date = today - timedelta(days=i)
-            log = self.HabitLog.query.filter_by(
-                habit_id=habit_id,
-                date=check_date,
-                completed=True
-            ).first()
+        rows = self.db.session.query(
+            self.HabitLog.habit_id,
+            func.count(case((self.HabitLog.date.between(start_date, end_date), 1))),
+            func.count()
+        ).filter(
+            self.HabitLog.habit_id.in_(habit_ids),
+            self.HabitLog.completed.is_(True)
+        ).group_by(self.HabitLog.habit_id).all()
+        
+        return {habit_id: (period_count, total_count) for habit_id, period_count, total_count in rows}
+    
+    @staticmethod
+    def _summarize_completions(habit_ids: List[int], counts: Dict[int, Tuple[int, int]], days: int) -> Tuple[int, int]:
+        """
+        Рассчитать средний процент выполнения и общее количество выполнений
+        
+        Args:
+            habit_ids: ID привычек
+            counts: Результат _get_completion_counts
+            days: Количество дней в периоде
             
-            if log:
-                streak += 1
-            else:
-                break
+        Returns:
+            Tuple[int, int]: Средний процент выполнения, общее количество выполнений
+        """
+        if not habit_ids:
+            return 0, 0
+        
+        total_completion_percentage = 0
+        total_completions = 0
+        
+        for habit_id in habit_ids:
+            period_count, total_count = counts.get(habit_id, (0, 0))
+            # Та же формула, что и в get_habit_statistics
+            total_completion_percentage += int((period_count / days) * 100)
+            total_completions += total_count
         
-        return streak
+        return int(total_completion_percentage / len(habit_ids)), total_completions
     
-    def _calculate_best_streak(self, habit_id: int) -> int:
+    def _calculate_streaks(self, habit_ids: List[int], today) -> Dict[int, Tuple[int, int]]:
         """
-        Рассчитать лучший streak за все время
+        Рассчитать текущий и лучший streak (дни подряд с выполнением) для привычек
+        
+        Выполненные дни разбиваются на непрерывные отрезки ("gaps and islands"):
+        у дней одного отрезка разность номера дня и ROW_NUMBER() по дате
+        в пределах привычки одинакова. Один запрос возвращает для каждой
+        привычки длину лучшего отрезка и начало отрезка, содержащего сегодня.
         
         Args:
-            habit_id: ID привычки
+            habit_ids: ID привычек
+            today: Текущая дата
             
         Returns:
-            int: Лучший streak
+            Dict[int, Tuple[int, int]]: habit_id -> (текущий streak, лучший streak);
+            привычки без выполнений получают (0, 0)
         """
-        logs = self.HabitLog.query.filter_by(habit_id=habit_id, completed=True).order_by(
-            self.HabitLog.date.asc()
-        ).all()
+        streaks = {habit_id: (0, 0) for habit_id in habit_ids}
+        if not habit_ids:
+            return streaks
+        
+        HabitLog = self.HabitLog
+        row_number = func.row_number().over(partition_by=HabitLog.habit_id, order_by=HabitLog.date)
+        days = self.db.session.query(
+            HabitLog.habit_id.label('habit_id'),
+            HabitLog.date.label('date'),
+            (self._day_number(HabitLog.date) - row_number).label('island')
+        ).filter(
+            HabitLog.habit_id.in_(habit_ids),
+            HabitLog.completed.is_(True)
+        ).subquery()
         
-        if not logs:
-            return 0
+        islands = self.db.session.query(
+            days.c.habit_id.label('habit_id'),
+            func.min(days.c.date).label('start'),
+            func.max(days.c.date).label('end'),
+            func.count().label('length')
+        ).group_by(days.c.habit_id, days.c.island).subquery()
         
-        best_streak = 1
-        current_streak = 1
+        # Лучший отрезок и начало текущего отрезка считаются в SQL: по строке на привычку
+        rows = self.db.session.query(
+            islands.c.habit_id,
+            func.max(case(
+                ((islands.c.start <= today) & (islands.c.end >= today), islands.c.start)
+            )),
+            func.max(islands.c.length)
+        ).group_by(islands.c.habit_id).all()
         
-        for i in range(1, len(logs)):
-            # Проверить, является ли дата следующей после предыдущей
-            if (logs[i].date - logs[i-1].date).days == 1:
-                current_streak += 1
-                best_streak = max(best_streak, current_streak)
-            else:
-                current_streak = 1
+        for habit_id, current_start, best_streak in rows:
+            current_streak = (today - current_start).days + 1 if current_start else 0
+            streaks[habit_id] = (current_streak, best_streak)
+        
+        return streaks
+    
+    def _day_number(self, column):
+        """
+        Получить выражение с номером дня для столбца даты
         
-        return best_streak
+        Args:
+            column: Столбец типа Date
+            
+        Returns:
+            Выражение, возрастающее на 1 для каждого следующего дня
+        """
+        if self.db.engine.dialect.name == 'sqlite':
+            # SQLite хранит даты строками
+            return func.julianday(column)
+        # Разность дат в PostgreSQL - целое число дней
+        return column - literal(date(1970, 1, 1), Date)
     
     def get_heatmap_data(self, user_id: int, days: int = 30) -> Tuple[Optional[Dict], bool, List[str]]:
         """
@@ -309,26 +373,27 @@ class AnalyticsService:
             today = datetime.now(timezone.utc).date()
             start_date = today - timedelta(days=days - 1)
             
-            # Получить все логи за период
-            logs = self.HabitLog.query.filter(
+            # Посчитать выполнения по дням в SQL: не больше days строк вместо строки на каждый лог
+            completed_by_date = self.db.session.query(
+                self.HabitLog.date,
+                func.count()
+            ).filter(
                 self.HabitLog.habit_id.in_(
                     self.db.session.query(self.Habit.id).filter_by(user_id=user_id)
                 ),
-                self.HabitLog.date >= start_date,
-                self.HabitLog.date <= today
-            ).all()
-            
-            # Построить словарь дата -> количество выполнений
-            heatmap = {}
-            for i in range(days):
-                date = start_date + timedelta(days=i)
-                heatmap[date.isoformat()] = 0
-            
-            for log in logs:
-                if log.completed:
-                    date_key = log.date.isoformat()
-                    if date_key in heatmap:
-                        heatmap[date_key] += 1
+                self.HabitLog.date.between(start_date, today),
+                self.HabitLog.completed.is_(True)
+            ).group_by(self.HabitLog.date).all()
+            
+            # Построить словарь дата -> количество выполнений (дни перебираются по порядковым номерам)
+            heatmap = dict.fromkeys(
+                (date.fromordinal(day).isoformat()
+                 for day in range(start_date.toordinal(), today.toordinal() + 1)),
+                0
+            )
+            heatmap.update(
+                (log_date.isoformat(), completed_count) for log_date, completed_count in completed_by_date
+            )
             
             return {
                 'user_id': user_id,
@@ -5,8 +5,9 @@
 """
 from typing import List, Optional, Tuple
 from datetime import datetime, timezone
+from sqlalchemy import and_, exists
 from ..validators.category_validator import CategoryValidator
-from ..models import get_models
+from ..models import get_db, get_models
 from ..exceptions import (
     ValidationError, AuthorizationError, ResourceNotFoundError,
     BusinessLogicError, HabitTrackerException
@@ -15,11 +16,13 @@ from ..exceptions import (
 
 class CategoryServiceError(HabitTrackerException):
     """Базовое исключение для ошибок CategoryService"""
-    pass
+    __slots__ = ()
 
 
 class CategoryNotFoundError(ResourceNotFoundError):
     """Вызывается когда категория не найдена"""
+    __slots__ = ()
+    
     def __init__(self, category_id: int):
         super().__init__('category', category_id)
 
@@ -40,9 +43,8 @@ class CategoryService:
         # Получить модели после инициализации
         self.User, self.Habit, self.HabitLog, self.Category, self.Tag, self.Comment = get_models()
         
-        # Импортировать db из моделей
-        from ..models.category import db
-        self.db = db
+        # Общий экземпляр базы данных моделей
+        self.db = get_db()
     
     def create_category(self, user_id: int, name: str, color: str = None, icon: str = None) -> Tuple['Category', bool, List[str]]:
         """
@@ -68,12 +70,7 @@ class CategoryService:
         
         try:
             # Проверить, существует ли уже категория с таким именем для пользователя
-            existing = self.Category.query.filter_by(
-                user_id=user_id,
-                name=name
-            ).first()
-            
-            if existing:
+            if self._name_taken(user_id, name):
                 return None, False, ["Категория с таким именем уже существует"]
             
             # Создать новую категорию
@@ -92,6 +89,23 @@ class CategoryService:
             self.db.session.rollback()
             return None, False, [f"Ошибка при создании категории: {str(e)}"]
     
+    def _name_taken(self, user_id: int, name: str, exclude_id: int = None) -> bool:
+        """
+        Проверить через EXISTS, есть ли у пользователя категория с таким именем
+        
+        Args:
+            user_id: ID пользователя
+            name: Имя категории
+            exclude_id: ID категории, которую не нужно учитывать (опционально)
+            
+        Returns:
+            bool: True, если имя уже занято
+        """
+        criteria = [self.Category.user_id == user_id, self.Category.name == name]
+        if exclude_id is not None:
+            criteria.append(self.Category.id != exclude_id)
+        return self.db.session.query(exists().where(and_(*criteria))).scalar()
+    
     def get_user_categories(self, user_id: int) -> List['Category']:
         """
         Получить все категории пользователя
@@ -156,12 +170,7 @@ class CategoryService:
         try:
             if name:
                 # Проверить, не существует ли уже категория с таким именем
-                existing = self.Category.query.filter_by(
-                    user_id=user_id,
-                    name=name
-                ).filter(self.Category.id != category_id).first()
-                
-                if existing:
+                if self._name_taken(user_id, name, exclude_id=category_id):
                     return None, False, ["Категория с таким именем уже существует"]
                 
                 category.name = name
@@ -4,9 +4,9 @@
 Бизнес-логика для управления комментариями к привычкам
 """
 from typing import List, Optional, Tuple
-from datetime import datetime, timezone
+from sqlalchemy import and_
 from ..validators.comment_validator import CommentValidator
-from ..models import get_models
+from ..models import get_db, get_models
 from ..exceptions import (
     ValidationError, AuthorizationError, ResourceNotFoundError,
     BusinessLogicError, HabitTrackerException
@@ -15,11 +15,13 @@ from ..exceptions import (
 
 class CommentServiceError(HabitTrackerException):
     """Базовое исключение для ошибок CommentService"""
-    pass
+    __slots__ = ()
 
 
 class CommentNotFoundError(ResourceNotFoundError):
     """Вызывается когда комментарий не найден"""
+    __slots__ = ()
+    
     def __init__(self, comment_id: int):
         super().__init__('comment', comment_id)
 
@@ -40,9 +42,8 @@ class CommentService:
         # Получить модели после инициализации
         self.User, self.Habit, self.HabitLog, self.Category, self.Tag, self.Comment = get_models()
         
-        # Импортировать db из моделей
-        from ..models.comment import db
-        self.db = db
+        # Общий экземпляр базы данных моделей
+        self.db = get_db()
     
     def add_comment(self, habit_log_id: int, habit_id: int, user_id: int, text: str) -> Tuple[Optional['Comment'], bool, List[str]]:
         """
@@ -66,14 +67,20 @@ class CommentService:
         sanitized_text = CommentValidator.sanitize_text(text)
         
         try:
-            # Проверить, существует ли привычка и принадлежит ли пользователю
-            habit = self.Habit.query.filter_by(id=habit_id, user_id=user_id).first()
-            if not habit:
+            # Проверить привычку пользователя и ее запись о выполнении одним запросом:
+            # внешнее соединение отличает отсутствие привычки от отсутствия записи
+            found = self.db.session.query(
+                self.Habit.id, self.HabitLog.id
+            ).outerjoin(
+                self.HabitLog,
+                and_(self.HabitLog.habit_id == self.Habit.id, self.HabitLog.id == habit_log_id)
+            ).filter(
+                self.Habit.id == habit_id,
+                self.Habit.user_id == user_id
+            ).first()
+            if not found:
                 return None, False, ["Привычка не найдена"]
-            
-            # Проверить, существует ли запись о выполнении
-            habit_log = self.HabitLog.query.filter_by(id=habit_log_id, habit_id=habit_id).first()
-            if not habit_log:
+            if found[1] is None:
                 return None, False, ["Запись о выполнении привычки не найдена"]
             
             # Создать комментарий
@@ -113,19 +120,13 @@ class CommentService:
         sanitized_text = CommentValidator.sanitize_text(text)
         
         try:
-            # Получить комментарий
-            comment = self.Comment.query.filter_by(id=comment_id, habit_id=habit_id).first()
+            # Получить комментарий привычки пользователя
+            comment = self._get_user_comment(comment_id, habit_id, user_id)
             if not comment:
                 return None, False, ["Комментарий не найден"]
             
-            # Проверить, принадлежит ли привычка пользователю
-            habit = self.Habit.query.filter_by(id=habit_id, user_id=user_id).first()
-            if not habit:
-                return None, False, ["Привычка не найдена"]
-            
             # Обновить комментарий
             comment.text = sanitized_text
-            comment.updated_at = datetime.now(timezone.utc)
             
             self.db.session.commit()
             return comment, True, []
@@ -146,16 +147,11 @@ class CommentService:
             Tuple[bool, List[str]]: Статус успеха, ошибки
         """
         try:
-            # Получить комментарий
-            comment = self.Comment.query.filter_by(id=comment_id, habit_id=habit_id).first()
+            # Получить комментарий привычки пользователя
+            comment = self._get_user_comment(comment_id, habit_id, user_id)
             if not comment:
                 return False, ["Комментарий не найден"]
             
-            # Проверить, принадлежит ли привычка пользователю
-            habit = self.Habit.query.filter_by(id=habit_id, user_id=user_id).first()
-            if not habit:
-                return False, ["Привычка не найдена"]
-            
             # Удалить комментарий
             self.db.session.delete(comment)
             self.db.session.commit()
@@ -176,13 +172,8 @@ class CommentService:
         Returns:
             List[Comment]: Список комментариев в хронологическом порядке
         """
-        # Проверить, принадлежит ли привычка пользователю
-        habit = self.Habit.query.filter_by(id=habit_id, user_id=user_id).first()
-        if not habit:
-            return []
-        
-        # Получить комментарии в хронологическом порядке
-        comments = self.Comment.query.filter_by(habit_id=habit_id).order_by(
+        # Получить комментарии в хронологическом порядке (пусто для чужой привычки)
+        comments = self._user_comments_query(habit_id, user_id).order_by(
             self.Comment.created_at.asc()
         ).all()
         
@@ -200,16 +191,10 @@ class CommentService:
         Returns:
             List[Comment]: Список комментариев
         """
-        # Проверить, принадлежит ли привычка пользователю
-        habit = self.Habit.query.filter_by(id=habit_id, user_id=user_id).first()
-        if not habit:
-            return []
-        
-        # Получить комментарии
-        comments = self.Comment.query.filter_by(
-            habit_log_id=habit_log_id,
-            habit_id=habit_id
-        ).order_by(self.Comment.created_at.asc()).all()
+        # Получить комментарии (пусто для чужой привычки)
+        comments = self._user_comments_query(habit_id, user_id).filter(
+            self.Comment.habit_log_id == habit_log_id
+        ).order_by(self.Comment.created_at.asc(), self.Comment.id.asc()).all()
         
         return comments
     
@@ -225,15 +210,44 @@ class CommentService:
         Returns:
             List[Comment]: Список найденных комментариев
         """
-        # Проверить, принадлежит ли привычка пользователю
-        habit = self.Habit.query.filter_by(id=habit_id, user_id=user_id).first()
-        if not habit:
-            return []
-        
-        # Поиск по тексту (case-insensitive)
+        # Поиск по тексту (case-insensitive, пусто для чужой привычки)
         search_pattern = f"%{search_text}%"
-        comments = self.Comment.query.filter_by(habit_id=habit_id).filter(
+        comments = self._user_comments_query(habit_id, user_id).filter(
             self.Comment.text.ilike(search_pattern)
-        ).order_by(self.Comment.created_at.asc()).all()
+        ).order_by(self.Comment.created_at.asc(), self.Comment.id.asc()).all()
         
         return comments
+    
+    def _user_comments_query(self, habit_id: int, user_id: int):
+        """
+        Запрос комментариев привычки с проверкой владельца через JOIN
+        
+        Args:
+            habit_id: ID привычки
+            user_id: ID пользователя
+            
+        Returns:
+            Query: Запрос комментариев; пустой, если привычка не принадлежит пользователю
+        """
+        return self.Comment.query.join(
+            self.Habit, self.Comment.habit_id == self.Habit.id
+        ).filter(
+            self.Comment.habit_id == habit_id,
+            self.Habit.user_id == user_id
+        )
+    
+    def _get_user_comment(self, comment_id: int, habit_id: int, user_id: int) -> Optional['Comment']:
+        """
+        Получить комментарий привычки пользователя одним запросом
+        
+        Args:
+            comment_id: ID комментария
+            habit_id: ID привычки
+            user_id: ID пользователя
+            
+        Returns:
+            Optional[Comment]: Комментарий или None, если он не найден или привычка чужая
+        """
+        return self._user_comments_query(habit_id, user_id).filter(
+            self.Comment.id == comment_id
+        ).first()
@@ -3,10 +3,12 @@ Habit Service
 
 Business logic layer for habit management with validation and authorization
 """
+from contextlib import contextmanager
 from typing import List, Optional, Tuple, Union
 from datetime import datetime, timezone
+from sqlalchemy.orm import load_only
 from ..validators.habit_validator import HabitValidator
-from ..models import get_models
+from ..models import get_db, get_models
 from ..exceptions import (
     ValidationError, AuthorizationError, ResourceNotFoundError,
     BusinessLogicError, HabitTrackerException
@@ -15,11 +17,13 @@ from ..exceptions import (
 
 class HabitServiceError(HabitTrackerException):
     """Base exception for HabitService errors"""
-    pass
+    __slots__ = ()
 
 
 class HabitNotFoundError(ResourceNotFoundError):
     """Raised when habit is not found"""
+    __slots__ = ()
+    
     def __init__(self, habit_id: int):
         super().__init__('habit', habit_id)
 
@@ -43,9 +47,48 @@ class HabitService:
         self.Habit = models[1]
         self.HabitLog = models[2]
         
-        # Import db from models
-        from ..models.habit import db
-        self.db = db
+        # Database instance shared by all models
+        self.db = get_db()
+    
+    @contextmanager
+    def batch(self):
+        """
+        Defer the commits of habit mutations to the end of the block
+        
+        Inside the block every mutation only flushes (IDs are assigned and
+        database errors still surface per call), and a single commit is
+        issued on exit. If the block raises, the batch is rolled back; a
+        mutation that fails rolls back the session, discarding the changes
+        batched before it. The flag lives in the session info, so batches
+        on other threads' sessions are unaffected.
+        
+        Example:
+            with habit_service.batch():
+                for habit_data in many:
+                    habit_service.create_habit(user_id, habit_data)
+        """
+        info = self.db.session.info
+        if info.get('habit_batch'):
+            # Nested batch: the outermost one commits
+            yield
+            return
+        
+        info['habit_batch'] = True
+        try:
+            yield
+            self.db.session.commit()
+        except Exception:
+            self.db.session.rollback()
+            raise
+        finally:
+            info.pop('habit_batch', None)
+    
+    def _commit(self):
+        """Commit the session, or only flush it inside batch()"""
+        if self.db.session.info.get('habit_batch'):
+            self.db.session.flush()
+        else:
+            self.db.session.commit()
     
     def create_habit(self, user_id: int, habit_data: dict) -> 'Habit':
         """
@@ -67,19 +110,19 @@ class HabitService:
         if not validation_result.is_valid:
             raise ValidationError(validation_result.errors)
         
+        # Check model business rules before any ORM instance is constructed
+        is_valid, errors = self.habit_validator.validate_business_rules(habit_data)
+        if not is_valid:
+            raise ValidationError(errors)
+        
         try:
             # Create habit instance
             habit_data['user_id'] = user_id
             habit = self.Habit(**habit_data)
             
-            # Additional business rule validation at model level
-            is_valid, errors = habit.validate_business_rules()
-            if not is_valid:
-                raise ValidationError(errors)
-            
             # Save to database
             self.db.session.add(habit)
-            self.db.session.commit()
+            self._commit()
             
             return habit
             
@@ -131,7 +174,7 @@ class HabitService:
             habit.updated_at = datetime.now(timezone.utc)
             
             # Save to database
-            self.db.session.commit()
+            self._commit()
             
             return habit
             
@@ -157,8 +200,10 @@ class HabitService:
             AuthorizationError: If user doesn't own the habit
             HabitServiceError: If deletion fails
         """
-        # Find habit
-        habit = self.Habit.query.get(habit_id)
+        # Find habit; deleting only needs the key and the owner, not the full row
+        habit = self.Habit.query.options(
+            load_only(self.Habit.id, self.Habit.user_id)
+        ).get(habit_id)
         if not habit:
             raise HabitNotFoundError(habit_id)
         
@@ -171,14 +216,12 @@ class HabitService:
             # 1. Delete habit logs
             self.HabitLog.query.filter_by(habit_id=habit_id).delete()
             
-            # 2. Update related habits to remove references
-            related_habits = self.Habit.query.filter_by(related_habit_id=habit_id).all()
-            for related_habit in related_habits:
-                related_habit.related_habit_id = None
+            # 2. Update related habits to remove references (one UPDATE, no loading)
+            self.Habit.query.filter_by(related_habit_id=habit_id).update({'related_habit_id': None})
             
             # 3. Delete the habit itself
             self.db.session.delete(habit)
-            self.db.session.commit()
+            self._commit()
             
             return True
             
@@ -254,18 +297,10 @@ class HabitService:
             AuthorizationError: If user doesn't own the habit
             HabitServiceError: If archiving fails
         """
-        habit = self.get_habit_by_id(habit_id, user_id)
-        
-        try:
-            habit.is_archived = True
-            habit.updated_at = datetime.now(timezone.utc)
-            self.db.session.commit()
-            
-            return habit
-            
-        except Exception as e:
-            self.db.session.rollback()
-            raise HabitServiceError(f"Failed to archive habit: {str(e)}")
+        return self._set_archived(
+            habit_id, user_id, True,
+            "User does not have permission to access this habit", 'read'
+        )
     
     def restore_habit(self, habit_id: int, user_id: int) -> 'Habit':
         """
@@ -283,24 +318,102 @@ class HabitService:
             AuthorizationError: If user doesn't own the habit
             HabitServiceError: If restoration fails
         """
-        # Get habit including archived ones
-        habit = self.Habit.query.get(habit_id)
-        if not habit:
-            raise HabitNotFoundError(habit_id)
+        return self._set_archived(
+            habit_id, user_id, False,
+            "User does not have permission to restore this habit", 'restore'
+        )
+    
+    def _set_archived(self, habit_id: int, user_id: int, archived: bool,
+                      denied_message: str, denied_action: str) -> 'Habit':
+        """
+        Set the archived flag of one habit with a single owner-checked UPDATE
         
-        if habit.user_id != user_id:
-            raise AuthorizationError("User does not have permission to restore this habit", 'habit', 'restore')
+        The habit is not loaded first: ownership is part of the WHERE clause,
+        and only when no row matches is the habit looked up to tell a missing
+        habit from a foreign one.
+        """
+        action = 'archive' if archived else 'restore'
+        try:
+            updated = self.Habit.query.filter_by(id=habit_id, user_id=user_id).update({
+                'is_archived': archived,
+                'updated_at': datetime.now(timezone.utc)
+            })
+            
+            if not updated:
+                if self.Habit.query.get(habit_id) is None:
+                    raise HabitNotFoundError(habit_id)
+                raise AuthorizationError(denied_message, 'habit', denied_action)
+            
+            self._commit()
+            
+        except (HabitNotFoundError, AuthorizationError):
+            raise
+        except Exception as e:
+            self.db.session.rollback()
+            raise HabitServiceError(f"Failed to {action} habit: {str(e)}")
+        
+        # Served from the identity map when the habit was already loaded in this session
+        return self.Habit.query.get(habit_id)
+    
+    def archive_habits(self, habit_ids: List[int], user_id: int) -> List[int]:
+        """
+        Archive several habits in a single UPDATE
+        
+        Args:
+            habit_ids: IDs of the habits to archive
+            user_id: ID of the user requesting the archive
+            
+        Returns:
+            List[int]: IDs of the habits that were archived
+            
+        Raises:
+            HabitServiceError: If archiving fails
+        """
+        return self._set_archived_bulk(habit_ids, user_id, True)
+    
+    def restore_habits(self, habit_ids: List[int], user_id: int) -> List[int]:
+        """
+        Restore several archived habits in a single UPDATE
+        
+        Args:
+            habit_ids: IDs of the habits to restore
+            user_id: ID of the user requesting the restore
+            
+        Returns:
+            List[int]: IDs of the habits that were restored
+            
+        Raises:
+            HabitServiceError: If restoration fails
+        """
+        return self._set_archived_bulk(habit_ids, user_id, False)
+    
+    def _set_archived_bulk(self, habit_ids: List[int], user_id: int, archived: bool) -> List[int]:
+        """
+        Set the archived flag on all of the user's habits among habit_ids
         
+        Habits that don't exist or belong to another user are skipped, so
+        ownership is enforced by the WHERE clause instead of per-habit checks.
+        """
         try:
-            habit.is_archived = False
-            habit.updated_at = datetime.now(timezone.utc)
-            self.db.session.commit()
+            query = self.Habit.query.filter(
+                self.Habit.user_id == user_id,
+                self.Habit.id.in_(habit_ids)
+            )
+            updated_ids = [row.id for row in query.with_entities(self.Habit.id).all()]
             
-            return habit
+            if updated_ids:
+                query.update({
+                    'is_archived': archived,
+                    'updated_at': datetime.now(timezone.utc)
+                }, synchronize_session=False)
+                self._commit()
+            
+            return updated_ids
             
         except Exception as e:
             self.db.session.rollback()
-            raise HabitServiceError(f"Failed to restore habit: {str(e)}")
+            action = 'archive' if archived else 'restore'
+            raise HabitServiceError(f"Failed to {action} habits: {str(e)}")
     
     def get_habits_by_type(self, user_id: int, habit_type: str) -> List['Habit']:
         """
@@ -4,21 +4,26 @@
 Бизнес-логика для управления тегами привычек
 """
 from typing import List, Optional, Tuple
+from sqlalchemy import exists, func
+from sqlalchemy.orm import selectinload
 from ..validators.tag_validator import TagValidator
-from ..models import get_models
+from ..models import get_db, get_models
 from ..exceptions import (
     ValidationError, AuthorizationError, ResourceNotFoundError,
     BusinessLogicError, HabitTrackerException
 )
+from .habit_service import HabitNotFoundError
 
 
 class TagServiceError(HabitTrackerException):
     """Базовое исключение для ошибок TagService"""
-    pass
+    __slots__ = ()
 
 
 class TagNotFoundError(ResourceNotFoundError):
     """Вызывается когда тег не найден"""
+    __slots__ = ()
+    
     def __init__(self, tag_id: int):
         super().__init__('tag', tag_id)
 
@@ -39,9 +44,8 @@ class TagService:
         # Получить модели после инициализации
         self.User, self.Habit, self.HabitLog, self.Category, self.Tag, self.Comment = get_models()
         
-        # Импортировать db из моделей
-        from ..models.tag import db
-        self.db = db
+        # Общий экземпляр базы данных моделей
+        self.db = get_db()
     
     def add_tags_to_habit(self, habit_id: int, user_id: int, tags: List[str]) -> Tuple[List['Tag'], bool, List[str]]:
         """
@@ -54,6 +58,9 @@ class TagService:
             
         Returns:
             Tuple[List[Tag], bool, List[str]]: Теги, статус валидации, ошибки
+            
+        Raises:
+            HabitNotFoundError: Если привычка не найдена
         """
         # Валидировать теги
         result = self.tag_validator.validate({'tags': tags})
@@ -67,26 +74,32 @@ class TagService:
             # Получить привычку
             habit = self.Habit.query.filter_by(id=habit_id, user_id=user_id).first()
             if not habit:
-                return [], False, ["Привычка не найдена"]
+                raise HabitNotFoundError(habit_id)
             
-            # Получить или создать теги
+            # Получить существующие теги одним запросом, недостающие создать
+            existing_tags = {
+                tag.name: tag
+                for tag in self.Tag.query.filter(
+                    self.Tag.user_id == user_id,
+                    self.Tag.name.in_(normalized_tags)
+                ).all()
+            }
             tag_objects = []
             for tag_name in normalized_tags:
-                tag = self.Tag.query.filter_by(user_id=user_id, name=tag_name).first()
+                tag = existing_tags.get(tag_name)
                 if not tag:
                     tag = self.Tag(user_id=user_id, name=tag_name)
                     self.db.session.add(tag)
                 
                 tag_objects.append(tag)
             
-            # Очистить старые теги и добавить новые
-            habit.tags.clear()
-            for tag in tag_objects:
-                if tag not in habit.tags:
-                    habit.tags.append(tag)
+            # Заменить старые теги новыми (теги уже уникальны после нормализации)
+            habit.tags = tag_objects
             
             self.db.session.commit()
             return tag_objects, True, []
+        except HabitNotFoundError:
+            raise
         except Exception as e:
             self.db.session.rollback()
             return [], False, [f"Ошибка при добавлении тегов: {str(e)}"]
@@ -102,7 +115,13 @@ class TagService:
         Returns:
             List[Tag]: Список тегов
         """
-        habit = self.Habit.query.filter_by(id=habit_id, user_id=user_id).first()
+        # Загрузить теги одним IN-запросом вместе с привычкой
+        habit = (
+            self.Habit.query
+            .options(selectinload(self.Habit.tags))
+            .filter_by(id=habit_id, user_id=user_id)
+            .first()
+        )
         if not habit:
             return []
         
@@ -119,25 +138,37 @@ class TagService:
             
         Returns:
             Tuple[bool, List[str]]: Статус успеха, ошибки
+            
+        Raises:
+            HabitNotFoundError: Если привычка не найдена
+            TagNotFoundError: Если тег не найден
         """
         try:
             habit = self.Habit.query.filter_by(id=habit_id, user_id=user_id).first()
             if not habit:
-                return False, ["Привычка не найдена"]
+                raise HabitNotFoundError(habit_id)
             
             tag = self.Tag.query.filter_by(id=tag_id, user_id=user_id).first()
             if not tag:
-                return False, ["Тег не найден"]
+                raise TagNotFoundError(tag_id)
             
             if tag in habit.tags:
                 habit.tags.remove(tag)
+                self.db.session.flush()
                 
                 # Если тег больше не используется, удалить его
-                if len(tag.habits) == 0:
+                # (проверка через EXISTS, без загрузки всех привычек тега)
+                habit_tags = self.Tag.__table__.metadata.tables['habit_tags']
+                still_used = self.db.session.query(
+                    exists().where(habit_tags.c.tag_id == tag.id)
+                ).scalar()
+                if not still_used:
                     self.db.session.delete(tag)
             
             self.db.session.commit()
             return True, []
+        except (HabitNotFoundError, TagNotFoundError):
+            raise
         except Exception as e:
             self.db.session.rollback()
             return False, [f"Ошибка при удалении тега: {str(e)}"]
@@ -153,19 +184,16 @@ class TagService:
         Returns:
             List[str]: Список предложенных тегов
         """
-        prefix_lower = prefix.lower()
-        
-        tags = self.Tag.query.filter_by(user_id=user_id).all()
-        suggestions = []
-        
-        for tag in tags:
-            if tag.name.lower().startswith(prefix_lower):
-                suggestions.append(tag.name)
+        # Имена тегов хранятся нормализованными (в нижнем регистре),
+        # поэтому фильтрацию по префиксу и лимит можно выполнить в БД
+        query = self.db.session.query(self.Tag.name).filter(self.Tag.user_id == user_id)
+        if prefix:
+            query = query.filter(self.Tag.name.startswith(prefix.lower(), autoescape=True))
         
         # Сортировать по релевантности (длина совпадения)
-        suggestions.sort(key=lambda x: len(x))
+        rows = query.order_by(func.length(self.Tag.name), self.Tag.id).limit(10).all()
         
-        return suggestions[:10]  # Вернуть максимум 10 предложений
+        return [name for name, in rows]  # Вернуть максимум 10 предложений
     
     def get_user_tags(self, user_id: int) -> List['Tag']:
         """
@@ -190,13 +218,12 @@ class TagService:
             Tuple[int, List[str]]: Количество удаленных тегов, ошибки
         """
         try:
-            tags = self.Tag.query.filter_by(user_id=user_id).all()
-            deleted_count = 0
-            
-            for tag in tags:
-                if len(tag.habits) == 0:
-                    self.db.session.delete(tag)
-                    deleted_count += 1
+            # Один DELETE ... WHERE NOT EXISTS вместо загрузки тегов и их привычек
+            habit_tags = self.Tag.__table__.metadata.tables['habit_tags']
+            deleted_count = self.Tag.query.filter(
+                self.Tag.user_id == user_id,
+                ~exists().where(habit_tags.c.tag_id == self.Tag.id)
+            ).delete(synchronize_session='fetch')
             
             self.db.session.commit()
             return deleted_count, []
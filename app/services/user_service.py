@@ -4,9 +4,12 @@ User Service
 Business logic layer for user management with authentication and authorization
 """
 from typing import Optional, Dict, Any
+from collections import Counter
 from datetime import datetime, timezone
+from sqlalchemy import exists
 from werkzeug.security import check_password_hash
-from ..models import get_models
+from ..models import get_db, get_models
+from ..models.habit_types import HabitType
 from ..exceptions import (
     AuthenticationError, ResourceNotFoundError, ConflictError,
     HabitTrackerException
@@ -15,11 +18,13 @@ from ..exceptions import (
 
 class UserServiceError(HabitTrackerException):
     """Base exception for UserService errors"""
-    pass
+    __slots__ = ()
 
 
 class UserNotFoundError(ResourceNotFoundError):
     """Raised when user is not found"""
+    __slots__ = ()
+    
     def __init__(self, user_id: int = None, email: str = None):
         if user_id:
             super().__init__('user', user_id)
@@ -31,6 +36,8 @@ class UserNotFoundError(ResourceNotFoundError):
 
 class UserAlreadyExistsError(ConflictError):
     """Raised when trying to create a user that already exists"""
+    __slots__ = ()
+    
     def __init__(self, email: str):
         super().__init__(f"User with email {email} already exists", f"email: {email}")
 
@@ -43,11 +50,10 @@ class UserService:
     def __init__(self):
         """Initialize UserService"""
         # Get models after initialization
-        self.User, self.Habit, self.HabitLog = get_models()
+        self.User, self.Habit, self.HabitLog = get_models()[:3]
         
-        # Import db from models
-        from ..models.user import db
-        self.db = db
+        # Database instance shared by all models
+        self.db = get_db()
     
     def create_user(self, email: str, password: str, name: str = None) -> 'User':
         """
@@ -65,9 +71,11 @@ class UserService:
             UserAlreadyExistsError: If user with email already exists
             UserServiceError: If creation fails
         """
-        # Check if user already exists
-        existing_user = self.User.query.filter_by(email=email.lower().strip()).first()
-        if existing_user:
+        # Check if user already exists (EXISTS: the row itself is not needed)
+        email_taken = self.db.session.query(
+            exists().where(self.User.email == email.lower().strip())
+        ).scalar()
+        if email_taken:
             raise UserAlreadyExistsError(email)
         
         try:
@@ -322,18 +330,15 @@ class UserService:
         user = self.get_user_by_id(user_id)
         
         try:
-            # Get basic user stats
-            stats = user.get_completion_stats()
-            
-            # Add additional statistics
-            total_habits = len(user.get_active_habits())
-            useful_habits = len(user.get_habits_by_type('useful'))
-            pleasant_habits = len(user.get_habits_by_type('pleasant'))
+            # Completion statistics share _compute_stats_bulk with User.get_completion_stats
+            active_habits = user.get_active_habits()
+            stats = user.get_completion_stats(active_habits)
             
+            type_counts = Counter(habit.habit_type for habit in active_habits)
             stats.update({
-                'total_active_habits': total_habits,
-                'useful_habits_count': useful_habits,
-                'pleasant_habits_count': pleasant_habits,
+                'total_active_habits': len(active_habits),
+                'useful_habits_count': type_counts[HabitType.USEFUL],
+                'pleasant_habits_count': type_counts[HabitType.PLEASANT],
                 'account_created': user.created_at.isoformat() if user.created_at else None
             })
             
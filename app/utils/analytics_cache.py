@@ -0,0 +1,95 @@
+"""
+Analytics Cache Utilities
+
+Versioned cache for per-user analytics responses and the cache key of
+profile statistics
+"""
+from flask import current_app, has_app_context
+
+from .dates import today_utc
+
+# Analytics only change when habits or completions change, and every such
+# write bumps the user's version, so entries can live for several minutes
+ANALYTICS_CACHE_TIMEOUT = 300
+
+
+def _analytics_version_key(user_id):
+    """Cache key holding the current analytics version of a user"""
+    return f'analytics_version:{user_id}'
+
+
+def get_cached_analytics(user_id, name, compute, *args):
+    """
+    Get an analytics result, computing and caching it on a miss
+
+    The key includes the user's analytics version and today's date, so
+    entries are dropped by invalidate_analytics_cache and at day rollover.
+    Without ANALYTICS_CACHE_ENABLED (a cache shared by all workers) the
+    result is computed on every call.
+
+    Args:
+        user_id: ID of the user the analytics belong to
+        name: Name of the analytics kind (part of the cache key)
+        compute: Callable returning the (result, success, errors) tuple
+        *args: Arguments of the analytics call (part of the cache key)
+
+    Returns:
+        Tuple: Result of compute(); unsuccessful results are not cached
+    """
+    if not current_app.config.get('ANALYTICS_CACHE_ENABLED'):
+        return compute()
+
+    # Imported here: models import this module while the app package initializes
+    from .. import cache
+
+    version = cache.get(_analytics_version_key(user_id)) or 0
+    key = ':'.join(
+        ['analytics', str(user_id), str(version), today_utc().isoformat(), name]
+        + [str(arg) for arg in args]
+    )
+
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = compute()
+    if result[1]:
+        cache.set(key, result, timeout=ANALYTICS_CACHE_TIMEOUT)
+    return result
+
+
+def invalidate_analytics_cache(user_id):
+    """
+    Drop all cached analytics of a user
+
+    Args:
+        user_id: ID of the user whose habits or completions changed
+    """
+    if not has_app_context() or not current_app.config.get('ANALYTICS_CACHE_ENABLED'):
+        return
+
+    from .. import cache
+
+    key = _analytics_version_key(user_id)
+    # The version is stored without expiry so version numbers never repeat
+    cache.set(key, (cache.get(key) or 0) + 1, timeout=0)
+
+
+def statistics_cache_key(user_id):
+    """Cache key holding the profile statistics of a user"""
+    return f'user:{user_id}:statistics'
+
+
+def invalidate_user_statistics(user_id):
+    """
+    Drop the cached profile statistics of a user
+
+    Args:
+        user_id: ID of the user whose habits, completions or account changed
+    """
+    if not has_app_context():
+        return
+
+    from .. import cache
+
+    cache.delete(statistics_cache_key(user_id))
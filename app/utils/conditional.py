@@ -0,0 +1,44 @@
+"""
+Conditional Response Utilities
+
+ETag revalidation that survives response compression
+"""
+from flask import current_app, request
+
+# Flask-Compress appends the algorithm to the ETag of a compressed response,
+# so clients send back e.g. "<hash>:gzip" in If-None-Match
+_COMPRESSION_SUFFIXES = (':gzip', ':br', ':deflate')
+
+
+def _strip_compression_suffix(etag):
+    """Remove the compression suffix added by Flask-Compress from an ETag"""
+    for suffix in _COMPRESSION_SUFFIXES:
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)]
+    return etag
+
+
+def make_conditional_response(response):
+    """
+    Add a content ETag and answer 304 when the client already has the content
+
+    Args:
+        response: Uncompressed response to revalidate
+
+    Returns:
+        Response: The response itself or an empty 304 Not Modified
+    """
+    response.add_etag()
+    etag, _ = response.get_etag()
+
+    if_none_match = request.if_none_match
+    client_etags = {
+        _strip_compression_suffix(tag)
+        for tag in if_none_match.as_set(include_weak=True)
+    }
+    if not (if_none_match.star_tag or etag in client_etags):
+        return response
+
+    not_modified = current_app.response_class(status=304)
+    not_modified.set_etag(etag)
+    return not_modified
@@ -146,6 +146,14 @@ class CORSConfig:
             
             return response
         
+        # Preflight settings are resolved once instead of on every OPTIONS request
+        allowed_origins = frozenset(cors_config['origins'])
+        allow_all_origins = '*' in allowed_origins
+        allow_methods = ','.join(cors_config['methods'])
+        allow_headers = ','.join(cors_config['allow_headers'])
+        max_age = str(cors_config['max_age'])
+        supports_credentials = cors_config['supports_credentials']
+        
         # Handle preflight requests explicitly
         @app.before_request
         def handle_preflight():
@@ -155,10 +163,9 @@ class CORSConfig:
             if request.method == 'OPTIONS':
                 # Get origin from request
                 origin = request.headers.get('Origin')
-                allowed_origins = self.get_cors_origins()
                 
                 # Check if origin is allowed
-                if origin and allowed_origins != ['*'] and origin not in allowed_origins:
+                if origin and not allow_all_origins and origin not in allowed_origins:
                     # Origin not allowed, return 403
                     response = Response()
                     response.status_code = 403
@@ -171,14 +178,14 @@ class CORSConfig:
                 # Add CORS headers
                 if origin:
                     response.headers['Access-Control-Allow-Origin'] = origin
-                elif allowed_origins == ['*']:
+                elif allow_all_origins:
                     response.headers['Access-Control-Allow-Origin'] = '*'
                 
-                response.headers['Access-Control-Allow-Methods'] = ','.join(self.get_cors_methods())
-                response.headers['Access-Control-Allow-Headers'] = ','.join(self.get_cors_headers())
-                response.headers['Access-Control-Max-Age'] = str(self.get_cors_max_age())
+                response.headers['Access-Control-Allow-Methods'] = allow_methods
+                response.headers['Access-Control-Allow-Headers'] = allow_headers
+                response.headers['Access-Control-Max-Age'] = max_age
                 
-                if self.get_cors_credentials():
+                if supports_credentials:
                     response.headers['Access-Control-Allow-Credentials'] = 'true'
                 
                 return response
@@ -0,0 +1,54 @@
+"""
+Date Utilities
+
+Helpers for the current date and time shared across models
+"""
+from datetime import datetime, timezone
+
+from flask import g, has_app_context
+from sqlalchemy import DateTime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+
+class utcnow(FunctionElement):
+    """
+    Current UTC time as a naive timestamp, evaluated by the database
+
+    Matches the naive UTC values the application writes from Python, so it
+    can be used as a server default for DateTime columns.
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _compile_utcnow(element, compiler, **kw):
+    """SQLite's CURRENT_TIMESTAMP is already UTC"""
+    return 'CURRENT_TIMESTAMP'
+
+
+@compiles(utcnow, 'postgresql')
+def _compile_utcnow_postgresql(element, compiler, **kw):
+    """now() follows the session time zone, so convert it to UTC explicitly"""
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+def today_utc():
+    """
+    Get today's UTC date, computed once per application context
+
+    Inside a request every model method sees the same date, and serializing
+    many habits does not query the clock once per habit. Outside of an
+    application context the date is computed on each call.
+
+    Returns:
+        date: Current UTC date
+    """
+    if not has_app_context():
+        return datetime.now(timezone.utc).date()
+
+    today = g.get('_today_utc')
+    if today is None:
+        today = g._today_utc = datetime.now(timezone.utc).date()
+    return today
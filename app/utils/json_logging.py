@@ -0,0 +1,42 @@
+"""
+JSON Logging Module
+
+Log formatter that writes records as single-line JSON objects
+"""
+import logging
+from datetime import datetime, timezone
+
+from .json_provider import encode_json
+
+
+class JsonLogFormatter(logging.Formatter):
+    """
+    Formatter that encodes log records as JSON lines
+
+    Each line contains the UTC time, level, logger name and message.
+    Exception tracebacks are added under "exc_info".
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Format a log record as a JSON string
+
+        Args:
+            record: Log record to format
+
+        Returns:
+            str: JSON object without a trailing newline
+        """
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+            entry['exc_info'] = record.exc_text
+
+        return encode_json(entry).decode('utf-8')
@@ -0,0 +1,158 @@
+"""
+JSON Provider Module
+
+orjson-backed JSON provider for fast API response serialization
+"""
+import json
+from datetime import date
+from typing import Any
+
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder if orjson is not installed
+    orjson = None
+
+
+class OrjsonJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes responses with orjson
+
+    Dates and datetimes are always emitted in ISO 8601 format, so endpoints
+    can pass them through without calling isoformat() themselves.
+    """
+
+    # Never pretty-print or sort keys, including in debug mode and when
+    # falling back to the stdlib encoder
+    compact = True
+    sort_keys = False
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        """
+        Convert objects not natively supported by the encoder
+
+        Args:
+            o: Object to convert
+
+        Returns:
+            JSON-serializable representation of the object
+        """
+        if isinstance(o, date):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """
+        Serialize data as JSON string
+
+        Args:
+            obj: Data to serialize
+            **kwargs: Encoder options; when given, the stdlib encoder is used
+
+        Returns:
+            str: JSON string
+        """
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        """
+        Deserialize data from JSON string or bytes
+
+        Args:
+            s: JSON data
+            **kwargs: Decoder options; when given, the stdlib decoder is used
+
+        Returns:
+            Deserialized data
+        """
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """
+        Serialize data to a JSON response without indentation or key sorting
+
+        Returns:
+            Response object with application/json mimetype
+        """
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps_bytes(obj), mimetype=self.mimetype)
+
+    def _dumps_bytes(self, obj: Any) -> bytes:
+        """Encode data with orjson"""
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def encode_json(obj: Any) -> bytes:
+    """
+    Encode a constant payload to compact JSON bytes
+
+    Used for module-level error bodies serialized once at import and for
+    error handler payloads. Dates and datetimes are emitted in ISO 8601 format.
+
+    Args:
+        obj: JSON-serializable data
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=OrjsonJSONProvider.default)
+    return json.dumps(
+        obj, ensure_ascii=False, separators=(',', ':'), default=OrjsonJSONProvider.default
+    ).encode('utf-8')
+
+
+def json_bytes_response(body: bytes, status: int):
+    """
+    Build a JSON response from pre-encoded bytes
+
+    A new response is created on every call because after-request hooks
+    (CORS, security headers) modify response headers in place.
+
+    Args:
+        body: Encoded JSON body, e.g. from encode_json()
+        status: HTTP status code
+
+    Returns:
+        Response object with application/json mimetype
+    """
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+
+def encode_error_prefix(code: str, message: str) -> bytes:
+    """
+    Encode a constant error body up to the value of its "details" field
+
+    Args:
+        code: Error code
+        message: Error message
+
+    Returns:
+        bytes: JSON prefix to be completed by json_error_details_response()
+    """
+    body = encode_json({'error': {'code': code, 'message': message, 'details': None}})
+    return body[:-len(b'null}}')]
+
+
+def json_error_details_response(prefix: bytes, details: Any, status: int):
+    """
+    Build an error response from a pre-encoded prefix and variable details
+
+    Args:
+        prefix: Encoded prefix from encode_error_prefix()
+        details: JSON-serializable error details
+        status: HTTP status code
+
+    Returns:
+        Response object with application/json mimetype
+    """
+    return json_bytes_response(prefix + encode_json(details) + b'}}', status)
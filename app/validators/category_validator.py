@@ -14,6 +14,9 @@ class CategoryValidator(BaseValidator):
     MIN_NAME_LENGTH = 1
     MAX_NAME_LENGTH = 50
     
+    # Формат #RRGGBB, скомпилирован один раз при загрузке модуля
+    HEX_COLOR_PATTERN = re.compile(r'^#[0-9a-fA-F]{6}$')
+    
     # Предопределенные категории
     PREDEFINED_CATEGORIES = [
         'Здоровье',
@@ -98,9 +101,7 @@ class CategoryValidator(BaseValidator):
         if not isinstance(color, str):
             return False
         
-        # Проверить формат #RRGGBB
-        hex_pattern = r'^#[0-9a-fA-F]{6}$'
-        return bool(re.match(hex_pattern, color))
+        return bool(CategoryValidator.HEX_COLOR_PATTERN.match(color))
     
     @staticmethod
     def get_predefined_categories():
@@ -3,10 +3,11 @@ Habit Validator
 
 Validates habit data with comprehensive business rules
 """
-from typing import List
+from typing import List, Tuple
 from .base_validator import BaseValidator, ValidationResult
 from .time_validator import TimeValidator
 from .frequency_validator import FrequencyValidator
+from ..models.habit import check_business_rules
 from ..models.habit_types import HabitType
 
 
@@ -67,10 +68,10 @@ class HabitValidator(BaseValidator):
                 habit_type_enum = None
             
             if habit_type_enum:
-                if habit_type_enum == HabitType.PLEASANT:
+                if habit_type_enum is HabitType.PLEASANT:
                     pleasant_errors = self._validate_pleasant_habit_constraints(data)
                     errors.extend(pleasant_errors)
-                elif habit_type_enum == HabitType.USEFUL:
+                elif habit_type_enum is HabitType.USEFUL:
                     useful_errors = self._validate_useful_habit_constraints(data)
                     errors.extend(useful_errors)
         
@@ -79,6 +80,21 @@ class HabitValidator(BaseValidator):
             errors=errors
         )
     
+    def validate_business_rules(self, data: dict) -> Tuple[bool, List[str]]:
+        """
+        Check the Habit model business rules against raw habit data
+        
+        Uses the same rules as Habit.validate_business_rules, so invalid
+        input is rejected before an ORM instance is constructed.
+        
+        Args:
+            data: Dictionary containing habit data
+            
+        Returns:
+            tuple: (is_valid: bool, errors: List[str])
+        """
+        return check_business_rules(data)
+    
     def _validate_pleasant_habit_constraints(self, data: dict) -> List[str]:
         """
         Validate constraints specific to pleasant habits
@@ -72,22 +72,24 @@ class TagValidator(BaseValidator):
     @staticmethod
     def normalize_tags(tags: List[str]) -> List[str]:
         """
-        Нормализовать теги (преобразовать в нижний регистр и удалить пробелы)
+        Нормализовать теги (преобразовать в нижний регистр, удалить пробелы и дубликаты)
         
         Args:
             tags: Список тегов
             
         Returns:
-            List[str]: Нормализованные теги
+            List[str]: Нормализованные уникальные теги в исходном порядке
         """
         if not isinstance(tags, list):
             return []
         
+        seen = set()
         normalized = []
         for tag in tags:
             if isinstance(tag, str):
                 normalized_tag = tag.strip().lower()
-                if normalized_tag:
+                if normalized_tag and normalized_tag not in seen:
+                    seen.add(normalized_tag)
                     normalized.append(normalized_tag)
         
         return normalized
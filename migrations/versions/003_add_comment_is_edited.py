@@ -0,0 +1,152 @@
+"""
+Миграция: Добавить флаг редактирования комментариев
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-02-10
+
+Добавляет поле comments.is_edited, которое выставляется при изменении
+текста комментария вместо сравнения created_at и updated_at.
+"""
+
+from sqlalchemy import text
+import logging
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Метаданные миграции
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade(engine):
+    """
+    Добавить поле is_edited и заполнить его для существующих комментариев.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало миграции 003: Добавление поля comments.is_edited")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                # Проверить, используется ли PostgreSQL или SQLite
+                is_postgresql = 'postgresql' in str(engine.url)
+                
+                if is_postgresql:
+                    logger.info("Применение миграции PostgreSQL")
+                    
+                    connection.execute(text("""
+                        ALTER TABLE comments
+                        ADD COLUMN IF NOT EXISTS is_edited BOOLEAN NOT NULL DEFAULT FALSE
+                    """))
+                    
+                    # created_at и updated_at новых комментариев различаются на микросекунды,
+                    # поэтому отредактированными считаются изменения позже чем через секунду
+                    connection.execute(text("""
+                        UPDATE comments SET is_edited = TRUE
+                        WHERE updated_at > created_at + INTERVAL '1 second'
+                    """))
+                
+                else:
+                    logger.info("Применение миграции SQLite")
+                    
+                    result = connection.execute(text("PRAGMA table_info(comments)"))
+                    existing_columns = {row[1] for row in result.fetchall()}
+                    
+                    if 'is_edited' not in existing_columns:
+                        connection.execute(text("""
+                            ALTER TABLE comments ADD COLUMN is_edited BOOLEAN NOT NULL DEFAULT 0
+                        """))
+                        
+                        connection.execute(text("""
+                            UPDATE comments SET is_edited = 1
+                            WHERE julianday(updated_at) - julianday(created_at) > 1.0 / 86400
+                        """))
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Миграция 003 успешно завершена")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Миграция 003 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка миграции 003: {str(e)}")
+        raise
+
+
+def downgrade(engine):
+    """
+    Удалить поле is_edited.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало отката миграции 003: Удаление поля comments.is_edited")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                # Проверить, используется ли PostgreSQL или SQLite
+                is_postgresql = 'postgresql' in str(engine.url)
+                
+                if is_postgresql:
+                    logger.info("Применение отката PostgreSQL")
+                    
+                    connection.execute(text("""
+                        ALTER TABLE comments DROP COLUMN IF EXISTS is_edited
+                    """))
+                
+                else:
+                    # SQLite имеет ограниченную поддержку ALTER TABLE
+                    logger.warning("SQLite откат: столбец comments.is_edited остается, но не используется")
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Откат миграции 003 успешно завершен")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Откат миграции 003 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка отката миграции 003: {str(e)}")
+        raise
+
+
+def get_migration_info():
+    """
+    Получить информацию об этой миграции.
+    
+    Returns:
+        dict: Метаданные миграции
+    """
+    return {
+        'revision': revision,
+        'down_revision': down_revision,
+        'branch_labels': branch_labels,
+        'depends_on': depends_on,
+        'description': 'Добавить флаг редактирования комментариев',
+        'tables_modified': [
+            'comments'
+        ],
+        'columns_added': {
+            'comments': ['is_edited']
+        }
+    }
@@ -0,0 +1,164 @@
+"""
+Миграция: Добавить дату последнего выполнения привычки
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-02-20
+
+Добавляет поле habits.last_completed_date, чтобы проверка доступности
+привычки на сегодня не требовала запроса к habit_logs.
+"""
+
+from sqlalchemy import text
+import logging
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Метаданные миграции
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade(engine):
+    """
+    Добавить поле last_completed_date и заполнить его по существующим записям.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало миграции 004: Добавление поля habits.last_completed_date")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                # Проверить, используется ли PostgreSQL или SQLite
+                is_postgresql = 'postgresql' in str(engine.url)
+                
+                if is_postgresql:
+                    logger.info("Применение миграции PostgreSQL")
+                    
+                    connection.execute(text("""
+                        ALTER TABLE habits
+                        ADD COLUMN IF NOT EXISTS last_completed_date DATE
+                    """))
+                    
+                    connection.execute(text("""
+                        UPDATE habits SET last_completed_date = (
+                            SELECT MAX(habit_logs.date) FROM habit_logs
+                            WHERE habit_logs.habit_id = habits.id
+                            AND habit_logs.completed = TRUE
+                        )
+                    """))
+                
+                else:
+                    logger.info("Применение миграции SQLite")
+                    
+                    result = connection.execute(text("PRAGMA table_info(habits)"))
+                    existing_columns = {row[1] for row in result.fetchall()}
+                    
+                    if 'last_completed_date' not in existing_columns:
+                        connection.execute(text("""
+                            ALTER TABLE habits ADD COLUMN last_completed_date DATE
+                        """))
+                        
+                        connection.execute(text("""
+                            UPDATE habits SET last_completed_date = (
+                                SELECT MAX(habit_logs.date) FROM habit_logs
+                                WHERE habit_logs.habit_id = habits.id
+                                AND habit_logs.completed = 1
+                            )
+                        """))
+                
+                # Индекс одинаков для обеих баз данных
+                connection.execute(text("""
+                    CREATE INDEX IF NOT EXISTS ix_habits_last_completed_date
+                    ON habits(last_completed_date)
+                """))
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Миграция 004 успешно завершена")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Миграция 004 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка миграции 004: {str(e)}")
+        raise
+
+
+def downgrade(engine):
+    """
+    Удалить поле last_completed_date.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало отката миграции 004: Удаление поля habits.last_completed_date")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                # Проверить, используется ли PostgreSQL или SQLite
+                is_postgresql = 'postgresql' in str(engine.url)
+                
+                connection.execute(text("DROP INDEX IF EXISTS ix_habits_last_completed_date"))
+                
+                if is_postgresql:
+                    logger.info("Применение отката PostgreSQL")
+                    
+                    connection.execute(text("""
+                        ALTER TABLE habits DROP COLUMN IF EXISTS last_completed_date
+                    """))
+                
+                else:
+                    # SQLite имеет ограниченную поддержку ALTER TABLE
+                    logger.warning("SQLite откат: столбец habits.last_completed_date остается, но не используется")
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Откат миграции 004 успешно завершен")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Откат миграции 004 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка отката миграции 004: {str(e)}")
+        raise
+
+
+def get_migration_info():
+    """
+    Получить информацию об этой миграции.
+    
+    Returns:
+        dict: Метаданные миграции
+    """
+    return {
+        'revision': revision,
+        'down_revision': down_revision,
+        'branch_labels': branch_labels,
+        'depends_on': depends_on,
+        'description': 'Добавить дату последнего выполнения привычки',
+        'tables_modified': [
+            'habits'
+        ],
+        'columns_added': {
+            'habits': ['last_completed_date']
+        }
+    }
@@ -0,0 +1,112 @@
+"""
+Миграция: Добавить индекс активных привычек пользователя
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-02-24
+
+Добавляет составной индекс habits(user_id, is_archived), чтобы выборка
+активных привычек пользователя фильтровалась в базе данных.
+"""
+
+from sqlalchemy import text
+import logging
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Метаданные миграции
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade(engine):
+    """
+    Создать индекс idx_habits_user_archived.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало миграции 005: Создание индекса idx_habits_user_archived")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                # Синтаксис одинаков для PostgreSQL и SQLite
+                connection.execute(text("""
+                    CREATE INDEX IF NOT EXISTS idx_habits_user_archived 
+                    ON habits(user_id, is_archived)
+                """))
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Миграция 005 успешно завершена")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Миграция 005 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка миграции 005: {str(e)}")
+        raise
+
+
+def downgrade(engine):
+    """
+    Удалить индекс idx_habits_user_archived.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало отката миграции 005: Удаление индекса idx_habits_user_archived")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                connection.execute(text("DROP INDEX IF EXISTS idx_habits_user_archived"))
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Откат миграции 005 успешно завершен")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Откат миграции 005 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка отката миграции 005: {str(e)}")
+        raise
+
+
+def get_migration_info():
+    """
+    Получить информацию об этой миграции.
+    
+    Returns:
+        dict: Метаданные миграции
+    """
+    return {
+        'revision': revision,
+        'down_revision': down_revision,
+        'branch_labels': branch_labels,
+        'depends_on': depends_on,
+        'description': 'Добавить индекс активных привычек пользователя',
+        'tables_modified': [
+            'habits'
+        ],
+        'indexes_added': {
+            'habits': ['idx_habits_user_archived']
+        }
+    }
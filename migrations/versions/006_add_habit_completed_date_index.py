@@ -0,0 +1,125 @@
+"""
+Миграция: Добавить частичный индекс выполненных записей
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-02-28
+
+Добавляет частичный индекс habit_logs(habit_id, date) только по выполненным
+записям для поиска последнего выполнения привычки.
+"""
+
+from sqlalchemy import text
+import logging
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Метаданные миграции
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade(engine):
+    """
+    Создать индекс idx_habit_completed_date.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало миграции 006: Создание индекса idx_habit_completed_date")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                # Проверить, используется ли PostgreSQL или SQLite
+                is_postgresql = 'postgresql' in str(engine.url)
+                
+                if is_postgresql:
+                    logger.info("Применение миграции PostgreSQL")
+                    
+                    connection.execute(text("""
+                        CREATE INDEX IF NOT EXISTS idx_habit_completed_date 
+                        ON habit_logs(habit_id, date) WHERE completed = true
+                    """))
+                
+                else:
+                    logger.info("Применение миграции SQLite")
+                    
+                    connection.execute(text("""
+                        CREATE INDEX IF NOT EXISTS idx_habit_completed_date 
+                        ON habit_logs(habit_id, date) WHERE completed = 1
+                    """))
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Миграция 006 успешно завершена")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Миграция 006 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка миграции 006: {str(e)}")
+        raise
+
+
+def downgrade(engine):
+    """
+    Удалить индекс idx_habit_completed_date.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало отката миграции 006: Удаление индекса idx_habit_completed_date")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                connection.execute(text("DROP INDEX IF EXISTS idx_habit_completed_date"))
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Откат миграции 006 успешно завершен")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Откат миграции 006 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка отката миграции 006: {str(e)}")
+        raise
+
+
+def get_migration_info():
+    """
+    Получить информацию об этой миграции.
+    
+    Returns:
+        dict: Метаданные миграции
+    """
+    return {
+        'revision': revision,
+        'down_revision': down_revision,
+        'branch_labels': branch_labels,
+        'depends_on': depends_on,
+        'description': 'Добавить частичный индекс выполненных записей',
+        'tables_modified': [
+            'habit_logs'
+        ],
+        'indexes_added': {
+            'habit_logs': ['idx_habit_completed_date']
+        }
+    }
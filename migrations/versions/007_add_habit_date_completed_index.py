@@ -0,0 +1,124 @@
+"""
+Миграция: Заменить индекс habit_logs(habit_id, date) покрывающим индексом
+
+Revision ID: 007
+Revises: 006
+Create Date: 2024-03-02
+
+Создает индекс habit_logs(habit_id, date, completed), по которому запросы за
+период читают статус выполнения без обращения к таблице, и удаляет индекс
+idx_habit_date: его столбцы являются префиксом нового индекса и уже
+покрыты ограничением unique_habit_date.
+"""
+
+from sqlalchemy import text
+import logging
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Метаданные миграции
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade(engine):
+    """
+    Создать индекс idx_habit_date_completed и удалить idx_habit_date.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало миграции 007: Создание индекса idx_habit_date_completed")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                # Синтаксис одинаков для PostgreSQL и SQLite
+                connection.execute(text("""
+                    CREATE INDEX IF NOT EXISTS idx_habit_date_completed 
+                    ON habit_logs(habit_id, date, completed)
+                """))
+                
+                connection.execute(text("DROP INDEX IF EXISTS idx_habit_date"))
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Миграция 007 успешно завершена")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Миграция 007 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка миграции 007: {str(e)}")
+        raise
+
+
+def downgrade(engine):
+    """
+    Вернуть индекс idx_habit_date и удалить idx_habit_date_completed.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало отката миграции 007: Удаление индекса idx_habit_date_completed")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                connection.execute(text("""
+                    CREATE INDEX IF NOT EXISTS idx_habit_date 
+                    ON habit_logs(habit_id, date)
+                """))
+                
+                connection.execute(text("DROP INDEX IF EXISTS idx_habit_date_completed"))
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Откат миграции 007 успешно завершен")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Откат миграции 007 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка отката миграции 007: {str(e)}")
+        raise
+
+
+def get_migration_info():
+    """
+    Получить информацию об этой миграции.
+    
+    Returns:
+        dict: Метаданные миграции
+    """
+    return {
+        'revision': revision,
+        'down_revision': down_revision,
+        'branch_labels': branch_labels,
+        'depends_on': depends_on,
+        'description': 'Заменить индекс habit_logs(habit_id, date) покрывающим индексом',
+        'tables_modified': [
+            'habit_logs'
+        ],
+        'indexes_added': {
+            'habit_logs': ['idx_habit_date_completed']
+        },
+        'indexes_removed': {
+            'habit_logs': ['idx_habit_date']
+        }
+    }
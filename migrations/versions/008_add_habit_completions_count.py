@@ -0,0 +1,157 @@
+"""
+Миграция: Добавить счетчик выполнений привычки
+
+Revision ID: 008
+Revises: 007
+Create Date: 2024-03-05
+
+Добавляет поле habits.completions_count, которое поддерживается вместе с
+habits.last_completed_date, чтобы статистика привычки не пересчитывала
+выполнения по habit_logs.
+"""
+
+from sqlalchemy import text
+import logging
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Метаданные миграции
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade(engine):
+    """
+    Добавить поле completions_count и заполнить его по существующим записям.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало миграции 008: Добавление поля habits.completions_count")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                # Проверить, используется ли PostgreSQL или SQLite
+                is_postgresql = 'postgresql' in str(engine.url)
+                
+                if is_postgresql:
+                    logger.info("Применение миграции PostgreSQL")
+                    
+                    connection.execute(text("""
+                        ALTER TABLE habits
+                        ADD COLUMN IF NOT EXISTS completions_count INTEGER NOT NULL DEFAULT 0
+                    """))
+                    
+                    connection.execute(text("""
+                        UPDATE habits SET completions_count = (
+                            SELECT COUNT(*) FROM habit_logs
+                            WHERE habit_logs.habit_id = habits.id
+                            AND habit_logs.completed = TRUE
+                        )
+                    """))
+                
+                else:
+                    logger.info("Применение миграции SQLite")
+                    
+                    result = connection.execute(text("PRAGMA table_info(habits)"))
+                    existing_columns = {row[1] for row in result.fetchall()}
+                    
+                    if 'completions_count' not in existing_columns:
+                        connection.execute(text("""
+                            ALTER TABLE habits ADD COLUMN completions_count INTEGER NOT NULL DEFAULT 0
+                        """))
+                        
+                        connection.execute(text("""
+                            UPDATE habits SET completions_count = (
+                                SELECT COUNT(*) FROM habit_logs
+                                WHERE habit_logs.habit_id = habits.id
+                                AND habit_logs.completed = 1
+                            )
+                        """))
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Миграция 008 успешно завершена")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Миграция 008 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка миграции 008: {str(e)}")
+        raise
+
+
+def downgrade(engine):
+    """
+    Удалить поле completions_count.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало отката миграции 008: Удаление поля habits.completions_count")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                # Проверить, используется ли PostgreSQL или SQLite
+                is_postgresql = 'postgresql' in str(engine.url)
+                
+                if is_postgresql:
+                    logger.info("Применение отката PostgreSQL")
+                    
+                    connection.execute(text("""
+                        ALTER TABLE habits DROP COLUMN IF EXISTS completions_count
+                    """))
+                
+                else:
+                    # SQLite имеет ограниченную поддержку ALTER TABLE
+                    logger.warning("SQLite откат: столбец habits.completions_count остается, но не используется")
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Откат миграции 008 успешно завершен")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Откат миграции 008 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка отката миграции 008: {str(e)}")
+        raise
+
+
+def get_migration_info():
+    """
+    Получить информацию об этой миграции.
+    
+    Returns:
+        dict: Метаданные миграции
+    """
+    return {
+        'revision': revision,
+        'down_revision': down_revision,
+        'branch_labels': branch_labels,
+        'depends_on': depends_on,
+        'description': 'Добавить счетчик выполнений привычки',
+        'tables_modified': [
+            'habits'
+        ],
+        'columns_added': {
+            'habits': ['completions_count']
+        }
+    }
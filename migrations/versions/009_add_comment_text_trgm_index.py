@@ -0,0 +1,126 @@
+"""
+Миграция: Добавить триграммный индекс для поиска по комментариям
+
+Revision ID: 009
+Revises: 008
+Create Date: 2024-03-08
+
+Добавляет GIN-индекс pg_trgm по comments.text, который PostgreSQL использует
+для поиска ILIKE '%текст%'. В SQLite такого типа индекса нет, поэтому
+миграция для нее ничего не делает.
+"""
+
+from sqlalchemy import text
+import logging
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Метаданные миграции
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade(engine):
+    """
+    Включить расширение pg_trgm и создать индекс ix_comment_text_trgm.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало миграции 009: Создание индекса ix_comment_text_trgm")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                # Проверить, используется ли PostgreSQL или SQLite
+                is_postgresql = 'postgresql' in str(engine.url)
+                
+                if is_postgresql:
+                    logger.info("Применение миграции PostgreSQL")
+                    
+                    # Для создания расширения нужны права владельца базы данных
+                    connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                    
+                    connection.execute(text("""
+                        CREATE INDEX IF NOT EXISTS ix_comment_text_trgm
+                        ON comments USING GIN (text gin_trgm_ops)
+                    """))
+                
+                else:
+                    logger.info("SQLite: триграммные индексы не поддерживаются, миграция пропущена")
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Миграция 009 успешно завершена")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Миграция 009 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка миграции 009: {str(e)}")
+        raise
+
+
+def downgrade(engine):
+    """
+    Удалить индекс ix_comment_text_trgm.
+    
+    Расширение pg_trgm остается: его могут использовать другие объекты базы.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало отката миграции 009: Удаление индекса ix_comment_text_trgm")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                connection.execute(text("DROP INDEX IF EXISTS ix_comment_text_trgm"))
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Откат миграции 009 успешно завершен")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Откат миграции 009 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка отката миграции 009: {str(e)}")
+        raise
+
+
+def get_migration_info():
+    """
+    Получить информацию об этой миграции.
+    
+    Returns:
+        dict: Метаданные миграции
+    """
+    return {
+        'revision': revision,
+        'down_revision': down_revision,
+        'branch_labels': branch_labels,
+        'depends_on': depends_on,
+        'description': 'Добавить триграммный индекс для поиска по комментариям',
+        'tables_modified': [
+            'comments'
+        ],
+        'indexes_added': {
+            'comments': ['ix_comment_text_trgm']
+        }
+    }
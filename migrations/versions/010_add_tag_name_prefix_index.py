@@ -0,0 +1,123 @@
+"""
+Миграция: Добавить индекс для поиска тегов по префиксу
+
+Revision ID: 010
+Revises: 009
+Create Date: 2024-03-10
+
+Добавляет индекс tags(user_id, name varchar_pattern_ops): в PostgreSQL с
+локалью, отличной от C, обычный индекс unique_user_tag не используется
+для LIKE 'префикс%', а этот индекс превращает поиск подсказок в диапазонное
+сканирование. SQLite такие классы операторов не поддерживает, поэтому
+миграция для нее ничего не делает.
+"""
+
+from sqlalchemy import text
+import logging
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Метаданные миграции
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade(engine):
+    """
+    Создать индекс ix_tags_user_name_prefix.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало миграции 010: Создание индекса ix_tags_user_name_prefix")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                # Проверить, используется ли PostgreSQL или SQLite
+                is_postgresql = 'postgresql' in str(engine.url)
+                
+                if is_postgresql:
+                    logger.info("Применение миграции PostgreSQL")
+                    
+                    connection.execute(text("""
+                        CREATE INDEX IF NOT EXISTS ix_tags_user_name_prefix
+                        ON tags(user_id, name varchar_pattern_ops)
+                    """))
+                
+                else:
+                    logger.info("SQLite: классы операторов индексов не поддерживаются, миграция пропущена")
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Миграция 010 успешно завершена")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Миграция 010 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка миграции 010: {str(e)}")
+        raise
+
+
+def downgrade(engine):
+    """
+    Удалить индекс ix_tags_user_name_prefix.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало отката миграции 010: Удаление индекса ix_tags_user_name_prefix")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                connection.execute(text("DROP INDEX IF EXISTS ix_tags_user_name_prefix"))
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Откат миграции 010 успешно завершен")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Откат миграции 010 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка отката миграции 010: {str(e)}")
+        raise
+
+
+def get_migration_info():
+    """
+    Получить информацию об этой миграции.
+    
+    Returns:
+        dict: Метаданные миграции
+    """
+    return {
+        'revision': revision,
+        'down_revision': down_revision,
+        'branch_labels': branch_labels,
+        'depends_on': depends_on,
+        'description': 'Добавить индекс для поиска тегов по префиксу',
+        'tables_modified': [
+            'tags'
+        ],
+        'indexes_added': {
+            'tags': ['ix_tags_user_name_prefix']
+        }
+    }
@@ -0,0 +1,158 @@
+"""
+Миграция: Добавить значения по умолчанию UTC для времени категорий и комментариев
+
+Revision ID: 011
+Revises: 010
+Create Date: 2024-03-15
+
+categories.created_at, comments.created_at и comments.updated_at заполняются
+базой данных (server_default), а не Python-колбэками. Таблицы, созданные
+раньше, не имеют значения по умолчанию, и эти поля оставались бы NULL.
+В PostgreSQL добавляется DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP): now()
+зависит от часового пояса сессии, а приложение хранит наивное время UTC.
+SQLite не умеет менять DEFAULT существующего столбца, поэтому для нее
+создаются триггеры, заполняющие пустое время после вставки.
+"""
+
+from sqlalchemy import text
+import logging
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Метаданные миграции
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+# Столбцы, время в которых проставляет база данных
+TIMESTAMP_COLUMNS = (
+    ('categories', 'created_at'),
+    ('comments', 'created_at'),
+    ('comments', 'updated_at'),
+)
+
+
+def _trigger_name(table, column):
+    """Имя SQLite-триггера, заполняющего столбец времени"""
+    return f'trg_{table}_{column}_default'
+
+
+def upgrade(engine):
+    """
+    Добавить значения по умолчанию UTC для столбцов времени.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало миграции 011: Значения по умолчанию UTC для времени категорий и комментариев")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                # Проверить, используется ли PostgreSQL или SQLite
+                is_postgresql = 'postgresql' in str(engine.url)
+                
+                if is_postgresql:
+                    logger.info("Применение миграции PostgreSQL")
+                    
+                    for table, column in TIMESTAMP_COLUMNS:
+                        connection.execute(text(f"""
+                            ALTER TABLE {table}
+                            ALTER COLUMN {column} SET DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP)
+                        """))
+                
+                else:
+                    logger.info("Применение миграции SQLite")
+                    
+                    # CURRENT_TIMESTAMP в SQLite уже в UTC
+                    for table, column in TIMESTAMP_COLUMNS:
+                        connection.execute(text(f"""
+                            CREATE TRIGGER IF NOT EXISTS {_trigger_name(table, column)}
+                            AFTER INSERT ON {table}
+                            WHEN NEW.{column} IS NULL
+                            BEGIN
+                                UPDATE {table} SET {column} = CURRENT_TIMESTAMP WHERE id = NEW.id;
+                            END
+                        """))
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Миграция 011 успешно завершена")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Миграция 011 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка миграции 011: {str(e)}")
+        raise
+
+
+def downgrade(engine):
+    """
+    Удалить значения по умолчанию для столбцов времени.
+    
+    Args:
+        engine: Экземпляр SQLAlchemy engine
+    """
+    try:
+        logger.info("Начало отката миграции 011: Удаление значений по умолчанию для времени")
+        
+        with engine.connect() as connection:
+            # Начать транзакцию
+            trans = connection.begin()
+            
+            try:
+                # Проверить, используется ли PostgreSQL или SQLite
+                is_postgresql = 'postgresql' in str(engine.url)
+                
+                for table, column in TIMESTAMP_COLUMNS:
+                    if is_postgresql:
+                        connection.execute(text(f"""
+                            ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT
+                        """))
+                    else:
+                        connection.execute(text(
+                            f"DROP TRIGGER IF EXISTS {_trigger_name(table, column)}"
+                        ))
+                
+                # Зафиксировать транзакцию
+                trans.commit()
+                logger.info("Откат миграции 011 успешно завершен")
+            
+            except Exception as e:
+                # Откатить при ошибке
+                trans.rollback()
+                logger.error(f"Откат миграции 011 не удалась: {str(e)}")
+                raise
+    
+    except Exception as e:
+        logger.error(f"Ошибка отката миграции 011: {str(e)}")
+        raise
+
+
+def get_migration_info():
+    """
+    Получить информацию об этой миграции.
+    
+    Returns:
+        dict: Метаданные миграции
+    """
+    return {
+        'revision': revision,
+        'down_revision': down_revision,
+        'branch_labels': branch_labels,
+        'depends_on': depends_on,
+        'description': 'Добавить значения по умолчанию UTC для времени категорий и комментариев',
+        'tables_modified': [
+            'categories',
+            'comments'
+        ]
+    }
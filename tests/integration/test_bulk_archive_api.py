@@ -0,0 +1,97 @@
+"""
+Integration Tests for Bulk Archive/Restore API
+
+Tests for POST /api/habits/archive and POST /api/habits/restore
+"""
+import pytest
+import json
+
+
+class TestBulkArchiveAPI:
+    """Tests for bulk archive and restore endpoints"""
+
+    @pytest.fixture
+    def habit_ids(self, app, db, test_user):
+        """Create a few habits for the test user"""
+        from app.models.habit import Habit
+
+        habits = [
+            Habit(user_id=test_user.id, name=f'Habit {i}', execution_time=60, frequency=7)
+            for i in range(3)
+        ]
+        db.session.add_all(habits)
+        db.session.commit()
+        return [habit.id for habit in habits]
+
+    def test_archive_habits(self, authenticated_client, habit_ids):
+        """Test archiving several habits in one request"""
+        response = authenticated_client.post(
+            '/api/habits/archive',
+            data=json.dumps({'ids': habit_ids[:2]}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['archived'] == habit_ids[:2]
+        assert data['not_found'] == []
+
+        # Archived habits are hidden from the default listing
+        response = authenticated_client.get('/api/habits')
+        listed_ids = [habit['id'] for habit in json.loads(response.data)['habits']]
+        assert listed_ids == [habit_ids[2]]
+
+    def test_restore_habits(self, authenticated_client, habit_ids):
+        """Test restoring several archived habits in one request"""
+        authenticated_client.post(
+            '/api/habits/archive',
+            data=json.dumps({'ids': habit_ids}),
+            content_type='application/json'
+        )
+
+        response = authenticated_client.post(
+            '/api/habits/restore',
+            data=json.dumps({'ids': habit_ids}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert sorted(data['restored']) == sorted(habit_ids)
+
+        response = authenticated_client.get('/api/habits')
+        assert json.loads(response.data)['total'] == len(habit_ids)
+
+    def test_archive_skips_unknown_and_foreign_habits(self, authenticated_client, habit_ids, db, another_user):
+        """Test that habits of other users are reported as not found"""
+        from app.models.habit import Habit
+
+        foreign = Habit(user_id=another_user, name='Foreign', execution_time=60, frequency=7)
+        db.session.add(foreign)
+        db.session.commit()
+        foreign_id = foreign.id
+
+        response = authenticated_client.post(
+            '/api/habits/archive',
+            data=json.dumps({'ids': [habit_ids[0], foreign_id, 99999]}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['archived'] == [habit_ids[0]]
+        assert data['not_found'] == [foreign_id, 99999]
+        assert db.session.get(Habit, foreign_id).is_archived is False
+
+    @pytest.mark.parametrize('payload', [{}, {'ids': []}, {'ids': 'x'}, {'ids': [1, 'a']}])
+    def test_archive_rejects_invalid_ids(self, authenticated_client, payload):
+        """Test validation of the ids payload"""
+        response = authenticated_client.post(
+            '/api/habits/archive',
+            data=json.dumps(payload),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert data['error']['code'] == 'VALIDATION_ERROR'
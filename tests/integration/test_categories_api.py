@@ -330,6 +330,38 @@ class TestCategoriesAPI:
             habit = Habit.query.get(habit_id)
             assert habit.category_id is None
     
+    def test_get_category_habits_count(self, client, test_user, app):
+        """Тест подсчета привычек категории"""
+        user_id = test_user.id
+        
+        with app.app_context():
+            from app.models.category import Category
+            from app.models.habit import Habit
+            from app import db
+            
+            category = Category(user_id=user_id, name='Спорт')
+            db.session.add(category)
+            db.session.commit()
+            category_id = category.id
+            
+            db.session.add_all([
+                Habit(user_id=user_id, name=f'Привычка {i}', execution_time=30,
+                      frequency=1, category_id=category_id)
+                for i in range(2)
+            ])
+            db.session.add(Habit(user_id=user_id, name='Без категории', execution_time=30, frequency=1))
+            db.session.commit()
+        
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(user_id)
+            sess['_fresh'] = True
+        
+        response = client.get(f'/api/categories/{category_id}')
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['category']['habits_count'] == 2
+    
     def test_create_category_invalid_content_type(self, client, test_user):
         """Тест создания категории с неправильным типом контента"""
         with client.session_transaction() as sess:
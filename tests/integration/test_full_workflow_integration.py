@@ -294,7 +294,7 @@ class TestFullWorkflowIntegration:
         with app.app_context():
             # Check that CORS config is loaded from environment (may have defaults)
             cors_origins = app.config.get('CORS_ORIGINS', [])
-            assert isinstance(cors_origins, list)
+            assert isinstance(cors_origins, (list, tuple))
             assert len(cors_origins) > 0
             
             cors_methods = app.config.get('CORS_METHODS', [])
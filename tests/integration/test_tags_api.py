@@ -348,6 +348,43 @@ class TestTagsAPI:
         assert 'спорт' in data['suggestions']
         assert 'здоровье' in data['suggestions']
     
+    def test_tag_suggestions_refreshed_after_adding_tags(self, client, test_user, app):
+        """Тест сброса кэша предложений тегов после добавления тегов"""
+        user_id = test_user.id
+        
+        # Создать привычку
+        with app.app_context():
+            from app.models.habit import Habit
+            from app import db
+            
+            habit = Habit(
+                user_id=user_id,
+                name='Бегать',
+                execution_time=30,
+                frequency=1
+            )
+            db.session.add(habit)
+            db.session.commit()
+            habit_id = habit.id
+        
+        # Логин пользователя
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(user_id)
+            sess['_fresh'] = True
+        
+        response = client.get('/api/tags/suggestions?prefix=спор')
+        assert json.loads(response.data)['total'] == 0
+        
+        client.post(
+            f'/api/habits/{habit_id}/tags',
+            data=json.dumps({'tags': ['спорт']}),
+            content_type='application/json'
+        )
+        
+        response = client.get('/api/tags/suggestions?prefix=спор')
+        data = json.loads(response.data)
+        assert data['suggestions'] == ['спорт']
+    
     def test_add_tags_invalid_content_type(self, client, test_user, app):
         """Тест добавления тегов с неправильным типом контента"""
         user_id = test_user.id
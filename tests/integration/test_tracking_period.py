@@ -281,6 +281,201 @@ class TestTrackingDaysIntegration:
         assert response.status_code == 200
         assert response.json['tracking_days'] == 21
 
+    
+    def test_overview_aggregates_habits_and_categories(self, authenticated_client, test_user, db):
+        """
+        Тест того, что общая аналитика суммирует выполнения по привычкам и категориям
+        """
+        from app.models.habit import Habit
+        from app.models.habit_log import HabitLog
+        
+        category_response = authenticated_client.post(
+            '/api/categories',
+            json={'name': 'Спорт', 'color': '#6366f1'}
+        )
+        category_id = category_response.json['category']['id']
+        
+        habits = [
+            Habit(user_id=test_user.id, name='Бег', execution_time=60, frequency=7,
+                  category_id=category_id),
+            Habit(user_id=test_user.id, name='Чтение', execution_time=60, frequency=7)
+        ]
+        db.session.add_all(habits)
+        db.session.commit()
+        habit_ids = [habit.id for habit in habits]
+        
+        # Два выполнения за период и одно старое выполнение у первой привычки
+        today = datetime.now(timezone.utc).date()
+        db.session.add_all([
+            HabitLog(habit_id=habit_ids[0], date=today, completed=True),
+            HabitLog(habit_id=habit_ids[0], date=today - timedelta(days=1), completed=True),
+            HabitLog(habit_id=habit_ids[0], date=today - timedelta(days=20), completed=True),
+            HabitLog(habit_id=habit_ids[1], date=today, completed=False)
+        ])
+        db.session.commit()
+        
+        response = authenticated_client.get('/api/analytics/overview?tracking_days=7')
+        
+        assert response.status_code == 200
+        analytics = response.json['analytics']
+        assert analytics['total_habits'] == 2
+        assert analytics['total_completions'] == 3
+        assert analytics['average_completion_percentage'] == int((int(2 / 7 * 100) + 0) / 2)
+        
+        category_stats = analytics['categories'][0]
+        assert category_stats['category_id'] == category_id
+        assert category_stats['habits_count'] == 1
+        assert category_stats['total_completions'] == 3
+        assert category_stats['average_completion_percentage'] == int(2 / 7 * 100)
+
+    
+    def test_habit_analytics_streaks(self, authenticated_client, test_user, db):
+        """
+        Тест расчета текущего и лучшего streak
+        """
+        from app.models.habit import Habit
+        from app.models.habit_log import HabitLog
+        
+        habit = Habit(user_id=test_user.id, name='Зарядка', execution_time=60, frequency=7)
+        db.session.add(habit)
+        db.session.commit()
+        
+        # Текущий отрезок: сегодня и вчера; лучший отрезок: три дня подряд раньше
+        today = datetime.now(timezone.utc).date()
+        completed_days = [0, 1, 5, 6, 7]
+        db.session.add_all([
+            HabitLog(habit_id=habit.id, date=today - timedelta(days=offset), completed=True)
+            for offset in completed_days
+        ] + [HabitLog(habit_id=habit.id, date=today - timedelta(days=2), completed=False)])
+        db.session.commit()
+        
+        response = authenticated_client.get(f'/api/analytics/habits/{habit.id}?tracking_days=7')
+        
+        assert response.status_code == 200
+        statistics = response.json['statistics']
+        assert statistics['current_streak'] == 2
+        assert statistics['best_streak'] == 3
+    
+    def test_heatmap_cache_invalidated_by_completion(self, authenticated_client, test_user, db):
+        """
+        Тест того, что закэшированная тепловая карта сбрасывается после выполнения привычки
+        """
+        from app.models.habit import Habit
+        from app.models.habit_log import HabitLog
+        
+        habit = Habit(user_id=test_user.id, name='Зарядка', execution_time=60, frequency=7)
+        db.session.add(habit)
+        db.session.commit()
+        
+        today = datetime.now(timezone.utc).date().isoformat()
+        response = authenticated_client.get('/api/analytics/heatmap?tracking_days=7')
+        assert response.json['heatmap']['heatmap'][today] == 0
+        
+        db.session.add(HabitLog(habit_id=habit.id, date=datetime.now(timezone.utc).date(), completed=True))
+        db.session.commit()
+        
+        response = authenticated_client.get('/api/analytics/heatmap?tracking_days=7')
+        assert response.json['heatmap']['heatmap'][today] == 1
+    
+    def test_analytics_cache_invalidated_only_on_commit(self, test_user, db):
+        """
+        Тест того, что версия кэша аналитики меняется только после коммита
+        """
+        from app import cache
+        from app.models.habit import Habit
+        from app.models.habit_log import HabitLog
+        
+        habit = Habit(user_id=test_user.id, name='Чтение', execution_time=60, frequency=7)
+        db.session.add(habit)
+        db.session.commit()
+        version_key = f'analytics_version:{test_user.id}'
+        version = cache.get(version_key)
+        
+        # Откат не должен менять версию
+        db.session.add(HabitLog(habit_id=habit.id, date=datetime.now(timezone.utc).date(), completed=True))
+        db.session.flush()
+        assert cache.get(version_key) == version
+        db.session.rollback()
+        assert cache.get(version_key) == version
+        
+        db.session.add(HabitLog(habit_id=habit.id, date=datetime.now(timezone.utc).date(), completed=True))
+        db.session.flush()
+        assert cache.get(version_key) == version
+        db.session.commit()
+        assert cache.get(version_key) == (version or 0) + 1
+    
+    def test_analytics_not_cached_without_shared_cache(self, app, test_user):
+        """
+        Тест того, что без общего для воркеров кэша аналитика вычисляется заново
+        """
+        from app.utils.analytics_cache import get_cached_analytics
+        
+        calls = []
+        
+        def compute():
+            calls.append(1)
+            return {'total': len(calls)}, True, []
+        
+        app.config['ANALYTICS_CACHE_ENABLED'] = False
+        get_cached_analytics(test_user.id, 'overview', compute, 7)
+        result = get_cached_analytics(test_user.id, 'overview', compute, 7)
+        
+        assert result[0] == {'total': 2}
+        
+        app.config['ANALYTICS_CACHE_ENABLED'] = True
+        get_cached_analytics(test_user.id, 'overview', compute, 7)
+        result = get_cached_analytics(test_user.id, 'overview', compute, 7)
+        
+        assert result[0] == {'total': 3}
+    
+    def test_user_analytics_query_count_is_constant(self, test_user, db):
+        """
+        Тест того, что число запросов общей аналитики не зависит от числа привычек
+        """
+        from sqlalchemy import event
+        from app.models.category import Category
+        from app.models.habit import Habit
+        from app.models.habit_log import HabitLog
+        from app.services.analytics_service import AnalyticsService
+        
+        service = AnalyticsService()
+        today = datetime.now(timezone.utc).date()
+        category = Category(user_id=test_user.id, name='Спорт')
+        db.session.add(category)
+        db.session.commit()
+        
+        statements = []
+        
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        query_counts = []
+        for habits_to_add in (1, 5):
+            habits = [
+                Habit(user_id=test_user.id, name=f'Привычка {i}', execution_time=60,
+                      frequency=7, category_id=category.id)
+                for i in range(habits_to_add)
+            ]
+            db.session.add_all(habits)
+            db.session.flush()
+            db.session.add_all([HabitLog(habit_id=habit.id, date=today, completed=True) for habit in habits])
+            db.session.commit()
+            
+            statements.clear()
+            event.listen(db.engine, 'before_cursor_execute', count_statement)
+            try:
+                analytics, success, _ = service.get_user_analytics(test_user.id, 7)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', count_statement)
+            
+            assert success
+            assert analytics['categories'][0]['habits_count'] == analytics['total_habits']
+            assert analytics['total_completions'] == analytics['total_habits']
+            query_counts.append(len(statements))
+        
+        assert analytics['total_habits'] == 6
+        assert query_counts[0] == query_counts[1]
+
 
 class TestTrackingDaysAlternativeParameter:
     """Тесты для альтернативного имени параметра tracking_days"""
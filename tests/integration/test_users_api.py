@@ -0,0 +1,128 @@
+"""
+Integration Tests for Users API
+
+Tests for profile update validation in PUT /api/users/me
+"""
+import pytest
+
+
+class TestUpdateCurrentUser:
+    """Tests for PUT /api/users/me payload validation"""
+
+    def test_update_name(self, authenticated_client, test_user):
+        """Test updating the profile name"""
+        response = authenticated_client.put('/api/users/me', json={'name': 'New Name'})
+
+        assert response.status_code == 200
+        assert response.json['user']['name'] == 'New Name'
+
+    def test_null_name_clears_name(self, authenticated_client, test_user):
+        """Test that a null name is accepted and clears the profile name"""
+        response = authenticated_client.put('/api/users/me', json={'name': None})
+
+        assert response.status_code == 200
+        assert response.json['user']['name'] is None
+
+    def test_unknown_fields_are_ignored(self, authenticated_client, test_user):
+        """Test that fields outside the allow-list are not applied"""
+        response = authenticated_client.put(
+            '/api/users/me',
+            json={'name': 'New Name', 'email': 'hacker@example.com'}
+        )
+
+        assert response.status_code == 200
+        assert response.json['user']['email'] == 'test@example.com'
+
+    def test_only_unknown_fields_rejected(self, authenticated_client, test_user):
+        """Test that a payload without updatable fields is rejected"""
+        response = authenticated_client.put('/api/users/me', json={'email': 'hacker@example.com'})
+
+        assert response.status_code == 400
+        assert response.json['error']['code'] == 'VALIDATION_ERROR'
+
+    @pytest.mark.parametrize('payload', [
+        {'name': 123},
+        {'name': 'x' * 101},
+        {'avatar_url': 'javascript:alert(1)'},
+        {'avatar_url': 42},
+    ])
+    def test_invalid_fields_rejected(self, authenticated_client, test_user, payload):
+        """Test type and format validation of profile fields"""
+        response = authenticated_client.put('/api/users/me', json=payload)
+
+        assert response.status_code == 400
+        assert response.json['error']['code'] == 'VALIDATION_ERROR'
+
+
+class TestGetCurrentUserETag:
+    """Tests for conditional GET /api/users/me"""
+
+    def test_etag_returned(self, authenticated_client, test_user):
+        """Test that the profile response carries an ETag"""
+        response = authenticated_client.get('/api/users/me')
+
+        assert response.status_code == 200
+        assert response.headers.get('ETag')
+
+    def test_matching_etag_returns_304(self, authenticated_client, test_user):
+        """Test that a matching If-None-Match yields 304 without a body"""
+        etag = authenticated_client.get('/api/users/me').headers['ETag']
+
+        response = authenticated_client.get('/api/users/me', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_matching_gzip_etag_returns_304(self, authenticated_client, test_user):
+        """Test revalidation of a compressed response whose ETag carries the :gzip suffix"""
+        # A long name pushes the body past COMPRESS_MIN_SIZE
+        authenticated_client.put('/api/users/me', json={'name': 'N' * 100})
+        headers = {'Accept-Encoding': 'gzip'}
+        first = authenticated_client.get('/api/users/me', headers=headers)
+        assert first.headers['Content-Encoding'] == 'gzip'
+        assert first.headers['ETag'].endswith(':gzip"')
+
+        headers['If-None-Match'] = first.headers['ETag']
+        response = authenticated_client.get('/api/users/me', headers=headers)
+
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_changed_profile_returns_200(self, authenticated_client, test_user):
+        """Test that the ETag changes after a profile update"""
+        etag = authenticated_client.get('/api/users/me').headers['ETag']
+        authenticated_client.put('/api/users/me', json={'name': 'Renamed'})
+
+        response = authenticated_client.get('/api/users/me', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.json['user']['name'] == 'Renamed'
+
+
+class TestCurrentUserStatisticsCache:
+    """Tests for invalidation of cached profile statistics"""
+
+    def test_statistics_refreshed_after_habit_and_log_changes(self, authenticated_client, test_user, db):
+        """Test that habit writes and committed completions drop cached statistics"""
+        from datetime import datetime, timezone
+        from app.models.habit_log import HabitLog
+
+        statistics = authenticated_client.get('/api/users/me').json['user']['statistics']
+        assert statistics['total_habits'] == 0
+
+        response = authenticated_client.post('/api/habits', json={
+            'name': 'Read', 'execution_time': 60, 'frequency': 7
+        })
+        assert response.status_code == 201
+        habit_id = response.json['habit']['id']
+
+        statistics = authenticated_client.get('/api/users/me').json['user']['statistics']
+        assert statistics['total_habits'] == 1
+        assert statistics['average_completion_rate'] == 0
+
+        db.session.add(HabitLog(habit_id=habit_id, date=datetime.now(timezone.utc).date(), completed=True))
+        db.session.commit()
+
+        statistics = authenticated_client.get('/api/users/me').json['user']['statistics']
+        assert statistics['average_completion_rate'] == 14
+
@@ -343,7 +343,7 @@ class TestSecurity:
             # Check for testing environment using TESTING config or FLASK_ENV
             is_testing = app.config.get('TESTING', False) or app.config.get('FLASK_ENV') == 'testing'
             
-            if isinstance(cors_origins, list):
+            if isinstance(cors_origins, (list, tuple)):
                 assert '*' not in cors_origins or is_testing, f"CORS allows all origins (*) in non-testing environment. TESTING={app.config.get('TESTING')}, FLASK_ENV={app.config.get('FLASK_ENV')}"
         
         # Test preflight request with allowed origin
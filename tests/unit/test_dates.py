@@ -0,0 +1,47 @@
+"""
+Unit Tests for Date Utilities
+
+Tests for the per-context current date helper and the UTC server timestamp
+"""
+from datetime import datetime, timezone
+
+from flask import Flask, g
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.utils.dates import today_utc, utcnow
+
+
+class TestTodayUtc:
+    """Test today_utc caching"""
+
+    def test_without_app_context(self):
+        """Test that the current UTC date is returned outside of an app context"""
+        assert today_utc() == datetime.now(timezone.utc).date()
+
+    def test_cached_on_app_context(self):
+        """Test that the date is stored on g and reused within the context"""
+        app = Flask(__name__)
+
+        with app.app_context():
+            today = today_utc()
+            assert g._today_utc == today
+
+            g._today_utc = today.replace(year=2000)
+            assert today_utc().year == 2000
+
+        with app.app_context():
+            assert today_utc() == today
+
+
+class TestUtcNow:
+    """Test the database-side UTC timestamp expression"""
+
+    def test_postgresql_converts_to_utc(self):
+        """Test that PostgreSQL does not depend on the session time zone"""
+        compiled = str(utcnow().compile(dialect=postgresql.dialect()))
+
+        assert compiled == "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+    def test_sqlite_uses_current_timestamp(self):
+        """Test that SQLite uses its UTC CURRENT_TIMESTAMP"""
+        assert str(utcnow().compile(dialect=sqlite.dialect())) == 'CURRENT_TIMESTAMP'
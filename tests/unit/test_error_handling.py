@@ -45,9 +45,10 @@ class TestCustomExceptions:
         assert "Validation failed for field 'email'" in error.message
         
         error_dict = error.to_dict()
-        assert len(error_dict['details']) == 2
-        assert error_dict['details'][0]['field'] == "email"
-        assert error_dict['details'][0]['message'] == "Field is required"
+        assert error_dict['details'] == {
+            'field': "email",
+            'messages': ["Field is required", "Invalid format"]
+        }
     
     def test_validation_error_without_field(self):
         """Test ValidationError without specific field"""
@@ -58,7 +59,7 @@ class TestCustomExceptions:
         assert "Data validation failed" in error.message
         
         error_dict = error.to_dict()
-        assert 'field' not in error_dict['details'][0]
+        assert error_dict['details'] == ["General validation error"]
     
     def test_authorization_error(self):
         """Test AuthorizationError with resource and action"""
@@ -325,6 +326,22 @@ class TestErrorHandlers:
         assert data['error']['code'] == 'TEST_CODE'
         assert data['error']['message'] == 'Test generic error'
     
+    def test_exception_subclass_uses_base_class_status(self, app, client):
+        """Test that subclasses of handled exceptions get the status of their base class"""
+        class WidgetNotFoundError(ResourceNotFoundError):
+            pass
+        
+        @app.route('/test/subclass')
+        def test_subclass():
+            raise WidgetNotFoundError('widget', 7)
+        
+        response = client.get('/test/subclass')
+        
+        assert response.status_code == 404
+        data = json.loads(response.data)
+        assert data['error']['code'] == 'RESOURCE_NOT_FOUND'
+        assert data['path'] == '/test/subclass'
+    
     def test_unexpected_error_handler(self, client):
         """Test unexpected exception handler returns 500"""
         response = client.get('/test/unexpected')
@@ -347,6 +364,25 @@ class TestErrorHandlers:
         assert data['error']['message'] == 'The requested resource was not found'
         assert data['path'] == '/non/existent/route'
     
+    def test_http_error_timestamp_placeholder(self, client):
+        """Test that HTTP errors carry the fixed timestamp in testing mode"""
+        response = client.get('/non/existent/route')
+        
+        data = json.loads(response.data)
+        assert data['error']['timestamp'] == '2024-01-01T00:00:00'
+        assert data['method'] == 'GET'
+    
+    def test_http_error_timestamp_null_outside_testing(self):
+        """Test that HTTP errors have a null timestamp outside testing mode"""
+        app = Flask(__name__)
+        register_error_handlers(app)
+        
+        response = app.test_client().get('/non/existent/route')
+        
+        data = json.loads(response.data)
+        assert response.status_code == 404
+        assert data['error']['timestamp'] is None
+    
     def test_http_405_handler(self, client):
         """Test HTTP 405 handler for method not allowed"""
         # Try POST on a GET-only route
@@ -35,7 +35,7 @@ class TestHabitService:
         """Create another test user"""
         with app.app_context():
             from app.models import get_models
-            User, _, _ = get_models()
+            User = get_models()[0]
             from app.models.user import db
             
             user = User(
@@ -45,7 +45,7 @@ class TestHabitService:
             user.set_password('SecureP@ssw0rd')
             db.session.add(user)
             db.session.commit()
-            return user
+            return user.id
     
     def test_create_habit_success(self, habit_service, sample_user):
         """Test successful habit creation"""
@@ -193,7 +193,7 @@ class TestHabitService:
     def test_delete_habit_cascade_logs(self, habit_service, sample_user):
         """Test that deleting habit also deletes related logs"""
         from app.models import get_models
-        User, Habit, HabitLog = get_models()
+        User, Habit, HabitLog = get_models()[:3]
         from app.models.habit import db
         
         # Create habit
@@ -229,6 +229,168 @@ class TestHabitService:
         logs_after = HabitLog.query.filter_by(habit_id=habit.id).count()
         assert logs_after == 0
     
+    def test_delete_habit_clears_related_references(self, habit_service, sample_user):
+        """Test that habits linked to a deleted habit lose the reference"""
+        from app.models.habit import db
+        
+        reward = habit_service.create_habit(sample_user, {
+            'name': 'Reward Habit',
+            'execution_time': 30,
+            'frequency': 7,
+            'habit_type': HabitType.PLEASANT
+        })
+        linked = habit_service.create_habit(sample_user, {
+            'name': 'Linked Habit',
+            'execution_time': 30,
+            'frequency': 7,
+            'habit_type': HabitType.USEFUL
+        })
+        linked.related_habit_id = reward.id
+        db.session.commit()
+        
+        habit_service.delete_habit(reward.id, sample_user)
+        
+        db.session.refresh(linked)
+        assert linked.related_habit_id is None
+    
+    def test_last_completed_date_tracks_logs(self, habit_service, sample_user):
+        """Test that last_completed_date follows completed logs"""
+        from app.models import get_models
+        HabitLog = get_models()[2]
+        from app.models.habit import db
+        from datetime import timedelta
+        
+        habit = habit_service.create_habit(sample_user, {
+            'name': 'Tracked Habit',
+            'execution_time': 30,
+            'frequency': 7,
+            'habit_type': HabitType.USEFUL
+        })
+        assert habit.last_completed_date is None
+        assert habit.can_be_completed_today() is True
+        
+        today = datetime.now(timezone.utc).date()
+        week_ago = today - timedelta(days=7)
+        older = HabitLog(habit_id=habit.id, date=week_ago, completed=True)
+        latest = HabitLog(habit_id=habit.id, date=today, completed=True)
+        db.session.add_all([older, latest])
+        db.session.commit()
+        
+        assert habit.last_completed_date == today
+        assert habit.completions_count == 2
+        assert habit.can_be_completed_today() is False
+        assert habit.get_next_due_date() == today + timedelta(days=7)
+        
+        # Un-completing the latest log falls back to the previous completion
+        latest.toggle_completion()
+        db.session.commit()
+        assert habit.last_completed_date == week_ago
+        assert habit.completions_count == 1
+        assert habit.can_be_completed_today() is True
+        
+        db.session.delete(older)
+        db.session.commit()
+        assert habit.last_completed_date is None
+        assert habit.completions_count == 0
+    
+    def test_completion_rate_cache_reset_on_log_change(self, habit_service, sample_user):
+        """Test that the memoized completion rate follows log changes"""
+        from app.models import get_models
+        HabitLog = get_models()[2]
+        from app.models.habit import db
+        
+        habit = habit_service.create_habit(sample_user, {
+            'name': 'Cached Habit',
+            'execution_time': 30,
+            'frequency': 7,
+            'habit_type': HabitType.USEFUL
+        })
+        assert habit.get_completion_rate() == 0
+        
+        log = HabitLog(habit_id=habit.id, date=datetime.now(timezone.utc).date(), completed=True)
+        db.session.add(log)
+        db.session.commit()
+        assert habit.get_completion_rate() == int(1 / 7 * 100)
+        
+        log.toggle_completion()
+        db.session.commit()
+        assert habit.get_completion_rate() == 0
+    
+    def test_habit_log_get_or_create_reuses_existing_log(self, habit_service, sample_user):
+        """Test that get_or_create creates a log once per habit and date"""
+        from app.models import get_models
+        HabitLog = get_models()[2]
+        from app.models.habit import db
+        
+        habit = habit_service.create_habit(sample_user, {
+            'name': 'Logged Habit',
+            'execution_time': 30,
+            'frequency': 7,
+            'habit_type': HabitType.USEFUL
+        })
+        today = datetime.now(timezone.utc).date()
+        
+        first = HabitLog.get_or_create(habit.id, today)
+        db.session.commit()
+        second = HabitLog.get_or_create(habit.id, today)
+        
+        assert first.id == second.id
+        assert first.completed is False
+        assert HabitLog.query.filter_by(habit_id=habit.id, date=today).count() == 1
+    
+    def test_bulk_to_dict_matches_to_dict(self, habit_service, sample_user):
+        """Test that bulk serialization gives the same data as to_dict"""
+        from app.models import get_models
+        Habit, HabitLog = get_models()[1:3]
+        from app.models.habit import db
+        
+        habits = [
+            habit_service.create_habit(sample_user, {
+                'name': f'Bulk Habit {i}',
+                'execution_time': 30,
+                'frequency': 7,
+                'habit_type': HabitType.USEFUL
+            })
+            for i in range(2)
+        ]
+        db.session.add(HabitLog(habit_id=habits[0].id, date=datetime.now(timezone.utc).date(), completed=True))
+        db.session.commit()
+        
+        bulk = Habit.bulk_to_dict(habits)
+        for habit in habits:
+            habit.invalidate_computed_cache()
+        
+        assert bulk == [habit.to_dict() for habit in habits]
+        assert bulk[0]['completion_rate'] > 0
+        assert bulk[1]['completion_rate'] == 0
+    
+    def test_to_dict_keeps_unset_habit_type_as_none(self, app):
+        """Test that a habit without a type is not reported as useful"""
+        from app.models import get_models
+        Habit = get_models()[1]
+        
+        habit = Habit(name='Untyped', execution_time=30, frequency=7)
+        
+        assert habit.to_dict(fields=('habit_type',)) == {'habit_type': None}
+    
+    def test_archived_habit_to_dict_skips_log_fields(self, habit_service, sample_user):
+        """Test that archived habits get static log-based fields"""
+        habit = habit_service.create_habit(sample_user, {
+            'name': 'Archived Habit',
+            'execution_time': 30,
+            'frequency': 7,
+            'habit_type': HabitType.USEFUL
+        })
+        habit_service.archive_habit(habit.id, sample_user)
+        
+        data = habit.to_dict()
+        
+        assert data['is_archived'] is True
+        assert data['completion_rate'] is None
+        assert data['can_complete_today'] is False
+        assert data['next_due_date'] is None
+        assert data['frequency_description'] == 'Еженедельно'
+    
     def test_get_user_habits(self, habit_service, sample_user):
         """Test getting user habits"""
         # Create multiple habits
@@ -302,6 +464,60 @@ class TestHabitService:
         restored_habit = habit_service.restore_habit(habit.id, sample_user)
         assert not restored_habit.is_archived
     
+    def test_batch_commits_once_on_exit(self, habit_service, sample_user):
+        """Test that mutations inside batch() are committed together"""
+        from app.models.habit import db
+        
+        with habit_service.batch():
+            first = habit_service.create_habit(sample_user, {
+                'name': 'Batched One',
+                'execution_time': 30,
+                'frequency': 7,
+                'habit_type': HabitType.USEFUL
+            })
+            habit_service.create_habit(sample_user, {
+                'name': 'Batched Two',
+                'execution_time': 30,
+                'frequency': 7,
+                'habit_type': HabitType.USEFUL
+            })
+            # Flushed, so IDs are available before the commit
+            assert first.id is not None
+            assert db.session.info.get('habit_batch') is True
+        
+        assert 'habit_batch' not in db.session.info
+        assert len(habit_service.get_user_habits(sample_user)) == 2
+    
+    def test_batch_rolls_back_on_error(self, habit_service, sample_user):
+        """Test that an exception inside batch() discards batched mutations"""
+        with pytest.raises(RuntimeError):
+            with habit_service.batch():
+                habit_service.create_habit(sample_user, {
+                    'name': 'Discarded',
+                    'execution_time': 30,
+                    'frequency': 7,
+                    'habit_type': HabitType.USEFUL
+                })
+                raise RuntimeError("abort")
+        
+        assert habit_service.get_user_habits(sample_user) == []
+    
+    def test_archive_habit_missing_or_foreign(self, habit_service, sample_user, another_user):
+        """Test that archiving tells a missing habit from a foreign one"""
+        habit = habit_service.create_habit(sample_user, {
+            'name': 'Not Yours',
+            'execution_time': 30,
+            'frequency': 7,
+            'habit_type': HabitType.USEFUL
+        })
+        
+        with pytest.raises(AuthorizationError):
+            habit_service.archive_habit(habit.id, another_user)
+        with pytest.raises(HabitNotFoundError):
+            habit_service.restore_habit(99999, sample_user)
+        
+        assert not habit_service.get_habit_by_id(habit.id, sample_user).is_archived
+    
     def test_get_habits_by_type(self, habit_service, sample_user):
         """Test getting habits by type"""
         # Create habits of different types
@@ -0,0 +1,45 @@
+"""
+Unit Tests for JSON Logging
+
+Tests for the JSON lines log formatter
+"""
+import json
+import logging
+import sys
+
+from app.utils.json_logging import JsonLogFormatter
+
+
+class TestJsonLogFormatter:
+    """Test JsonLogFormatter output"""
+
+    def _make_record(self, msg, args=(), exc_info=None):
+        """Create a log record for the error handlers logger"""
+        return logging.LogRecord(
+            'app.error_handlers', logging.WARNING, __file__, 1, msg, args, exc_info
+        )
+
+    def test_record_formatted_as_single_json_line(self):
+        """Test that message arguments are merged and fields are present"""
+        record = self._make_record("Not found: %s", ('/api/habits/1',))
+
+        line = JsonLogFormatter().format(record)
+
+        assert '\n' not in line
+        entry = json.loads(line)
+        assert entry['level'] == 'WARNING'
+        assert entry['logger'] == 'app.error_handlers'
+        assert entry['message'] == 'Not found: /api/habits/1'
+        assert 'time' in entry
+        assert 'exc_info' not in entry
+
+    def test_exception_traceback_included(self):
+        """Test that exception information is added to the entry"""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = self._make_record("Unexpected error", exc_info=sys.exc_info())
+
+        entry = json.loads(JsonLogFormatter().format(record))
+
+        assert 'ValueError: boom' in entry['exc_info']
@@ -0,0 +1,101 @@
+"""
+Unit Tests for JSON Provider
+
+Tests for the orjson-backed Flask JSON provider
+"""
+import json
+from datetime import datetime, date
+from decimal import Decimal
+
+import pytest
+from flask import Flask, jsonify
+
+from app.utils.json_provider import (
+    OrjsonJSONProvider, encode_json, json_bytes_response, encode_error_prefix, json_error_details_response
+)
+
+
+class TestOrjsonJSONProvider:
+    """Test OrjsonJSONProvider serialization"""
+
+    @pytest.fixture
+    def app(self):
+        """Create a minimal Flask app using the provider"""
+        app = Flask(__name__)
+        app.json = OrjsonJSONProvider(app)
+        return app
+
+    def test_datetimes_serialized_as_iso_format(self, app):
+        """Test that dates and datetimes are emitted in ISO 8601 format"""
+        created_at = datetime(2024, 1, 2, 3, 4, 5, 123456)
+
+        with app.app_context():
+            data = json.loads(app.json.dumps({'created_at': created_at, 'day': date(2024, 1, 2)}))
+
+        assert data['created_at'] == created_at.isoformat()
+        assert data['day'] == '2024-01-02'
+
+    def test_decimal_serialized(self, app):
+        """Test that Decimal values from SQL aggregates are serializable"""
+        with app.app_context():
+            data = json.loads(app.json.dumps({'total': Decimal('3')}))
+
+        assert data['total'] in (3, '3')
+
+    def test_jsonify_response_is_compact(self, app):
+        """Test that jsonify responses are not pretty-printed"""
+        app.config['DEBUG'] = True
+
+        with app.app_context():
+            response = jsonify({'b': 1, 'a': [1, 2]})
+
+        assert response.mimetype == 'application/json'
+        assert b'\n ' not in response.data
+        assert json.loads(response.data) == {'b': 1, 'a': [1, 2]}
+
+    def test_loads_round_trip(self, app):
+        """Test that loads parses both str and bytes"""
+        with app.app_context():
+            assert app.json.loads('{"a": 1}') == {'a': 1}
+            assert app.json.loads(b'[1, 2]') == [1, 2]
+
+
+class TestPreEncodedResponses:
+    """Test helpers for pre-encoded constant responses"""
+
+    def test_encode_json_is_compact_utf8(self):
+        """Test that constant payloads are encoded without escaping or spaces"""
+        body = encode_json({'error': {'code': 'NOT_FOUND', 'message': 'Тег не найден'}})
+
+        assert body == '{"error":{"code":"NOT_FOUND","message":"Тег не найден"}}'.encode('utf-8')
+
+    def test_json_bytes_response_creates_new_response_each_call(self):
+        """Test that each call returns a separate response object"""
+        app = Flask(__name__)
+        body = encode_json({'error': {'code': 'INTERNAL_ERROR'}})
+
+        with app.app_context():
+            first = json_bytes_response(body, 500)
+            second = json_bytes_response(body, 500)
+
+        assert first is not second
+        assert first.status_code == 500
+        assert first.mimetype == 'application/json'
+        assert json.loads(first.data) == {'error': {'code': 'INTERNAL_ERROR'}}
+
+    def test_error_prefix_completed_with_details(self):
+        """Test that an encoded error prefix plus details forms valid JSON"""
+        app = Flask(__name__)
+        prefix = encode_error_prefix('SERVICE_ERROR', 'Не удалось получить теги')
+
+        with app.app_context():
+            response = json_error_details_response(prefix, 'db "down"', 500)
+
+        assert response.status_code == 500
+        assert json.loads(response.data) == {
+            'error': {
+                'code': 'SERVICE_ERROR',
+                'message': 'Не удалось получить теги',
+                'details': 'db "down"'
+            }
+        }
@@ -42,6 +42,43 @@ class TestUserService:
         assert user.password_hash is not None
         assert user.password_hash != 'SecureP@ssw0rd'  # Should be hashed
     
+    def test_oauth_login_links_existing_email(self, user_service):
+        """Test that OAuth login links the provider ID to an account with the same email"""
+        user = user_service.create_user(
+            email='test@example.com',
+            password='SecureP@ssw0rd',
+            name='Test User'
+        )
+        
+        linked = user_service.get_or_create_oauth_user('github', {
+            'id': 42, 'login': 'tester', 'email': 'test@example.com'
+        })
+        again = user_service.get_or_create_oauth_user('github', {
+            'id': 42, 'login': 'tester', 'email': 'test@example.com'
+        })
+        
+        assert linked.id == user.id
+        assert linked.github_id == '42'
+        assert again.id == user.id
+    
+    def test_oauth_login_prefers_provider_id_match(self, user_service):
+        """Test that the provider ID match wins over another account's email"""
+        google_user = user_service.get_or_create_oauth_user('google', {
+            'id': 'g-1', 'email': 'google@example.com', 'name': 'Google User'
+        })
+        other = user_service.create_user(
+            email='other@example.com',
+            password='SecureP@ssw0rd',
+            name='Other User'
+        )
+        
+        user = user_service.get_or_create_oauth_user('google', {
+            'id': 'g-1', 'email': 'other@example.com'
+        })
+        
+        assert user.id == google_user.id
+        assert user.id != other.id
+    
     def test_create_user_duplicate_email_fails(self, user_service):
         """Test that creating user with duplicate email fails"""
         # Create first user
@@ -297,6 +334,45 @@ class TestUserService:
         assert stats['useful_habits_count'] == 0
         assert stats['pleasant_habits_count'] == 0
     
+    def test_get_user_statistics_with_habits(self, user_service, db):
+        """Test statistics aggregated over active habits and their logs"""
+        from datetime import datetime, timezone, timedelta
+        from app.models.habit import Habit
+        from app.models.habit_log import HabitLog
+        from app.models.habit_types import HabitType
+        
+        user = user_service.create_user(
+            email='stats@example.com',
+            password='testSecureP@ssw0rd',
+            name='Stats User'
+        )
+        today = datetime.now(timezone.utc).date()
+        
+        useful = Habit(user_id=user.id, name='Useful', execution_time=60, frequency=1,
+                       habit_type=HabitType.USEFUL)
+        pleasant = Habit(user_id=user.id, name='Pleasant', execution_time=60, frequency=1,
+                         habit_type=HabitType.PLEASANT)
+        archived = Habit(user_id=user.id, name='Archived', execution_time=60, frequency=1,
+                         is_archived=True)
+        db.session.add_all([useful, pleasant, archived])
+        db.session.commit()
+        
+        # Two completions for the useful habit within the last week
+        db.session.add_all([
+            HabitLog(habit_id=useful.id, date=today - timedelta(days=1), completed=True),
+            HabitLog(habit_id=useful.id, date=today - timedelta(days=3), completed=True),
+        ])
+        db.session.commit()
+        
+        stats = user_service.get_user_statistics(user.id)
+        
+        assert stats['total_active_habits'] == 2
+        assert stats['useful_habits_count'] == 1
+        assert stats['pleasant_habits_count'] == 1
+        assert stats['habits_due_today'] == 2
+        assert stats['average_completion_rate'] == round((int(2 / 7 * 100) + 0) / 2, 1)
+        assert 'streak_count' not in stats
+    
     def test_authorize_user_action(self, user_service):
         """Test user action authorization"""
         # Same user should be authorized
@@ -9,6 +9,7 @@ from app.validators import (
     CommentValidator,
     TagValidator,
     CategoryValidator,
+    HabitValidator,
     ValidationResult
 )
 
@@ -246,6 +247,13 @@ class TestTagValidator:
         
         assert normalized == ['спорт', 'здоровье', 'утро']
     
+    def test_normalize_tags_removes_duplicates(self):
+        """Тест удаления дубликатов при нормализации тегов"""
+        tags = ['Спорт', 'утро', ' спорт ', 'СПОРТ', 'утро']
+        normalized = TagValidator.normalize_tags(tags)
+        
+        assert normalized == ['спорт', 'утро']
+    
     def test_static_validate_tags(self):
         """Тест статического метода валидации"""
         result = TagValidator.validate_tags(['спорт', 'здоровье'])
@@ -360,3 +368,38 @@ class TestValidationResult:
         assert not result.is_valid
         assert len(result.errors) == 2
         assert result.errors == errors
+
+
+class TestHabitValidatorBusinessRules:
+    """Тесты бизнес-правил привычки на уровне валидатора"""
+    
+    def test_valid_habit_data(self):
+        """Тест корректных данных привычки"""
+        validator = HabitValidator()
+        data = {'name': 'Бегать', 'habit_type': 'useful', 'reward': 'Кофе',
+                'execution_time': 60, 'frequency': 7}
+        
+        is_valid, errors = validator.validate_business_rules(data)
+        
+        assert is_valid
+        assert errors == []
+    
+    def test_pleasant_habit_with_reward(self):
+        """Тест приятной привычки с вознаграждением"""
+        validator = HabitValidator()
+        data = {'name': 'Ванна', 'habit_type': 'pleasant', 'reward': 'Кофе'}
+        
+        is_valid, errors = validator.validate_business_rules(data)
+        
+        assert not is_valid
+        assert "Приятная привычка не может иметь вознаграждение" in errors
+    
+    def test_reward_length_counts_whitespace(self):
+        """Тест ограничения длины вознаграждения с учетом пробелов"""
+        validator = HabitValidator()
+        data = {'name': 'Бегать', 'reward': ' ' * 10 + 'к' * 195}
+        
+        is_valid, errors = validator.validate_business_rules(data)
+        
+        assert not is_valid
+        assert "Вознаграждение не может превышать 200 символов" in errors